@@ -0,0 +1,92 @@
+"""
+Django management command to compare retrieval modes of the AI knowledge index.
+Measures query latency and recall@k for lexical, vector and hybrid retrieval
+using queries generated from the current catalog.
+
+Usage:
+    python manage.py benchmark_retrieval
+    python manage.py benchmark_retrieval --k 3 --modes lexical hybrid
+"""
+
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from apps.ai_assistant.services.index_service import IndexService
+from apps.ai_assistant.services.retrieval_benchmark import with_typo
+from apps.products.models import Category
+from apps.preconfigured_products.models import PreConfiguredProduct
+
+
+class Command(BaseCommand):
+    help = 'Benchmark latency and recall@k of lexical, vector and hybrid retrieval'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, default=5, help='Cut-off for recall@k')
+        parser.add_argument(
+            '--modes',
+            nargs='+',
+            default=list(IndexService.RETRIEVAL_MODES),
+            choices=IndexService.RETRIEVAL_MODES,
+            help='Retrieval modes to compare',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Seed for typo generation')
+
+    def build_queries(self, seed: int):
+        """Labelled (query, expected doc types, expected doc_id) triples from the catalog"""
+        rng = random.Random(seed)
+        queries = []
+
+        for product in PreConfiguredProduct.objects.select_related('category'):
+            expected = f"product_{product.id}"
+            queries.append((product.name, ["product"], expected))
+            queries.append((product.name.lower(), ["product"], expected))
+            queries.append((with_typo(product.name, rng), ["product"], expected))
+
+        for category in Category.objects.all():
+            expected = f"category_{category.id}"
+            queries.append((category.name, ["category"], expected))
+            queries.append((with_typo(category.name, rng), ["category"], expected))
+
+        return queries
+
+    def handle(self, *args, **options):
+        k = options['k']
+        queries = self.build_queries(options['seed'])
+
+        if not queries:
+            self.stdout.write(self.style.ERROR('✗ Catalog is empty - nothing to benchmark'))
+            return
+
+        service = IndexService(retrieval_mode='lexical')
+        service.sync_lexical_index()
+        if any(mode != 'lexical' for mode in options['modes']):
+            service._load_existing_index()
+
+        self.stdout.write(self.style.WARNING(f'Running {len(queries)} queries per mode (k={k})...\n'))
+        self.stdout.write(f"{'mode':<10}{'recall@k':>10}{'p50 ms':>10}{'p95 ms':>10}")
+
+        for mode in options['modes']:
+            service.retrieval_mode = mode
+            latencies = []
+            hits = 0
+
+            try:
+                for query, doc_types, expected in queries:
+                    start = time.perf_counter()
+                    nodes = service.retrieve_by_type(query, doc_types, top_k=k)
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+                    if expected in [service._node_doc_id(node) for node in nodes]:
+                        hits += 1
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'{mode:<10}failed: {str(e)[:80]}'))
+                continue
+
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(
+                f"{mode:<10}{hits / len(queries):>10.3f}"
+                f"{statistics.median(latencies):>10.2f}{p95:>10.2f}"
+            )
@@ -0,0 +1,91 @@
+"""
+Django management command to run the retrieval benchmark and quality suite.
+Builds an index of a synthetic catalog in a scratch directory and reports
+build time, p50/p95 latency, recall@k and MRR for product search, category
+search and intent classification. Runs offline (hashing embedder, no
+database), so runs are comparable across machines and commits.
+
+Usage:
+    python manage.py benchmark_retrieval_suite
+    python manage.py benchmark_retrieval_suite --categories 50 --options 5000 --output results.json
+    python manage.py benchmark_retrieval_suite --modes hybrid --vector-backend chroma --json
+"""
+
+import json
+
+from django.core.management.base import BaseCommand
+from apps.ai_assistant.services.embeddings import EMBEDDING_BACKENDS
+from apps.ai_assistant.services.index_service import IndexService
+from apps.ai_assistant.services.retrieval_benchmark import SyntheticCatalog, run_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Benchmark index build time, latency and retrieval quality on a synthetic catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=10, help='Synthetic categories')
+        parser.add_argument('--options', type=int, default=400, help='Synthetic part options')
+        parser.add_argument('--products-per-category', type=int, default=5, help='Synthetic products per category')
+        parser.add_argument('--rules', type=int, default=50, help='Synthetic incompatibility rules')
+        parser.add_argument('--faqs', type=int, default=20, help='Synthetic FAQ documents')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for the catalog and query generator')
+        parser.add_argument('--k', type=int, default=5, help='Cut-off for recall@k')
+        parser.add_argument(
+            '--modes',
+            nargs='+',
+            default=list(IndexService.RETRIEVAL_MODES),
+            choices=IndexService.RETRIEVAL_MODES,
+            help='Retrieval modes to compare',
+        )
+        # pgvector is left out: its versions share a table with the live index
+        parser.add_argument('--vector-backend', default='numpy', choices=['numpy', 'chroma'])
+        parser.add_argument('--embedding-backend', default='hashing', choices=sorted(EMBEDDING_BACKENDS))
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        catalog = SyntheticCatalog(
+            categories=options['categories'],
+            options=options['options'],
+            products_per_category=options['products_per_category'],
+            rules=options['rules'],
+            faqs=options['faqs'],
+            seed=options['seed'],
+        )
+
+        report = run_benchmark(
+            catalog,
+            k=options['k'],
+            modes=options['modes'],
+            vector_backend=options['vector_backend'],
+            embedding_backend=options['embedding_backend'],
+        )
+        report['seed'] = options['seed']
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(self.style.WARNING(
+            f"{report['catalog']['documents']} documents, {report['embedding_model']} on "
+            f"{report['vector_backend']}, built in {report['build_seconds']:.2f}s (k={report['k']})\n"
+        ))
+        self.stdout.write(f"{'mode':<10}{'task':<20}{'recall@k':>10}{'MRR':>8}{'p50 ms':>10}{'p95 ms':>10}")
+        for mode, tasks in report['modes'].items():
+            for task, result in tasks.items():
+                if task == 'intent':
+                    # One label per query: the recall column holds accuracy
+                    quality = f"{result['accuracy']:>10.3f}{'-':>8}"
+                else:
+                    quality = f"{result['recall_at_k']:>10.3f}{result['mrr']:>8.3f}"
+                self.stdout.write(
+                    f"{mode:<10}{task:<20}{quality}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                )
+
+        self.stdout.write("\n(intent: recall@k column is classification accuracy)")
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f"✓ Results written to {options['output']}"))
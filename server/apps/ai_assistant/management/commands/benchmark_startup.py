@@ -0,0 +1,101 @@
+"""
+Django management command to measure what the AI stack costs a process at startup.
+Each run starts a fresh Python process that sets up Django and loads the URL
+conf like a catalog-only web worker, and reports wall time and peak RSS.
+The "eager" profile additionally imports the LLM/RAG modules that the AI
+views used to import at URL-conf load, for a before/after comparison.
+
+Usage:
+    python manage.py benchmark_startup
+    python manage.py benchmark_startup --runs 10 --json
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+# Modules that apps.ai_assistant.views imported eagerly before the lazy boundary
+EAGER_AI_MODULES = [
+    'apps.ai_assistant.services.agent_service',
+    'apps.ai_assistant.services.rag_service_new',
+    'apps.ai_assistant.orchestration.langgraph_workflow',
+]
+
+HEAVY_MODULES = ['langchain_core', 'langgraph', 'llama_index.core', 'chromadb']
+
+CHILD_SCRIPT = """
+import importlib, json, resource, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+for name in {eager_modules!r}:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": rss_kb / 1024,
+    "heavy_modules": [m for m in {heavy_modules!r} if m in sys.modules],
+}}))
+"""
+
+
+class Command(BaseCommand):
+    help = 'Benchmark startup time and memory of a catalog-only worker with and without the AI stack'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Processes started per profile')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def _run_child(self, eager_modules):
+        script = CHILD_SCRIPT.format(eager_modules=eager_modules, heavy_modules=HEAVY_MODULES)
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'ecommerce_backend.settings')}
+        result = subprocess.run(
+            [sys.executable, '-c', script],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        profiles = {'lazy': [], 'eager': EAGER_AI_MODULES}
+        report = {}
+
+        for name, eager_modules in profiles.items():
+            try:
+                samples = [self._run_child(eager_modules) for _ in range(options['runs'])]
+            except subprocess.CalledProcessError as e:
+                report[name] = {'error': e.stderr.strip().splitlines()[-1] if e.stderr else str(e)}
+                continue
+
+            report[name] = {
+                'startup_p50_s': round(statistics.median(s['seconds'] for s in samples), 3),
+                'rss_p50_mb': round(statistics.median(s['rss_mb'] for s in samples), 1),
+                'heavy_modules': samples[-1]['heavy_modules'],
+            }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(self.style.WARNING(f"Startup of a catalog-only worker ({options['runs']} runs each)\n"))
+        self.stdout.write(f"{'profile':<10}{'p50 s':>10}{'RSS MB':>10}  heavy modules loaded")
+        for name, result in report.items():
+            if 'error' in result:
+                self.stdout.write(self.style.ERROR(f"{name:<10}failed: {result['error'][:80]}"))
+                continue
+            self.stdout.write(
+                f"{name:<10}{result['startup_p50_s']:>10.3f}{result['rss_p50_mb']:>10.1f}  "
+                f"{', '.join(result['heavy_modules']) or 'none'}"
+            )
@@ -2,11 +2,18 @@
 Django management command to build/rebuild the AI knowledge index.
 Run this after adding new products or making database changes.
 
+The build is skipped when the catalog checksum matches the active index
+version, so running it on every container start is cheap.
+
 Usage:
     python manage.py build_ai_index
     python manage.py build_ai_index --rebuild  # Force full rebuild
+    python manage.py build_ai_index --export /snapshots/index.tar.gz
+    python manage.py build_ai_index --import /snapshots/index.tar.gz  # Warm start from a snapshot
 """
 
+import os
+
 from django.core.management.base import BaseCommand
 from apps.ai_assistant.services.index_service import get_index_service
 
@@ -18,23 +25,52 @@ class Command(BaseCommand):
         parser.add_argument(
             '--rebuild',
             action='store_true',
-            help='Force a complete rebuild of the index (deletes existing data)',
+            help='Force a complete rebuild of the index (old versions are removed after the swap)',
+        )
+        parser.add_argument(
+            '--export',
+            metavar='PATH',
+            help='Write the active index version to a snapshot archive',
+        )
+        parser.add_argument(
+            '--import',
+            dest='import_path',
+            metavar='PATH',
+            help='Load a snapshot archive before building (ignored if the file does not exist)',
         )
 
     def handle(self, *args, **options):
-        self.stdout.write(self.style.WARNING('Starting AI index build...'))
-
         index_service = get_index_service()
 
         try:
+            if options['export']:
+                manifest = index_service.export_snapshot(options['export'])
+                self.stdout.write(self.style.SUCCESS(
+                    f"✓ Exported index version {manifest['version']} to {options['export']}"
+                ))
+                return
+
+            import_path = options['import_path']
+            if import_path and not options['rebuild']:
+                if os.path.exists(import_path):
+                    self.stdout.write(self.style.WARNING(f'Importing index snapshot {import_path}...'))
+                    self._import_if_stale(index_service, import_path)
+                else:
+                    self.stdout.write(self.style.WARNING(f'Snapshot {import_path} not found - building instead'))
+
+            self.stdout.write(self.style.WARNING('Starting AI index build...'))
+
             if options['rebuild']:
                 self.stdout.write(self.style.WARNING('Rebuilding index from scratch...'))
-                index_service.rebuild_index()
+                version = index_service.rebuild_index()
             else:
                 self.stdout.write(self.style.WARNING('Building index...'))
-                index_service.build_index()
+                version = index_service.build_index()
 
-            self.stdout.write(self.style.SUCCESS('✓ AI index built successfully!'))
+            if version is None:
+                self.stdout.write(self.style.WARNING('⏭️ No new index version built (another build is running or nothing to index)'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✓ AI index version {version} is active!'))
 
             # Show stats
             stats = index_service.get_stats()
@@ -45,3 +81,23 @@ class Command(BaseCommand):
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'✗ Error building index: {str(e)}'))
             raise
+
+    def _import_if_stale(self, index_service, import_path):
+        """
+        Import the snapshot unless the active version already has its checksum.
+        The build that follows then finds the catalog unchanged and skips
+        embedding; if the catalog moved on since the snapshot, it rebuilds.
+        """
+        active_manifest = index_service._read_manifest(
+            index_service.persist_dir,
+            index_service._get_active_version(index_service.persist_dir)
+        )
+        snapshot_checksum = index_service.read_snapshot_manifest(import_path).get('catalog_checksum')
+
+        if active_manifest and active_manifest.get('catalog_checksum') == snapshot_checksum:
+            self.stdout.write(self.style.SUCCESS('✓ Active index already matches the snapshot'))
+            return
+
+        version = index_service.import_snapshot(import_path)
+        if version is not None:
+            self.stdout.write(self.style.SUCCESS(f'✓ Snapshot imported as index version {version}'))
@@ -0,0 +1,46 @@
+"""
+Django management command to run the shared retrieval daemon.
+Workers use it when AI_RETRIEVAL_SERVICE_URL points at its address.
+
+Usage:
+    python manage.py run_retrieval_server                       # http://127.0.0.1:8765
+    python manage.py run_retrieval_server --socket /tmp/ai_retrieval.sock
+"""
+
+from django.core.management.base import BaseCommand
+from apps.ai_assistant.services.index_service import IndexService
+from apps.ai_assistant.services.retrieval_server import RetrievalServer
+
+
+class Command(BaseCommand):
+    help = 'Serve AI index retrieval to all workers from one process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Address to bind (TCP mode)')
+        parser.add_argument('--port', type=int, default=8765, help='Port to bind (TCP mode)')
+        parser.add_argument('--socket', help='Serve on this Unix socket instead of TCP')
+        parser.add_argument('--max-batch', type=int, default=32, help='Maximum queries per batch')
+        parser.add_argument('--max-wait-ms', type=float, default=5, help='How long a batch waits to fill up')
+        parser.add_argument('--verbose', action='store_true', help='Log every request')
+
+    def handle(self, *args, **options):
+        # Always in-process: the daemon is what client-mode workers talk to
+        index_service = IndexService(service_url="")
+
+        server = RetrievalServer(
+            index_service,
+            host=options['host'],
+            port=options['port'],
+            socket_path=options['socket'],
+            max_batch=options['max_batch'],
+            max_wait_ms=options['max_wait_ms'],
+            verbose=options['verbose'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Retrieval server listening on {server.address}'))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Shutting down retrieval server...'))
+        finally:
+            server.shutdown()
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:31
+
+import pgvector.django.indexes
+import pgvector.django.vector
+from pgvector.django import VectorExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_assistant', '0001_initial'),
+    ]
+
+    operations = [
+        VectorExtension(),
+        migrations.AddField(
+            model_name='aiembeddeddocument',
+            name='embedding',
+            field=pgvector.django.vector.VectorField(blank=True, dimensions=768, null=True),
+        ),
+        migrations.AddField(
+            model_name='aiembeddeddocument',
+            name='node_id',
+            field=models.CharField(blank=True, help_text='LlamaIndex node ID (set for rows written by the pgvector index)', max_length=255, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='aiembeddeddocument',
+            name='ref_doc_id',
+            field=models.CharField(blank=True, db_index=True, help_text='Source document key, e.g. product_12', max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='aiembeddeddocument',
+            name='document_type',
+            field=models.CharField(choices=[('product', 'Preconfigured Product'), ('part', 'Part'), ('part_option', 'Part Option'), ('category', 'Category'), ('compatibility_rule', 'Compatibility Rule'), ('incompatibility_rule', 'Incompatibility Rule'), ('price_adjustment_rule', 'Price Adjustment Rule'), ('shipping_config', 'Shipping Configuration'), ('shipping_zone', 'Shipping Zone'), ('faq', 'FAQ')], max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='aiembeddeddocument',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding'], m=16, name='ai_embedded_doc_hnsw_idx', opclasses=['vector_cosine_ops']),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_assistant', '0002_pgvector_embeddings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiembeddeddocument',
+            name='index_version',
+            field=models.CharField(blank=True, db_index=True, help_text='Index build this row belongs to (blue/green rebuilds)', max_length=32, null=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+from pgvector.django import HnswIndex, VectorField
 from apps.customers.models import Customer
 
 
@@ -67,21 +68,52 @@ class AIEmbeddedDocument(models.Model):
     """
     Stores document embeddings for RAG (Retrieval Augmented Generation).
     Documents are chunks of product information, part descriptions, etc.
+
+    Rows written by the pgvector index backend have a node_id; rows without
+    one are admin-authored knowledge (FAQs) that get loaded into the index.
     """
     DOCUMENT_TYPE_CHOICES = [
         ('product', 'Preconfigured Product'),
+        ('part', 'Part'),
         ('part_option', 'Part Option'),
         ('category', 'Category'),
         ('compatibility_rule', 'Compatibility Rule'),
+        ('incompatibility_rule', 'Incompatibility Rule'),
+        ('price_adjustment_rule', 'Price Adjustment Rule'),
+        ('shipping_config', 'Shipping Configuration'),
+        ('shipping_zone', 'Shipping Zone'),
         ('faq', 'FAQ'),
     ]
 
+    # Must match the embedding model (nomic-embed-text produces 768 dimensions)
+    EMBEDDING_DIMENSIONS = 768
+
     document_type = models.CharField(max_length=50, choices=DOCUMENT_TYPE_CHOICES)
     document_id = models.IntegerField(help_text="ID of the source document")
     content = models.TextField(help_text="Text content to be embedded")
 
-    # Vector embedding will be added after pgvector is set up
-    # embedding = VectorField(dimensions=1536)  # For OpenAI embeddings
+    node_id = models.CharField(
+        max_length=255,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text="LlamaIndex node ID (set for rows written by the pgvector index)"
+    )
+    ref_doc_id = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="Source document key, e.g. product_12"
+    )
+    index_version = models.CharField(
+        max_length=32,
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="Index build this row belongs to (blue/green rebuilds)"
+    )
+    embedding = VectorField(dimensions=EMBEDDING_DIMENSIONS, null=True, blank=True)
 
     metadata = models.JSONField(
         default=dict,
@@ -95,8 +127,14 @@ class AIEmbeddedDocument(models.Model):
         indexes = [
             models.Index(fields=['document_type', 'document_id']),
             models.Index(fields=['document_type']),
+            HnswIndex(
+                name='ai_embedded_doc_hnsw_idx',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
         ]
-        # Vector index will be added via migration after pgvector setup
 
     def __str__(self):
         return f"{self.document_type}:{self.document_id} - {self.content[:50]}..."
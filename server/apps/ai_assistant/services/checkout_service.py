@@ -13,7 +13,8 @@ from django.db import transaction
 from apps.orders.models import Orders, OrderProduct, OrderItem, ShippingAddress
 from apps.customers.models import Customer
 from apps.products.models import PartOption
-from apps.preconfigured_products.models import PreConfiguredProduct
+from apps.products.reservations import convert_stock_holds, hold_stock, release_stock_hold, retry_on_lock_conflict
+from apps.preconfigured_products.models import PreConfiguredProduct, PreConfiguredProductParts
 from .cart_service import get_cart_service
 
 
@@ -48,6 +49,13 @@ class CheckoutService:
         if not cart.get('items') or cart.get('item_count', 0) == 0:
             raise ValueError("Cannot checkout with empty cart")
 
+        # Hold the cart's stock for the checkout (InsufficientStock is a ValueError);
+        # a restarted checkout gives up its previous hold first
+        previous = self.get_checkout_session(session_id)
+        if previous and previous.get('stock_hold'):
+            release_stock_hold(previous['stock_hold'])
+        hold_token, hold_expires_at, _ = hold_stock(self.cart_stock_demand(cart['items']))
+
         checkout_data = {
             'session_id': session_id,
             'status': 'collecting_address',
@@ -58,6 +66,8 @@ class CheckoutService:
             'shipping_method': None,
             'shipping_cost': '0',
             'order_id': None,
+            'stock_hold': str(hold_token),
+            'stock_hold_expires_at': hold_expires_at.isoformat(),
             'created_at': datetime.now().isoformat(),
             'updated_at': datetime.now().isoformat()
         }
@@ -116,6 +126,35 @@ class CheckoutService:
         key = f"checkout:{session_id}"
         self.redis_client.delete(key)
 
+    # ========== Stock ==========
+
+    def cart_stock_demand(self, cart_items: List[Dict]) -> Dict[int, int]:
+        """
+        Units of each part option the cart takes out of stock
+
+        Configured items use their configuration's options; preconfigured
+        products without one use the product's parts.
+        """
+        demand = {}
+        preconfigured_quantities = {}
+        for cart_item in cart_items:
+            quantity = int(cart_item.get('quantity', 1))
+            configuration = cart_item.get('configuration', {})
+            if configuration and isinstance(configuration, dict):
+                for option_data in configuration.values():
+                    option_id = option_data.get('id') if isinstance(option_data, dict) else option_data
+                    if option_id:
+                        demand[int(option_id)] = demand.get(int(option_id), 0) + quantity
+            elif cart_item.get('product_id'):
+                product_id = int(cart_item['product_id'])
+                preconfigured_quantities[product_id] = preconfigured_quantities.get(product_id, 0) + quantity
+
+        for product_id, option_id in PreConfiguredProductParts.objects.filter(
+            preconfigured_product_id__in=preconfigured_quantities
+        ).values_list('preconfigured_product_id', 'part_option_id'):
+            demand[option_id] = demand.get(option_id, 0) + preconfigured_quantities[product_id]
+        return demand
+
     # ========== Address Handling ==========
 
     def validate_address(self, address_data: Dict) -> Tuple[bool, str]:
@@ -263,6 +302,7 @@ class CheckoutService:
 
     # ========== Order Creation ==========
 
+    @retry_on_lock_conflict
     @transaction.atomic
     def create_order_from_cart(
         self,
@@ -318,11 +358,12 @@ class CheckoutService:
                 except PreConfiguredProduct.DoesNotExist:
                     pass
 
-            # Create OrderProduct
+            # Create OrderProduct; its items describe one unit
             order_product = OrderProduct.objects.create(
                 order=order,
                 preconfigured_product=preconfigured_product,
-                base_product_name=cart_item.get('name', 'Custom Product')
+                base_product_name=cart_item.get('name', 'Custom Product'),
+                quantity=int(cart_item.get('quantity', 1))
             )
 
             # For configured products, create OrderItems for each part
@@ -352,13 +393,12 @@ class CheckoutService:
             else:
                 # For simple products without configuration, create a single OrderItem
                 unit_price = Decimal(str(cart_item.get('price', 0)))
-                quantity = cart_item.get('quantity', 1)
 
                 OrderItem.objects.create(
                     order_product=order_product,
                     part_name='Product',
                     option_name=cart_item.get('name', 'Item'),
-                    final_price=unit_price * quantity,
+                    final_price=unit_price,
                     minimum_payment_required=Decimal('0.00')
                 )
 
@@ -367,6 +407,10 @@ class CheckoutService:
         order.minimum_required_amount = minimum_required
         order.save()
 
+        # Consume the checkout's stock holds last; rolls the order back if stock ran out
+        checkout = self.get_checkout_session(session_id) or {}
+        convert_stock_holds(order, self.cart_stock_demand(cart_items), checkout.get('stock_hold'))
+
         # Update checkout session with order ID
         self.update_checkout_session(session_id, {
             'order_id': order.id,
@@ -1,14 +1,24 @@
 """
 LlamaIndex Document Loaders for Django Models
 Automatically converts Django database models into LlamaIndex documents for RAG
+
+Loaders stream documents: counts and stock flags come from annotations and
+prefetches, and querysets are read with .iterator(chunk_size=...), so a
+full load runs a fixed number of queries per chunk and never holds more
+than one chunk of model instances in memory.
 """
 
-from typing import List
+from typing import Iterator, List
+from django.db.models import Count, Exists, OuterRef, Prefetch
 from llama_index.core import Document
 from apps.products.models import Category, Part, PartOption, Stock
-from apps.preconfigured_products.models import PreConfiguredProduct
+from apps.preconfigured_products.models import PreConfiguredProduct, PreConfiguredProductParts
 from apps.configurator.models import IncompatibilityRule, PriceAdjustmentRule
-from apps.shipping.models import ShippingZone, ShippingRate, ShippingConstants, ZoneArea
+from apps.shipping.models import ShippingZone, ShippingRate, ShippingConstants
+
+
+# Rows fetched per database round trip (prefetches run once per chunk)
+CHUNK_SIZE = 2000
 
 
 class CategoryDocumentLoader:
@@ -17,15 +27,20 @@ class CategoryDocumentLoader:
     No hardcoded categories - discovers everything from database!
     """
 
-    @staticmethod
-    def load() -> List[Document]:
+    @classmethod
+    def load(cls) -> List[Document]:
         """Load all categories as documents"""
-        documents = []
-        categories = Category.objects.all()
+        return list(cls.stream())
+
+    @staticmethod
+    def stream() -> Iterator[Document]:
+        """Yield one document per category"""
+        categories = Category.objects.annotate(
+            parts_count=Count('parts')
+        ).order_by('id').iterator(chunk_size=CHUNK_SIZE)
 
         for category in categories:
-            # Get part count for this category
-            parts_count = Part.objects.filter(category=category).count()
+            parts_count = category.parts_count
 
             # Build rich text content for embedding with shipping details
             shipping_info = ""
@@ -62,9 +77,7 @@ Customers can browse and customize products in this category.
                     "parts_count": parts_count
                 }
             )
-            documents.append(doc)
-
-        return documents
+            yield doc
 
 
 class ProductDocumentLoader:
@@ -73,13 +86,22 @@ class ProductDocumentLoader:
     These are pre-built products that customers can customize.
     """
 
-    @staticmethod
-    def load() -> List[Document]:
+    @classmethod
+    def load(cls) -> List[Document]:
         """Load all preconfigured products as documents"""
-        documents = []
+        return list(cls.stream())
+
+    @staticmethod
+    def stream() -> Iterator[Document]:
+        """Yield one document per preconfigured product"""
         products = PreConfiguredProduct.objects.select_related('category').prefetch_related(
-            'parts__part_option__part'
-        ).all()
+            Prefetch(
+                'parts',
+                queryset=PreConfiguredProductParts.objects.select_related(
+                    'part_option__part'
+                ).order_by('id')
+            )
+        ).order_by('id').iterator(chunk_size=CHUNK_SIZE)
 
         for product in products:
             # Build detailed product description
@@ -116,9 +138,7 @@ or customize by changing individual parts. The base price includes all listed co
                     "base_price": float(product.base_price)
                 }
             )
-            documents.append(doc)
-
-        return documents
+            yield doc
 
 
 class PartOptionDocumentLoader:
@@ -127,18 +147,29 @@ class PartOptionDocumentLoader:
     This helps the AI understand what customization options are available.
     """
 
-    @staticmethod
-    def load() -> List[Document]:
+    @classmethod
+    def load(cls) -> List[Document]:
         """Load all part options as documents"""
-        documents = []
-        parts = Part.objects.select_related('category').prefetch_related('options').all()
+        return list(cls.stream())
+
+    @staticmethod
+    def stream() -> Iterator[Document]:
+        """Yield one document per part, listing its options with stock status"""
+        options = PartOption.objects.annotate(
+            in_stock=Exists(
+                Stock.objects.filter(part_option=OuterRef('pk'), quantity__gt=0)
+            )
+        ).order_by('id')
+
+        parts = Part.objects.select_related('category').prefetch_related(
+            Prefetch('options', queryset=options)
+        ).order_by('id').iterator(chunk_size=CHUNK_SIZE)
 
         for part in parts:
+            part_options = part.options.all()
             options_description = []
-            for option in part.options.all():
-                # Check stock
-                in_stock = Stock.objects.filter(part_option=option, quantity__gt=0).exists()
-                stock_status = "In Stock" if in_stock else "Out of Stock"
+            for option in part_options:
+                stock_status = "In Stock" if option.in_stock else "Out of Stock"
 
                 options_description.append(
                     f"- {option.name}: ${option.default_price} ({stock_status})"
@@ -165,12 +196,10 @@ Customers must select one option from this part type when building their product
                     "category_id": part.category.id,
                     "category_name": part.category.name,
                     "step": part.step,
-                    "options_count": part.options.count()
+                    "options_count": len(part_options)
                 }
             )
-            documents.append(doc)
-
-        return documents
+            yield doc
 
 
 class RulesDocumentLoader:
@@ -179,16 +208,19 @@ class RulesDocumentLoader:
     This teaches the AI about product configuration rules and pricing logic.
     """
 
-    @staticmethod
-    def load() -> List[Document]:
+    @classmethod
+    def load(cls) -> List[Document]:
         """Load all compatibility and pricing rules as documents"""
-        documents = []
+        return list(cls.stream())
 
+    @staticmethod
+    def stream() -> Iterator[Document]:
+        """Yield one document per incompatibility rule and price adjustment rule"""
         # Load incompatibility rules
         incompatibility_rules = IncompatibilityRule.objects.select_related(
             'part_option__part',
             'incompatible_with_option__part'
-        ).all()
+        ).order_by('id').iterator(chunk_size=CHUNK_SIZE)
 
         for rule in incompatibility_rules:
             content = f"""
@@ -213,13 +245,13 @@ This is an important configuration constraint.
                     "rule_message": rule.message
                 }
             )
-            documents.append(doc)
+            yield doc
 
         # Load price adjustment rules
         price_rules = PriceAdjustmentRule.objects.select_related(
             'condition_option__part',
             'affected_option__part'
-        ).all()
+        ).order_by('id').iterator(chunk_size=CHUNK_SIZE)
 
         for rule in price_rules:
             adjustment_type = "discount" if float(rule.adjusted_price) < 0 else "premium"
@@ -246,9 +278,7 @@ This is a special pricing rule that affects the final product price.
                     "adjustment_type": adjustment_type
                 }
             )
-            documents.append(doc)
-
-        return documents
+            yield doc
 
 
 class ShippingDocumentLoader:
@@ -257,11 +287,14 @@ class ShippingDocumentLoader:
     This teaches the AI about delivery options, costs, and logistics.
     """
 
-    @staticmethod
-    def load() -> List[Document]:
+    @classmethod
+    def load(cls) -> List[Document]:
         """Load shipping information as documents"""
-        documents = []
+        return list(cls.stream())
 
+    @staticmethod
+    def stream() -> Iterator[Document]:
+        """Yield the shipping configuration and one document per zone"""
         # Load shipping constants
         try:
             constants = ShippingConstants.get_instance()
@@ -299,12 +332,17 @@ Use these limits to determine the most appropriate delivery method for customer
                     "extra_care_fee": float(constants.extra_care_fee_ugx)
                 }
             )
-            documents.append(doc)
         except Exception as e:
+            doc = None
             print(f"Warning: Could not load shipping constants: {e}")
-
-        # Load shipping zones with rates
-        zones = ShippingZone.objects.prefetch_related('areas', 'rates').all()
+        if doc is not None:
+            yield doc
+
+        # Load shipping zones with their active rates
+        zones = ShippingZone.objects.prefetch_related(
+            'areas',
+            Prefetch('rates', queryset=ShippingRate.objects.filter(is_active=True), to_attr='active_rates')
+        ).order_by('distance_range_min_km', 'id').iterator(chunk_size=CHUNK_SIZE)
         for zone in zones:
             # Build area list
             areas = zone.areas.all()
@@ -313,7 +351,7 @@ Use these limits to determine the most appropriate delivery method for customer
 
             # Build rates information
             rates_info = []
-            for rate in zone.rates.filter(is_active=True):
+            for rate in zone.active_rates:
                 delivery_time = f"{rate.min_delivery_hours}-{rate.max_delivery_hours} hours" if rate.min_delivery_hours else "Standard timing"
                 rates_info.append(
                     f"  - {rate.get_delivery_method_display()} ({rate.get_service_level_display()}): "
@@ -351,9 +389,7 @@ Use this information to calculate shipping costs and delivery times.
                     "distance_max_km": float(zone.distance_range_max_km)
                 }
             )
-            documents.append(doc)
-
-        return documents
+            yield doc
 
 
 class KnowledgeDocumentLoader:
@@ -362,15 +398,21 @@ class KnowledgeDocumentLoader:
     This allows admins to teach the AI about business policies, common questions, etc.
     """
 
-    @staticmethod
-    def load() -> List[Document]:
+    @classmethod
+    def load(cls) -> List[Document]:
         """Load FAQ and business knowledge documents"""
+        return list(cls.stream())
+
+    @staticmethod
+    def stream() -> Iterator[Document]:
+        """Yield one document per admin-authored FAQ"""
         from apps.ai_assistant.models import AIEmbeddedDocument
 
-        documents = []
+        # Rows with a node_id are index entries written by the pgvector backend
         knowledge_docs = AIEmbeddedDocument.objects.filter(
-            document_type='faq'
-        ).all()
+            document_type='faq',
+            node_id__isnull=True
+        ).defer('embedding').order_by('id').iterator(chunk_size=CHUNK_SIZE)
 
         for doc_model in knowledge_docs:
             doc = Document(
@@ -382,9 +424,7 @@ class KnowledgeDocumentLoader:
                     **doc_model.metadata
                 }
             )
-            documents.append(doc)
-
-        return documents
+            yield doc
 
 
 class MasterDocumentLoader:
@@ -393,28 +433,38 @@ class MasterDocumentLoader:
     This is the main entry point for indexing all knowledge.
     """
 
+    LOADERS = [
+        CategoryDocumentLoader,
+        ProductDocumentLoader,
+        PartOptionDocumentLoader,
+        RulesDocumentLoader,
+        ShippingDocumentLoader,
+        KnowledgeDocumentLoader
+    ]
+
     @staticmethod
-    def load_all() -> List[Document]:
-        """Load all documents from all sources"""
-        all_documents = []
-
-        # Load from each loader
-        loaders = [
-            CategoryDocumentLoader,
-            ProductDocumentLoader,
-            PartOptionDocumentLoader,
-            RulesDocumentLoader,
-            ShippingDocumentLoader,
-            KnowledgeDocumentLoader
-        ]
-
-        for loader_class in loaders:
+    def stream_all() -> Iterator[Document]:
+        """
+        Yield documents from all sources in a stable order.
+        A failing loader is reported and skipped; documents it already
+        yielded are kept.
+        """
+        total = 0
+
+        for loader_class in MasterDocumentLoader.LOADERS:
+            count = 0
             try:
-                documents = loader_class.load()
-                all_documents.extend(documents)
-                print(f"✓ Loaded {len(documents)} documents from {loader_class.__name__}")
+                for document in loader_class.stream():
+                    count += 1
+                    yield document
+                print(f"✓ Loaded {count} documents from {loader_class.__name__}")
             except Exception as e:
                 print(f"✗ Error loading from {loader_class.__name__}: {str(e)}")
+            total += count
 
-        print(f"\nTotal documents loaded: {len(all_documents)}")
-        return all_documents
+        print(f"\nTotal documents loaded: {total}")
+
+    @staticmethod
+    def load_all() -> List[Document]:
+        """Load all documents from all sources"""
+        return list(MasterDocumentLoader.stream_all())
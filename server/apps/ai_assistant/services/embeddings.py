@@ -0,0 +1,285 @@
+"""
+Embedding backends for the AI knowledge index
+The backend is chosen with settings.AI_EMBEDDING_BACKEND:
+- "ollama": nomic-embed-text served by a local Ollama instance
+- "hashing": in-process hashing vectorizer with TF-IDF weighting and optional
+  SVD, fitted on the catalog. Needs no network, so the retrieval stack can
+  run in CI, on edge deployments and in load tests.
+"""
+
+import json
+import math
+import os
+import zlib
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import requests
+from django.conf import settings as django_settings
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.embeddings import BaseEmbedding
+
+from .lexical_index import tokenize
+
+
+class EmbeddingUnavailableError(RuntimeError):
+    """Raised when the embedding backend cannot produce an embedding"""
+
+
+class OllamaEmbedding(BaseEmbedding):
+    """
+    Custom embedding class that uses local Ollama API for embeddings.
+    This allows us to use free, local embeddings instead of OpenAI.
+    """
+
+    model_name: str = "nomic-embed-text"
+    _base_url: str = "http://host.docker.internal:11434"
+    _embed_dim: int = 768  # nomic-embed-text dimension
+
+    def __init__(
+        self,
+        model_name: str = "nomic-embed-text",
+        base_url: str = "http://host.docker.internal:11434",
+        **kwargs
+    ):
+        super().__init__(model_name=model_name, **kwargs)
+        self._base_url = base_url
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "OllamaEmbedding"
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        """Get embedding for a query."""
+        return self._get_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        """Get embedding for a text."""
+        return self._get_embedding(text)
+
+    def _get_embedding(self, text: str) -> List[float]:
+        """
+        Call Ollama API to get embedding.
+        Failures raise instead of returning a placeholder vector: a zero
+        vector would be stored in the index or ranked as if it were a real
+        query, returning arbitrary documents.
+        """
+        try:
+            response = requests.post(
+                f"{self._base_url}/api/embeddings",
+                json={
+                    "model": self.model_name,
+                    "prompt": text
+                },
+                timeout=30
+            )
+            response.raise_for_status()
+            result = response.json()
+            return result["embedding"]
+        except Exception as e:
+            print(f"⚠️ Ollama embedding failed: {str(e)[:100]}")
+            raise EmbeddingUnavailableError(f"Ollama embedding failed: {e}") from e
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        """Async version - falls back to sync for now."""
+        return self._get_query_embedding(query)
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        """Async version - falls back to sync for now."""
+        return self._get_text_embedding(text)
+
+
+class HashingEmbedding(BaseEmbedding):
+    """
+    CPU embedder: hashed word, bigram and character-trigram features with
+    sublinear TF and IDF weights learned from the catalog.
+
+    Without SVD features are hashed straight into `dimensions` buckets.
+    With `svd=True` they are hashed into `hash_features` buckets and projected
+    onto the top `dimensions` singular vectors of the catalog's TF-IDF matrix
+    (randomized SVD in NumPy), which groups co-occurring terms.
+
+    The fitted state belongs to one index version: the index service saves
+    it next to the version manifest and loads it with the version.
+    """
+
+    model_name: str = "hashing-tfidf"
+    dimensions: int = 768
+    svd: bool = False
+    hash_features: int = 2 ** 13
+    seed: int = 42
+
+    _idf: Optional[np.ndarray] = PrivateAttr(default=None)
+    _components: Optional[np.ndarray] = PrivateAttr(default=None)
+
+    def __init__(self, dimensions: int = 768, svd: bool = False, **kwargs):
+        suffix = "-svd" if svd else ""
+        super().__init__(
+            model_name=f"hashing-tfidf{suffix}-{dimensions}",
+            dimensions=dimensions,
+            svd=svd,
+            **kwargs
+        )
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "HashingEmbedding"
+
+    @property
+    def feature_space(self) -> int:
+        return self.hash_features if self.svd else self.dimensions
+
+    @property
+    def is_fitted(self) -> bool:
+        return self._idf is not None
+
+    # ---------- Features ----------
+
+    @staticmethod
+    def _features(text: str) -> Counter:
+        """Word unigrams, word bigrams and character trigrams (robust to typos)"""
+        terms = tokenize(text)
+        features = Counter(terms)
+        features.update(f"{a} {b}" for a, b in zip(terms, terms[1:]))
+        for term in terms:
+            padded = f"#{term}#"
+            features.update(f"~{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def _hashed(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse (bucket indices, signed sublinear TF) for a text, without IDF"""
+        buckets: Dict[int, float] = {}
+        space = self.feature_space
+        for feature, count in self._features(text).items():
+            h = zlib.crc32(feature.encode("utf-8"))
+            sign = -1.0 if h & 0x80000000 else 1.0
+            index = h % space
+            buckets[index] = buckets.get(index, 0.0) + sign * (1.0 + math.log(count))
+        if not buckets:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return np.fromiter(buckets.keys(), dtype=np.int64), np.fromiter(buckets.values(), dtype=np.float32)
+
+    def _weighted(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        indices, values = self._hashed(text)
+        if self._idf is not None and len(indices):
+            values = values * self._idf[indices]
+        norm = np.linalg.norm(values)
+        return indices, (values / norm if norm > 0 else values)
+
+    # ---------- Fitting ----------
+
+    def fit(self, texts: Iterable[str], oversample: int = 10) -> "HashingEmbedding":
+        """Learn IDF weights (and SVD components) from the catalog texts"""
+        texts = list(texts)
+        self._idf = None
+        self._components = None
+
+        doc_freq = np.zeros(self.feature_space, dtype=np.float64)
+        for text in texts:
+            doc_freq[self._hashed(text)[0]] += 1
+        self._idf = (np.log((1 + len(texts)) / (1 + doc_freq)) + 1).astype(np.float32)
+
+        if self.svd and texts:
+            self._components = self._randomized_svd([self._weighted(text) for text in texts], oversample)
+
+        return self
+
+    def _randomized_svd(self, rows: List[Tuple[np.ndarray, np.ndarray]], oversample: int) -> np.ndarray:
+        """Top right singular vectors of the sparse TF-IDF matrix (Halko et al.)"""
+        rank = min(self.dimensions, len(rows))
+        rng = np.random.default_rng(self.seed)
+        omega = rng.standard_normal((self.hash_features, rank + oversample)).astype(np.float32)
+
+        sample = np.zeros((len(rows), rank + oversample), dtype=np.float32)
+        for i, (indices, values) in enumerate(rows):
+            sample[i] = values @ omega[indices]
+        basis, _ = np.linalg.qr(sample)
+
+        projected = np.zeros((basis.shape[1], self.hash_features), dtype=np.float32)
+        for i, (indices, values) in enumerate(rows):
+            projected[:, indices] += np.outer(basis[i], values)
+
+        _, _, vt = np.linalg.svd(projected, full_matrices=False)
+        return np.ascontiguousarray(vt[:rank], dtype=np.float32)
+
+    def save(self, path: str):
+        """Write the fitted state (atomically)"""
+        if not self.is_fitted:
+            raise ValueError("HashingEmbedding is not fitted")
+        arrays = {"idf": self._idf}
+        if self._components is not None:
+            arrays["components"] = self._components
+        params = {"dimensions": self.dimensions, "svd": self.svd, "hash_features": self.hash_features}
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, params=np.array(json.dumps(params)), **arrays)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> "HashingEmbedding":
+        """Load a fitted state written by save()"""
+        with np.load(path) as data:
+            params = json.loads(str(data["params"]))
+            if params["dimensions"] != self.dimensions or params["svd"] != self.svd:
+                raise ValueError(f"Embedder state {path} was fitted with different settings: {params}")
+            self.hash_features = params["hash_features"]
+            self._idf = data["idf"]
+            self._components = data["components"] if "components" in data else None
+        return self
+
+    # ---------- Embedding ----------
+
+    def _embed(self, text: str) -> List[float]:
+        indices, values = self._weighted(text)
+        if self._components is not None:
+            vector = np.zeros(self.dimensions, dtype=np.float32)
+            projected = self._components[:, indices] @ values
+            vector[:len(projected)] = projected
+        else:
+            vector = np.zeros(self.dimensions, dtype=np.float32)
+            np.add.at(vector, indices, values)
+
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm > 0 else vector).tolist()
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._embed(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._embed(query)
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def _ollama_backend() -> BaseEmbedding:
+    print("🔧 Using Ollama for embeddings (host.docker.internal:11434)")
+    return OllamaEmbedding(
+        model_name="nomic-embed-text",
+        base_url="http://host.docker.internal:11434"
+    )
+
+
+def _hashing_backend() -> BaseEmbedding:
+    svd = getattr(django_settings, 'AI_HASHING_EMBEDDING_SVD', False)
+    print(f"🔧 Using in-process hashing TF-IDF embeddings{' with SVD' if svd else ''}")
+    return HashingEmbedding(svd=svd)
+
+
+# Embedding backend registry: name -> factory
+EMBEDDING_BACKENDS: Dict[str, Callable[[], BaseEmbedding]] = {
+    "ollama": _ollama_backend,
+    "hashing": _hashing_backend,
+}
+
+
+def get_embedding_model(backend: str = None) -> BaseEmbedding:
+    """Create the embedding model for the given (or configured) backend"""
+    backend = backend or getattr(django_settings, 'AI_EMBEDDING_BACKEND', 'ollama')
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    return EMBEDDING_BACKENDS[backend]()
@@ -3,94 +3,127 @@ LlamaIndex Service for Product Knowledge Retrieval
 Manages vector index, embeddings, and semantic search
 """
 
+import hashlib
+import io
+import itertools
+import json
 import os
-import requests
-from typing import List, Dict, Optional
+import shutil
+import tarfile
+import time
+import uuid
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+from django.conf import settings as django_settings
+from django.core.cache import cache
 from llama_index.core import VectorStoreIndex, StorageContext, Settings
 from llama_index.core.retrievers import VectorIndexRetriever
 from llama_index.core.query_engine import RetrieverQueryEngine
 from llama_index.core.embeddings import BaseEmbedding
+from llama_index.core.vector_stores import (
+    MetadataFilter,
+    MetadataFilters,
+    FilterCondition,
+    FilterOperator,
+)
+from llama_index.core.schema import NodeWithScore, TextNode
+from llama_index.core.vector_stores.types import VectorStoreQuery
+from llama_index.core.vector_stores.utils import metadata_dict_to_node
 from llama_index.llms.anthropic import Anthropic
 from llama_index.vector_stores.chroma import ChromaVectorStore
 import chromadb
 
 from .document_loaders import MasterDocumentLoader
+from .embeddings import HashingEmbedding, get_embedding_model
+from .lexical_index import BM25Index, reciprocal_rank_fusion
+from .numpy_vector_store import NumpyVectorStore
+from .pgvector_store import PgVectorStore
+from .retrieval_client import RetrievalClient
 
 
-class OllamaEmbedding(BaseEmbedding):
+class IndexService:
     """
-    Custom embedding class that uses local Ollama API for embeddings.
-    This allows us to use free, local embeddings instead of OpenAI.
+    Manages LlamaIndex for product knowledge retrieval.
+    No hardcoded knowledge - everything is loaded dynamically from Django models!
     """
 
-    model_name: str = "nomic-embed-text"
-    _base_url: str = "http://host.docker.internal:11434"
-    _embed_dim: int = 768  # nomic-embed-text dimension
+    # Default number of documents returned by each typed search.
+    # Filters are pushed down into the vector store, so these are per-type limits.
+    PRODUCT_TOP_K = 5
+    CATEGORY_TOP_K = 3
+    PART_TOP_K = 5
+    RULE_TOP_K = 5
+
+    # Retrieval modes: "hybrid" (BM25 + vector fused with RRF), "vector", "lexical"
+    RETRIEVAL_MODES = ("hybrid", "vector", "lexical")
+
+    # Each ranker contributes this many candidates per requested result before fusion
+    FUSION_CANDIDATE_FACTOR = 3
+
+    # Bumped after every build so other processes re-sync their lexical index
+    LEXICAL_VERSION_CACHE_KEY = 'ai_lexical_index_version'
+
+    # Vector store backends: "chroma" (ChromaDB collection), "numpy" (memory-mapped
+    # matrix) or "pgvector" (ai_embedded_document table in Postgres)
+    VECTOR_BACKENDS = ("chroma", "numpy", "pgvector")
+    COLLECTION_NAME = "marcus_ecommerce_knowledge"
+    NUMPY_INDEX_DIR = "numpy_index"
+
+    # Blue/green rebuilds: every build writes a new index version and then
+    # flips this alias; serving workers follow it on their next query
+    ACTIVE_VERSION_CACHE_KEY = 'ai_index_active_version'
+    REBUILD_LOCK_CACHE_KEY = 'ai_index_rebuild_lock'
+    REBUILD_LOCK_TIMEOUT = 60 * 30
+    # Versions kept after a build (the active one plus fallbacks for lagging workers)
+    KEEP_VERSIONS = 2
+
+    # Each version records the catalog checksum it was built from, so
+    # unchanged catalogs are not re-embedded (e.g. on every container start)
+    MANIFEST_DIR = "manifests"
+    SNAPSHOT_FORMAT = 1
+    SNAPSHOT_BATCH_SIZE = 500
+
+    # Documents parsed and embedded per step while streaming a build
+    BUILD_BATCH_SIZE = 256
 
     def __init__(
         self,
-        model_name: str = "nomic-embed-text",
-        base_url: str = "http://host.docker.internal:11434",
-        **kwargs
+        persist_dir: str = "./chroma_db",
+        retrieval_mode: str = None,
+        vector_backend: str = None,
+        service_url: str = None,
+        embedding_backend: str = None
     ):
-        super().__init__(model_name=model_name, **kwargs)
-        self._base_url = base_url
-
-    @classmethod
-    def class_name(cls) -> str:
-        return "OllamaEmbedding"
-
-    def _get_query_embedding(self, query: str) -> List[float]:
-        """Get embedding for a query."""
-        return self._get_embedding(query)
-
-    def _get_text_embedding(self, text: str) -> List[float]:
-        """Get embedding for a text."""
-        return self._get_embedding(text)
-
-    def _get_embedding(self, text: str) -> List[float]:
-        """Call Ollama API to get embedding."""
-        try:
-            response = requests.post(
-                f"{self._base_url}/api/embeddings",
-                json={
-                    "model": self.model_name,
-                    "prompt": text
-                },
-                timeout=30
-            )
-            response.raise_for_status()
-            result = response.json()
-            return result["embedding"]
-        except Exception as e:
-            print(f"⚠️ Ollama embedding failed: {str(e)[:100]}")
-            # Return zero vector as fallback
-            return [0.0] * self._embed_dim
-
-    async def _aget_query_embedding(self, query: str) -> List[float]:
-        """Async version - falls back to sync for now."""
-        return self._get_query_embedding(query)
-
-    async def _aget_text_embedding(self, text: str) -> List[float]:
-        """Async version - falls back to sync for now."""
-        return self._get_text_embedding(text)
-
-
-class IndexService:
-    """
-    Manages LlamaIndex for product knowledge retrieval.
-    No hardcoded knowledge - everything is loaded dynamically from Django models!
-    """
-
-    def __init__(self, persist_dir: str = "./chroma_db"):
         self.persist_dir = persist_dir
         self.index = None
         self.query_engine = None
         self.retriever = None
+        self.active_version = None
+        self.embed_model: Optional[BaseEmbedding] = None
+        self.embedding_backend = embedding_backend
         self._settings_initialized = False
 
-        # Auto-load existing index if it exists
-        if os.path.exists(persist_dir):
+        self.vector_backend = vector_backend or getattr(django_settings, 'AI_VECTOR_BACKEND', 'chroma')
+        if self.vector_backend not in self.VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector backend: {self.vector_backend}")
+
+        self.retrieval_mode = retrieval_mode or getattr(django_settings, 'AI_RETRIEVAL_MODE', 'hybrid')
+        if self.retrieval_mode not in self.RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {self.retrieval_mode}")
+        self.lexical_index = BM25Index()
+        self._lexical_version = None
+
+        # Client mode: retrieval is served by the shared retrieval daemon, so
+        # this process never loads the index or the embedding model
+        # (service_url="" forces in-process retrieval, e.g. inside the daemon itself)
+        if service_url is None:
+            service_url = getattr(django_settings, 'AI_RETRIEVAL_SERVICE_URL', '')
+        self.remote = RetrievalClient(service_url) if service_url else None
+        if self.remote is not None:
+            return
+
+        # Auto-load existing index if it exists (not needed for pure lexical retrieval)
+        has_stored_index = os.path.exists(persist_dir) or self.vector_backend == "pgvector"
+        if self.retrieval_mode != "lexical" and has_stored_index:
             try:
                 self._load_existing_index()
             except Exception as e:
@@ -102,12 +135,9 @@ class IndexService:
         if self._settings_initialized:
             return
 
-        # Use Ollama for embeddings (free, local, working!)
-        print("🔧 Using Ollama for embeddings (host.docker.internal:11434)")
-        Settings.embed_model = OllamaEmbedding(
-            model_name="nomic-embed-text",
-            base_url="http://host.docker.internal:11434"
-        )
+        # Embedding backend from settings.AI_EMBEDDING_BACKEND (Ollama by default)
+        self.embed_model = get_embedding_model(self.embedding_backend)
+        Settings.embed_model = self.embed_model
 
         # Use Claude for LLM (for RAG query engine)
         claude_api_key = os.getenv('CLAUDE_API_KEY')
@@ -121,6 +151,9 @@ class IndexService:
             )
         else:
             print("⚠️ CLAUDE_API_KEY not set - LLM features disabled")
+            # Explicitly disabled, so query engines fall back to a mock LLM
+            # instead of trying to resolve the default OpenAI one
+            Settings.llm = None
 
         # Set chunk size for text splitting
         Settings.chunk_size = 512
@@ -128,49 +161,295 @@ class IndexService:
 
         self._settings_initialized = True
 
-    def _load_existing_index(self):
-        """Load existing index from disk"""
-        # Initialize settings first
-        self._initialize_settings()
+    def _numpy_dir(self, persist_dir: str, version: Optional[str] = None) -> str:
+        numpy_dir = os.path.join(persist_dir, self.NUMPY_INDEX_DIR)
+        return os.path.join(numpy_dir, version) if version else numpy_dir
+
+    def _collection_name(self, version: Optional[str] = None) -> str:
+        return f"{self.COLLECTION_NAME}_{version}" if version else self.COLLECTION_NAME
+
+    def _list_versions(self, persist_dir: str) -> List[str]:
+        """Index versions present in the vector store, oldest first"""
+        if self.vector_backend == "numpy":
+            numpy_dir = self._numpy_dir(persist_dir)
+            if not os.path.isdir(numpy_dir):
+                return []
+            versions = [
+                name for name in os.listdir(numpy_dir)
+                if name.isdigit() and NumpyVectorStore.exists(os.path.join(numpy_dir, name))
+            ]
+        elif self.vector_backend == "pgvector":
+            versions = PgVectorStore.versions()
+        else:
+            prefix = f"{self.COLLECTION_NAME}_"
+            chroma_client = chromadb.PersistentClient(path=persist_dir)
+            names = [getattr(c, "name", c) for c in chroma_client.list_collections()]
+            versions = [
+                name[len(prefix):] for name in names
+                if name.startswith(prefix) and name[len(prefix):].isdigit()
+            ]
+        return sorted(versions, key=int)
+
+    def _get_active_version(self, persist_dir: str) -> Optional[str]:
+        """
+        Version the alias points at. If the alias is gone (cache flushed),
+        fall back to the newest complete version, then to the pre-versioning index.
+        """
+        try:
+            version = cache.get(self.ACTIVE_VERSION_CACHE_KEY)
+        except Exception:
+            version = None
+
+        if version is None:
+            versions = self._list_versions(persist_dir)
+            version = versions[-1] if versions else None
+        return version
 
-        print(f"Loading existing index from {self.persist_dir}...")
+    def _open_vector_store(self, persist_dir: str, version: Optional[str] = None):
+        """Open a persisted vector store version, or return None if it was not built"""
+        if self.vector_backend == "numpy":
+            numpy_dir = self._numpy_dir(persist_dir, version)
+            if not NumpyVectorStore.exists(numpy_dir):
+                return None
+            return NumpyVectorStore.from_persist_dir(numpy_dir)
 
-        # Initialize ChromaDB vector store
-        chroma_client = chromadb.PersistentClient(path=self.persist_dir)
+        if self.vector_backend == "pgvector":
+            vector_store = PgVectorStore(index_version=version)
+            return vector_store if vector_store.exists() else None
 
-        # Get existing collection
+        chroma_client = chromadb.PersistentClient(path=persist_dir)
         try:
-            collection = chroma_client.get_collection(
-                name="marcus_ecommerce_knowledge"
-            )
+            collection = chroma_client.get_collection(name=self._collection_name(version))
         except Exception:
             # Collection doesn't exist
-            return
+            return None
+        return ChromaVectorStore(chroma_collection=collection)
+
+    def _create_vector_store(self, persist_dir: str, version: str):
+        """Create the empty vector store that a build writes a new version into"""
+        if self.vector_backend == "numpy":
+            return NumpyVectorStore(
+                persist_dir=self._numpy_dir(persist_dir, version),
+                quantize=getattr(django_settings, 'AI_VECTOR_QUANTIZE', False)
+            )
 
-        # Create vector store from existing collection
-        vector_store = ChromaVectorStore(chroma_collection=collection)
+        if self.vector_backend == "pgvector":
+            return PgVectorStore(index_version=version)
 
-        # Load index from vector store
-        self.index = VectorStoreIndex.from_vector_store(
-            vector_store=vector_store
-        )
+        chroma_client = chromadb.PersistentClient(path=persist_dir)
+        collection = chroma_client.create_collection(name=self._collection_name(version))
+        return ChromaVectorStore(chroma_collection=collection)
+
+    @staticmethod
+    def _count_vectors(vector_store) -> int:
+        """Number of vectors stored in a freshly built version"""
+        if isinstance(vector_store, (NumpyVectorStore, PgVectorStore)):
+            return vector_store.count()
+        return vector_store.client.count()
+
+    def _drop_version(self, persist_dir: str, version: Optional[str]):
+        """Delete one index version (None drops the pre-versioning index)"""
+        try:
+            if self.vector_backend == "numpy":
+                numpy_dir = self._numpy_dir(persist_dir, version)
+                if version:
+                    shutil.rmtree(numpy_dir, ignore_errors=True)
+                elif os.path.isdir(numpy_dir):
+                    # Unversioned files sit next to the version directories
+                    for name in os.listdir(numpy_dir):
+                        path = os.path.join(numpy_dir, name)
+                        if os.path.isfile(path):
+                            os.remove(path)
+            elif self.vector_backend == "pgvector":
+                PgVectorStore(index_version=version).clear()
+            else:
+                chroma_client = chromadb.PersistentClient(path=persist_dir)
+                chroma_client.delete_collection(name=self._collection_name(version))
+        except Exception as e:
+            print(f"Note: Could not drop index version {version or 'legacy'}: {str(e)[:100]}")
 
-        # Create retriever and query engine
+        if version:
+            for path in (self._manifest_path(persist_dir, version), self._embedder_path(persist_dir, version)):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _manifest_path(self, persist_dir: str, version: str) -> str:
+        return os.path.join(persist_dir, self.MANIFEST_DIR, self.vector_backend, f"{version}.json")
+
+    def _read_manifest(self, persist_dir: str, version: Optional[str]) -> Optional[Dict]:
+        """Build manifest of a version (None for the pre-versioning index or unknown versions)"""
+        if not version:
+            return None
+        try:
+            with open(self._manifest_path(persist_dir, version)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, persist_dir: str, version: str, manifest: Dict):
+        path = self._manifest_path(persist_dir, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _embedder_path(self, persist_dir: str, version: str) -> str:
+        """Fitted state of a catalog-fitted embedder, stored next to the manifest"""
+        return os.path.join(persist_dir, self.MANIFEST_DIR, self.vector_backend, f"{version}.embedder.npz")
+
+    def _embedding_model_name(self) -> str:
+        return getattr(self.embed_model, "model_name", type(self.embed_model).__name__)
+
+    def _fit_embedder(self) -> BaseEmbedding:
+        """
+        Embedder for a new version. Catalog-fitted embedders are fitted on
+        the lexical index texts (synced by the first build pass) into a fresh
+        instance, so the active version keeps querying with its own state.
+        """
+        if not isinstance(self.embed_model, HashingEmbedding):
+            return self.embed_model
+        embed_model = HashingEmbedding(dimensions=self.embed_model.dimensions, svd=self.embed_model.svd)
+        return embed_model.fit(self.lexical_index.texts())
+
+    def _load_embedder(self, persist_dir: str, version: Optional[str]) -> BaseEmbedding:
+        """Embedder matching an index version (loads the fitted state if there is one)"""
+        if not isinstance(self.embed_model, HashingEmbedding):
+            return self.embed_model
+        path = self._embedder_path(persist_dir, version) if version else None
+        if not path or not os.path.exists(path):
+            print(f"⚠️ No fitted embedder state for index version {version or 'legacy'} - rebuild the index")
+            return self.embed_model
+        embed_model = HashingEmbedding(dimensions=self.embed_model.dimensions, svd=self.embed_model.svd)
+        return embed_model.load(path)
+
+    def _save_embedder(self, persist_dir: str, version: str, embed_model: BaseEmbedding):
+        if isinstance(embed_model, HashingEmbedding):
+            path = self._embedder_path(persist_dir, version)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            embed_model.save(path)
+
+    def _catalog_digest(self):
+        """Checksum seeded with the embedding model and chunking settings"""
+        digest = hashlib.sha256()
+        digest.update(f"{self._embedding_model_name()}|{Settings.chunk_size}|{Settings.chunk_overlap}".encode("utf-8"))
+        return digest
+
+    @staticmethod
+    def _fingerprinted(documents: Iterable, digest) -> Iterator:
+        """
+        Pass documents through while adding their ids, texts and metadata to
+        the catalog checksum (loaders yield in a stable primary-key order).
+        """
+        for doc in documents:
+            digest.update(doc.doc_id.encode("utf-8"))
+            digest.update(doc.text.encode("utf-8"))
+            digest.update(json.dumps(doc.metadata, sort_keys=True, default=str).encode("utf-8"))
+            yield doc
+
+    @staticmethod
+    def _batched(documents: Iterable, size: int) -> Iterator[List]:
+        iterator = iter(documents)
+        while True:
+            batch = list(itertools.islice(iterator, size))
+            if not batch:
+                return
+            yield batch
+
+    def _collect_old_versions(self, persist_dir: str):
+        """Garbage-collect all but the newest versions and the pre-versioning index"""
+        keep = max(1, getattr(django_settings, 'AI_INDEX_KEEP_VERSIONS', self.KEEP_VERSIONS))
+        stale = self._list_versions(persist_dir)[:-keep]
+
+        for version in stale + [None]:
+            self._drop_version(persist_dir, version)
+
+        if stale:
+            print(f"✓ Removed {len(stale)} old index version(s)")
+
+    def _acquire_rebuild_lock(self) -> Optional[str]:
+        """
+        Take the cluster-wide rebuild lock (atomic cache add).
+        Returns a token to release it with, or None if another build holds it.
+        """
+        token = uuid.uuid4().hex
+        try:
+            acquired = cache.add(self.REBUILD_LOCK_CACHE_KEY, token, timeout=self.REBUILD_LOCK_TIMEOUT)
+        except Exception as e:
+            print(f"Warning: Could not take rebuild lock, building without it: {e}")
+            return token
+        return token if acquired else None
+
+    def _release_rebuild_lock(self, token: str):
+        try:
+            if cache.get(self.REBUILD_LOCK_CACHE_KEY) == token:
+                cache.delete(self.REBUILD_LOCK_CACHE_KEY)
+        except Exception:
+            pass
+
+    def _set_index(self, index: VectorStoreIndex):
+        """Install an index and the retriever/query engine built on top of it"""
+        self.index = index
+
+        # Create retriever (top 5 most relevant documents)
         self.retriever = VectorIndexRetriever(
             index=self.index,
             similarity_top_k=5
         )
 
+        # Create query engine
         self.query_engine = RetrieverQueryEngine(
             retriever=self.retriever
         )
 
-        print(f"✓ Loaded existing index from {self.persist_dir}")
+    def _load_existing_index(self):
+        """Load existing index from disk"""
+        # Initialize settings first
+        self._initialize_settings()
+
+        version = self._get_active_version(self.persist_dir)
+        print(f"Loading existing {self.vector_backend} index version {version or 'legacy'}...")
+
+        vector_store = self._open_vector_store(self.persist_dir, version)
+        if vector_store is None:
+            return
+
+        # Load index from vector store, with the embedder it was built with
+        embed_model = self._load_embedder(self.persist_dir, version)
+        self._set_index(VectorStoreIndex.from_vector_store(vector_store=vector_store, embed_model=embed_model))
+        self.embed_model = embed_model
+        self.active_version = version
+
+        print(f"✓ Loaded existing index version {version or 'legacy'}")
+
+    def _ensure_active_version(self):
+        """Switch to the active index version if another process has flipped the alias"""
+        try:
+            version = cache.get(self.ACTIVE_VERSION_CACHE_KEY)
+        except Exception:
+            return
+
+        if version is not None and version != self.active_version:
+            self._load_existing_index()
 
-    def build_index(self, persist_dir: str = None):
+    def _stream_documents(self) -> Iterator:
+        """Documents to index (the whole catalog); each call starts a new stream"""
+        return MasterDocumentLoader.stream_all()
+
+    def build_index(self, persist_dir: str = None, force: bool = False) -> Optional[str]:
         """
-        Build or load the vector index from Django models.
-        This should be called on startup or when data changes.
+        Build a new version of the index from Django models and make it active.
+
+        Builds are blue/green: documents are embedded into a fresh versioned
+        store while the current version keeps serving, the vector count is
+        validated, and only then is the active-version alias flipped. Only one
+        build runs at a time across workers.
+
+        Unless `force` is set, the build is skipped when the active version
+        was built from the same catalog checksum.
+
+        Returns the active version, or None if nothing was built (no
+        documents, or another build holds the lock).
         """
         # Use instance persist_dir if not provided
         if persist_dir is None:
@@ -179,80 +458,311 @@ class IndexService:
         # Initialize settings on first use
         self._initialize_settings()
 
+        lock_token = self._acquire_rebuild_lock()
+        if lock_token is None:
+            print("⏭️ Another index build is running - skipping")
+            return None
+
+        try:
+            return self._build_version(persist_dir, force)
+        finally:
+            self._release_rebuild_lock(lock_token)
+
+    def _build_version(self, persist_dir: str, force: bool = False) -> Optional[str]:
         print("Building LlamaIndex from Django models...")
 
-        # Load all documents from Django database
-        documents = MasterDocumentLoader.load_all()
+        # First streaming pass: fingerprint the catalog and sync the lexical
+        # index. Nothing is embedded if the active version has the same checksum.
+        digest = self._catalog_digest()
+        document_count = self.sync_lexical_index(
+            self._fingerprinted(self._stream_documents(), digest)
+        )["total"]
 
-        if not documents:
+        if not document_count:
             print("Warning: No documents loaded!")
-            return
-
-        # Initialize ChromaDB vector store
-        chroma_client = chromadb.PersistentClient(path=persist_dir)
+            return None
 
-        # Create or get collection
-        collection = chroma_client.get_or_create_collection(
-            name="marcus_ecommerce_knowledge"
-        )
+        checksum = digest.hexdigest()
+        active_version = self._get_active_version(persist_dir)
+        manifest = self._read_manifest(persist_dir, active_version)
+        if not force and manifest and manifest.get("catalog_checksum") == checksum:
+            if self.active_version != active_version:
+                self._load_existing_index()
+            if self.active_version == active_version:
+                print(f"✓ Catalog unchanged - reusing index version {active_version}")
+                return active_version
 
-        # Create vector store
-        vector_store = ChromaVectorStore(chroma_collection=collection)
+        version = str(int(time.time() * 1000))
+        embed_model = self._fit_embedder()
+        vector_store = self._create_vector_store(persist_dir, version)
         storage_context = StorageContext.from_defaults(vector_store=vector_store)
 
-        # Build index from documents
-        self.index = VectorStoreIndex.from_documents(
-            documents,
-            storage_context=storage_context,
-            show_progress=True
-        )
+        try:
+            # Second pass: parse and embed the documents batch by batch
+            index = VectorStoreIndex(nodes=[], storage_context=storage_context, embed_model=embed_model)
+            for batch in self._batched(self._stream_documents(), self.BUILD_BATCH_SIZE):
+                index.insert_nodes(Settings.node_parser.get_nodes_from_documents(batch))
+
+            # The NumPy store lives in memory until persisted; write it for other workers
+            if isinstance(vector_store, NumpyVectorStore):
+                vector_store.persist()
+
+            vector_count = self._count_vectors(vector_store)
+            if vector_count < document_count:
+                raise RuntimeError(
+                    f"Index version {version} has {vector_count} vectors for {document_count} documents"
+                )
+
+            self._save_embedder(persist_dir, version, embed_model)
+        except Exception:
+            # Never activate a partial build; the current version keeps serving
+            self._drop_version(persist_dir, version)
+            raise
 
-        # Create retriever (top 5 most relevant documents)
-        self.retriever = VectorIndexRetriever(
-            index=self.index,
-            similarity_top_k=5
-        )
+        self._activate_version(persist_dir, version, index, embed_model, {
+            "catalog_checksum": checksum,
+            "documents": document_count,
+            "vectors": vector_count,
+        })
 
-        # Create query engine
-        self.query_engine = RetrieverQueryEngine(
-            retriever=self.retriever
-        )
+        print(f"✓ Index version {version} built successfully with {document_count} documents")
+        return version
 
-        print(f"✓ Index built successfully with {len(documents)} documents")
+    def _activate_version(
+        self,
+        persist_dir: str,
+        version: str,
+        index: VectorStoreIndex,
+        embed_model: BaseEmbedding,
+        manifest: Dict
+    ):
+        """Record the manifest, flip the active-version alias and collect old versions"""
+        self._write_manifest(persist_dir, version, {
+            "format": self.SNAPSHOT_FORMAT,
+            "version": version,
+            "backend": self.vector_backend,
+            "embedding_model": self._embedding_model_name(),
+            "created_at": time.time(),
+            **manifest,
+        })
+
+        self._publish_lexical_version()
+        self._set_index(index)
+        self.embed_model = embed_model
+        self.active_version = version
+        try:
+            cache.set(self.ACTIVE_VERSION_CACHE_KEY, version, timeout=None)
+        except Exception as e:
+            print(f"Warning: Could not publish active index version: {e}")
 
-    def rebuild_index(self, persist_dir: str = None):
+        self._collect_old_versions(persist_dir)
+
+    def rebuild_index(self, persist_dir: str = None) -> Optional[str]:
         """
-        Completely rebuild the index (useful when database changes significantly)
-        Deletes the entire collection and rebuilds from scratch to avoid duplicates.
+        Completely rebuild the index (useful when database changes significantly).
+        Every build already writes a fresh version, so nothing is deleted
+        up front and queries keep working while the rebuild runs.
+        """
+        return self.build_index(persist_dir, force=True)
+
+    # ---------- Snapshots ----------
+
+    def _vector_records(self, vector_store) -> Iterator[Tuple[str, str, Dict, List[float]]]:
+        """(node id, text, metadata dict, embedding) of every node in a vector store"""
+        if isinstance(vector_store, (NumpyVectorStore, PgVectorStore)):
+            yield from vector_store.records()
+            return
+
+        collection = vector_store.client
+        offset = 0
+        while True:
+            batch = collection.get(
+                include=["documents", "metadatas", "embeddings"],
+                limit=self.SNAPSHOT_BATCH_SIZE,
+                offset=offset
+            )
+            if not batch["ids"]:
+                return
+            for node_id, text, metadata, embedding in zip(
+                batch["ids"], batch["documents"], batch["metadatas"], batch["embeddings"]
+            ):
+                yield node_id, text, metadata, [float(value) for value in embedding]
+            offset += len(batch["ids"])
+
+    def export_snapshot(self, path: str, persist_dir: str = None) -> Dict:
+        """
+        Write the active index version to a snapshot archive (tar.gz with a
+        manifest and the embedded nodes), so other replicas can import it
+        instead of re-embedding the catalog.
         """
-        # Use instance persist_dir if not provided
         if persist_dir is None:
             persist_dir = self.persist_dir
+        self._initialize_settings()
 
-        # Initialize settings first
+        version = self._get_active_version(persist_dir)
+        manifest = self._read_manifest(persist_dir, version)
+        vector_store = self._open_vector_store(persist_dir, version)
+        if manifest is None or vector_store is None:
+            raise RuntimeError("No versioned index to export. Run build_ai_index first.")
+
+        nodes_buffer = io.BytesIO()
+        for node_id, text, metadata, embedding in self._vector_records(vector_store):
+            line = json.dumps({"id": node_id, "text": text, "metadata": metadata, "embedding": embedding})
+            nodes_buffer.write(line.encode("utf-8") + b"\n")
+
+        members = [
+            ("manifest.json", json.dumps(manifest, indent=2).encode("utf-8")),
+            ("nodes.jsonl", nodes_buffer.getvalue()),
+        ]
+        embedder_path = self._embedder_path(persist_dir, version)
+        if os.path.exists(embedder_path):
+            with open(embedder_path, "rb") as f:
+                members.append(("embedder.npz", f.read()))
+
+        tmp_path = f"{path}.tmp"
+        with tarfile.open(tmp_path, "w:gz") as archive:
+            for name, payload in members:
+                info = tarfile.TarInfo(name)
+                info.size = len(payload)
+                info.mtime = int(time.time())
+                archive.addfile(info, io.BytesIO(payload))
+        os.replace(tmp_path, path)
+
+        print(f"✓ Exported index version {version} to {path}")
+        return manifest
+
+    @staticmethod
+    def read_snapshot_manifest(path: str) -> Dict:
+        """Manifest of a snapshot archive, without reading its nodes"""
+        with tarfile.open(path, "r:gz") as archive:
+            return json.load(archive.extractfile("manifest.json"))
+
+    def import_snapshot(self, path: str, persist_dir: str = None) -> Optional[str]:
+        """
+        Load a snapshot archive into a new index version and make it active.
+        Embeddings come from the archive, so the embedding server is not called.
+
+        Returns the new version, or None if another build holds the lock.
+        """
+        if persist_dir is None:
+            persist_dir = self.persist_dir
         self._initialize_settings()
 
-        # Delete the collection in ChromaDB instead of deleting files
+        lock_token = self._acquire_rebuild_lock()
+        if lock_token is None:
+            print("⏭️ Another index build is running - skipping snapshot import")
+            return None
+
         try:
-            chroma_client = chromadb.PersistentClient(path=persist_dir)
-            chroma_client.delete_collection(name="marcus_ecommerce_knowledge")
-            print(f"✓ Deleted old collection from ChromaDB")
+            return self._import_version(path, persist_dir)
+        finally:
+            self._release_rebuild_lock(lock_token)
+
+    def _import_version(self, path: str, persist_dir: str) -> str:
+        with tarfile.open(path, "r:gz") as archive:
+            manifest = json.load(archive.extractfile("manifest.json"))
+
+            if manifest.get("format") != self.SNAPSHOT_FORMAT:
+                raise ValueError(f"Unsupported snapshot format: {manifest.get('format')}")
+            if manifest.get("embedding_model") != self._embedding_model_name():
+                raise ValueError(
+                    f"Snapshot was embedded with {manifest.get('embedding_model')}, "
+                    f"index uses {self._embedding_model_name()}"
+                )
+
+            version = str(int(time.time() * 1000))
+            vector_store = self._create_vector_store(persist_dir, version)
+
+            try:
+                # Catalog-fitted embedders ship their state with the snapshot
+                embed_model = self.embed_model
+                if "embedder.npz" in archive.getnames():
+                    embedder_path = self._embedder_path(persist_dir, version)
+                    os.makedirs(os.path.dirname(embedder_path), exist_ok=True)
+                    with open(embedder_path, "wb") as f:
+                        shutil.copyfileobj(archive.extractfile("embedder.npz"), f)
+                    embed_model = self._load_embedder(persist_dir, version)
+
+                batch = []
+                for line in archive.extractfile("nodes.jsonl"):
+                    record = json.loads(line)
+                    node = metadata_dict_to_node(record["metadata"], text=record["text"])
+                    # Fresh ids: node ids are unique across versions in pgvector
+                    node.id_ = str(uuid.uuid4())
+                    node.embedding = record["embedding"]
+                    batch.append(node)
+                    if len(batch) >= self.SNAPSHOT_BATCH_SIZE:
+                        vector_store.add(batch)
+                        batch = []
+                if batch:
+                    vector_store.add(batch)
+
+                if isinstance(vector_store, NumpyVectorStore):
+                    vector_store.persist()
+
+                vector_count = self._count_vectors(vector_store)
+                if vector_count != manifest.get("vectors"):
+                    raise RuntimeError(
+                        f"Snapshot import wrote {vector_count} vectors, manifest lists {manifest.get('vectors')}"
+                    )
+            except Exception:
+                self._drop_version(persist_dir, version)
+                raise
+
+        self.sync_lexical_index()
+        self._activate_version(
+            persist_dir,
+            version,
+            VectorStoreIndex.from_vector_store(vector_store=vector_store, embed_model=embed_model),
+            embed_model,
+            {
+                "catalog_checksum": manifest["catalog_checksum"],
+                "documents": manifest.get("documents"),
+                "vectors": vector_count,
+                "imported_from": manifest.get("version"),
+            }
+        )
+
+        print(f"✓ Imported snapshot {path} as index version {version}")
+        return version
+
+    def sync_lexical_index(self, documents: Iterable = None) -> Dict[str, int]:
+        """
+        Incrementally update the BM25 index from the database.
+        Only documents whose text or metadata changed are re-tokenized.
+        """
+        if documents is None:
+            documents = self._stream_documents()
+        return self.lexical_index.sync(documents)
+
+    def _publish_lexical_version(self):
+        """Record a new knowledge version so other workers re-sync on their next query"""
+        self._lexical_version = str(time.time())
+        try:
+            cache.set(self.LEXICAL_VERSION_CACHE_KEY, self._lexical_version, timeout=None)
         except Exception as e:
-            print(f"Note: Could not delete collection (may not exist): {e}")
+            print(f"Warning: Could not publish lexical index version: {e}")
 
-        # Build fresh index
-        self.build_index(persist_dir)
+    def _ensure_lexical_index(self):
+        """
+        Build the lexical index on first use, and re-sync it when another
+        process (e.g. the Celery index task) has published a newer version.
+        """
+        try:
+            version = cache.get(self.LEXICAL_VERSION_CACHE_KEY)
+        except Exception:
+            version = self._lexical_version
+
+        if not len(self.lexical_index) or version != self._lexical_version:
+            self.sync_lexical_index()
+            self._lexical_version = version
 
     def query(self, query_text: str, top_k: int = 5) -> Dict:
         """
         Query the index for relevant information.
         Returns retrieved documents and their relevance scores.
         """
-        if not self.retriever:
-            raise RuntimeError("Index not built. Call build_index() first.")
-
-        # Retrieve relevant documents
-        retrieved_nodes = self.retriever.retrieve(query_text)
+        retrieved_nodes = self.retrieve(query_text, top_k=top_k)
 
         # Format results
         results = {
@@ -260,7 +770,7 @@ class IndexService:
             "documents": []
         }
 
-        for node in retrieved_nodes[:top_k]:
+        for node in retrieved_nodes:
             results["documents"].append({
                 "text": node.text,
                 "score": node.score,
@@ -269,114 +779,377 @@ class IndexService:
 
         return results
 
-    def search_products(self, query: str, category_id: Optional[int] = None) -> List[Dict]:
+    def _build_filters(
+        self,
+        doc_types: List[str],
+        category_id: Optional[int] = None,
+        extra_filters: Optional[List[MetadataFilter]] = None
+    ) -> MetadataFilters:
+        """
+        Build metadata filters that the vector store applies inside its query
+        (Chroma `where` clause, pgvector SQL), so only matching documents
+        compete for top-k.
+        """
+        type_filters = [
+            MetadataFilter(key="type", value=doc_type) for doc_type in doc_types
+        ]
+
+        if len(type_filters) == 1:
+            type_clause = type_filters[0]
+        else:
+            type_clause = MetadataFilters(
+                filters=type_filters,
+                condition=FilterCondition.OR
+            )
+
+        clauses = [type_clause]
+        if category_id is not None:
+            clauses.append(MetadataFilter(key="category_id", value=int(category_id)))
+        clauses.extend(extra_filters or [])
+
+        if len(clauses) == 1 and isinstance(type_clause, MetadataFilters):
+            return type_clause
+        return MetadataFilters(filters=clauses, condition=FilterCondition.AND)
+
+    def _vector_retrieve(
+        self,
+        query: str,
+        top_k: int,
+        filters: Optional[MetadataFilters] = None
+    ) -> List[NodeWithScore]:
+        """Dense retrieval through the vector store"""
+        self._ensure_active_version()
+        if not self.index:
+            raise RuntimeError("Index not built. Call build_index() first.")
+
+        retriever = VectorIndexRetriever(
+            index=self.index,
+            similarity_top_k=top_k,
+            filters=filters
+        )
+        return retriever.retrieve(query)
+
+    def _lexical_retrieve(
+        self,
+        query: str,
+        top_k: int,
+        doc_types: Optional[List[str]] = None,
+        category_id: Optional[int] = None
+    ) -> List[NodeWithScore]:
+        """BM25 retrieval, returned as LlamaIndex nodes so callers can treat both alike"""
+        self._ensure_lexical_index()
+
+        hits = self.lexical_index.search(
+            query, top_k=top_k, doc_types=doc_types, category_id=category_id
+        )
+        return [
+            NodeWithScore(
+                node=TextNode(id_=hit.doc_id, text=hit.text, metadata=hit.metadata),
+                score=hit.score
+            )
+            for hit in hits
+        ]
+
+    @staticmethod
+    def _node_doc_id(node: NodeWithScore) -> str:
+        """Source document id of a retrieved node (e.g. "product_12")"""
+        return node.node.ref_doc_id or node.node.node_id
+
+    def retrieve(
+        self,
+        query: str,
+        top_k: int = 5,
+        doc_types: Optional[List[str]] = None,
+        category_id: Optional[int] = None,
+        extra_filters: Optional[List[MetadataFilter]] = None
+    ) -> List[NodeWithScore]:
+        """
+        Retrieve the top-k nodes using the configured retrieval mode.
+
+        In hybrid mode, BM25 and vector rankings are fused with Reciprocal
+        Rank Fusion; if the vector side fails (e.g. embedding server down)
+        the lexical ranking is returned on its own.
+
+        `extra_filters` are only pushed into the vector store; callers must
+        still check them on lexical results.
+        """
+        if self.remote is not None:
+            return self.remote.retrieve(query, top_k, doc_types, category_id, extra_filters)
+
+        if self.retrieval_mode == "lexical":
+            return self._lexical_retrieve(query, top_k, doc_types, category_id)
+
+        filters = None
+        if doc_types:
+            filters = self._build_filters(doc_types, category_id, extra_filters)
+
+        if self.retrieval_mode == "vector":
+            return self._vector_retrieve(query, top_k, filters)
+
+        candidates = top_k * self.FUSION_CANDIDATE_FACTOR
+        lexical_nodes = self._lexical_retrieve(query, candidates, doc_types, category_id)
+
+        try:
+            vector_nodes = self._vector_retrieve(query, candidates, filters)
+        except Exception as e:
+            print(f"⚠️ Vector retrieval failed, using lexical results only: {str(e)[:100]}")
+            return lexical_nodes[:top_k]
+
+        return self._fuse(vector_nodes, lexical_nodes, top_k)
+
+    def _fuse(
+        self,
+        vector_nodes: List[NodeWithScore],
+        lexical_nodes: List[NodeWithScore],
+        top_k: int
+    ) -> List[NodeWithScore]:
+        """Merge vector and lexical rankings with Reciprocal Rank Fusion"""
+        nodes_by_id = {}
+        rankings = []
+        for ranked_nodes in (vector_nodes, lexical_nodes):
+            ranking = []
+            for node in ranked_nodes:
+                doc_id = self._node_doc_id(node)
+                if doc_id in ranking:
+                    continue  # Several chunks of one document count once
+                ranking.append(doc_id)
+                nodes_by_id.setdefault(doc_id, node)
+            rankings.append(ranking)
+
+        fused = []
+        for doc_id, score in reciprocal_rank_fusion(rankings)[:top_k]:
+            node = nodes_by_id[doc_id]
+            fused.append(NodeWithScore(node=node.node, score=score))
+        return fused
+
+    def retrieve_batch(self, requests: List[Dict]) -> List[List[NodeWithScore]]:
+        """
+        Retrieve for several queries at once (used by the retrieval daemon).
+        Each request holds `retrieve()` keyword arguments.
+
+        On the NumPy backend all query embeddings are computed first and
+        queries sharing the same filters are scored with one matrix product;
+        other backends answer the requests one by one.
+        """
+        if self.remote is not None or self.retrieval_mode == "lexical":
+            return [self.retrieve(**request) for request in requests]
+
+        self._ensure_active_version()
+        vector_store = self.index.vector_store if self.index else None
+        if not isinstance(vector_store, NumpyVectorStore):
+            return [self.retrieve(**request) for request in requests]
+
+        factor = self.FUSION_CANDIDATE_FACTOR if self.retrieval_mode == "hybrid" else 1
+        try:
+            queries = []
+            for request in requests:
+                filters = None
+                if request.get("doc_types"):
+                    filters = self._build_filters(
+                        request["doc_types"], request.get("category_id"), request.get("extra_filters")
+                    )
+                queries.append(VectorStoreQuery(
+                    query_embedding=self.embed_model.get_query_embedding(request["query"]),
+                    similarity_top_k=request.get("top_k", 5) * factor,
+                    filters=filters
+                ))
+            vector_results = vector_store.query_batch(queries)
+        except Exception as e:
+            # Per-request retrieval applies the usual lexical fallback
+            print(f"⚠️ Batched vector retrieval failed: {str(e)[:100]}")
+            return [self.retrieve(**request) for request in requests]
+
+        results = []
+        for request, result in zip(requests, vector_results):
+            top_k = request.get("top_k", 5)
+            vector_nodes = [
+                NodeWithScore(node=node, score=score)
+                for node, score in zip(result.nodes, result.similarities)
+            ]
+            if self.retrieval_mode == "vector":
+                results.append(vector_nodes)
+                continue
+
+            lexical_nodes = self._lexical_retrieve(
+                request["query"], top_k * factor, request.get("doc_types"), request.get("category_id")
+            )
+            results.append(self._fuse(vector_nodes, lexical_nodes, top_k))
+        return results
+
+    def retrieve_by_type(
+        self,
+        query: str,
+        doc_types: List[str],
+        top_k: int = 5,
+        category_id: Optional[int] = None,
+        extra_filters: Optional[List[MetadataFilter]] = None
+    ) -> List[NodeWithScore]:
+        """
+        Retrieve the top-k nodes of the given document type(s).
+
+        Unlike `query()`, the type and category filters are applied by the
+        vector store and the lexical index, so results don't depend on how
+        many documents of other types (FAQs, shipping zones, ...) are indexed.
+        """
+        return self.retrieve(
+            query,
+            top_k=top_k,
+            doc_types=doc_types,
+            category_id=category_id,
+            extra_filters=extra_filters
+        )
+
+    def search_products(
+        self,
+        query: str,
+        category_id: Optional[int] = None,
+        top_k: int = PRODUCT_TOP_K,
+        price_max: Optional[float] = None,
+        in_stock: bool = False
+    ) -> List[Dict]:
         """
         Search for products based on natural language query.
         Returns list of matching products with scores.
+
+        Price and stock filters are pushed into the vector store where it
+        supports them (pgvector joins live price and stock); results are
+        checked again here so every backend and retrieval mode agrees.
         """
-        if not self.retriever:
-            raise RuntimeError("Index not built. Call build_index() first.")
+        extra_filters = []
+        if price_max is not None:
+            extra_filters.append(
+                MetadataFilter(key="base_price", value=float(price_max), operator=FilterOperator.LTE)
+            )
+        if in_stock and self.vector_backend == "pgvector":
+            extra_filters.append(MetadataFilter(key="in_stock", value=True))
+
+        retrieved_nodes = self.retrieve_by_type(
+            query,
+            ["product"],
+            top_k=top_k,
+            category_id=category_id,
+            extra_filters=extra_filters
+        )
 
-        # Retrieve relevant documents
-        retrieved_nodes = self.retriever.retrieve(query)
+        if price_max is not None:
+            retrieved_nodes = [
+                node for node in retrieved_nodes
+                if (node.metadata.get("base_price") or 0) <= float(price_max)
+            ]
+
+        if in_stock:
+            in_stock_ids = self._in_stock_product_ids(
+                [node.metadata.get("product_id") for node in retrieved_nodes]
+            )
+            retrieved_nodes = [
+                node for node in retrieved_nodes
+                if node.metadata.get("product_id") in in_stock_ids
+            ]
 
-        # Filter for product documents
         products = []
         for node in retrieved_nodes:
             metadata = node.metadata
-            if metadata.get("type") == "product":
-                # Filter by category if specified
-                if category_id and metadata.get("category_id") != category_id:
-                    continue
-
-                products.append({
-                    "id": metadata.get("product_id"),
-                    "name": metadata.get("product_name"),
-                    "category": metadata.get("category_name"),
-                    "base_price": metadata.get("base_price"),
-                    "relevance_score": node.score,
-                    "text": node.text
-                })
+            products.append({
+                "id": metadata.get("product_id"),
+                "name": metadata.get("product_name"),
+                "category": metadata.get("category_name"),
+                "base_price": metadata.get("base_price"),
+                "relevance_score": node.score,
+                "text": node.text
+            })
 
         return products
 
-    def search_categories(self, query: str) -> List[Dict]:
+    @staticmethod
+    def _in_stock_product_ids(product_ids: List[int]) -> set:
+        """Products whose every part option has stock (one query)"""
+        from apps.preconfigured_products.models import PreConfiguredProductParts
+
+        out_of_stock = PreConfiguredProductParts.objects.filter(
+            preconfigured_product_id__in=product_ids
+        ).exclude(
+            part_option__stock__quantity__gt=0
+        ).values_list('preconfigured_product_id', flat=True)
+
+        return set(product_ids) - set(out_of_stock)
+
+    def search_categories(self, query: str, top_k: int = CATEGORY_TOP_K) -> List[Dict]:
         """
         Search for categories based on natural language query.
         """
-        if not self.retriever:
-            raise RuntimeError("Index not built. Call build_index() first.")
-
-        retrieved_nodes = self.retriever.retrieve(query)
+        retrieved_nodes = self.retrieve_by_type(query, ["category"], top_k=top_k)
 
         categories = []
         seen_categories = set()
 
         for node in retrieved_nodes:
             metadata = node.metadata
-            if metadata.get("type") == "category":
-                category_id = metadata.get("category_id")
-                if category_id not in seen_categories:
-                    categories.append({
-                        "id": category_id,
-                        "name": metadata.get("category_name"),
-                        "parts_count": metadata.get("parts_count"),
-                        "relevance_score": node.score
-                    })
-                    seen_categories.add(category_id)
+            category_id = metadata.get("category_id")
+            if category_id not in seen_categories:
+                categories.append({
+                    "id": category_id,
+                    "name": metadata.get("category_name"),
+                    "parts_count": metadata.get("parts_count"),
+                    "relevance_score": node.score
+                })
+                seen_categories.add(category_id)
 
         return categories
 
-    def get_part_options(self, query: str, category_name: Optional[str] = None) -> List[Dict]:
+    def get_part_options(
+        self,
+        query: str,
+        category_name: Optional[str] = None,
+        category_id: Optional[int] = None,
+        top_k: int = PART_TOP_K
+    ) -> List[Dict]:
         """
         Search for part options based on query.
         Useful for answering questions like "What wheel options are available?"
         """
-        if not self.retriever:
-            raise RuntimeError("Index not built. Call build_index() first.")
-
         # Enhance query with category context
         if category_name:
             enhanced_query = f"{query} for {category_name}"
         else:
             enhanced_query = query
 
-        retrieved_nodes = self.retriever.retrieve(enhanced_query)
+        retrieved_nodes = self.retrieve_by_type(
+            enhanced_query, ["part"], top_k=top_k, category_id=category_id
+        )
 
         parts = []
         for node in retrieved_nodes:
             metadata = node.metadata
-            if metadata.get("type") == "part":
-                parts.append({
-                    "part_name": metadata.get("part_name"),
-                    "category": metadata.get("category_name"),
-                    "step": metadata.get("step"),
-                    "options_count": metadata.get("options_count"),
-                    "relevance_score": node.score,
-                    "description": node.text
-                })
+            parts.append({
+                "part_name": metadata.get("part_name"),
+                "category": metadata.get("category_name"),
+                "step": metadata.get("step"),
+                "options_count": metadata.get("options_count"),
+                "relevance_score": node.score,
+                "description": node.text
+            })
 
         return parts
 
-    def get_compatibility_info(self, query: str) -> List[Dict]:
+    def get_compatibility_info(self, query: str, top_k: int = RULE_TOP_K) -> List[Dict]:
         """
         Search for compatibility rules based on query.
         """
-        if not self.retriever:
-            raise RuntimeError("Index not built. Call build_index() first.")
-
-        retrieved_nodes = self.retriever.retrieve(query)
+        retrieved_nodes = self.retrieve_by_type(
+            query,
+            ["incompatibility_rule", "price_adjustment_rule"],
+            top_k=top_k
+        )
 
         rules = []
         for node in retrieved_nodes:
             metadata = node.metadata
-            if metadata.get("type") in ["incompatibility_rule", "price_adjustment_rule"]:
-                rules.append({
-                    "type": metadata.get("type"),
-                    "description": node.text,
-                    "relevance_score": node.score,
-                    "metadata": metadata
-                })
+            rules.append({
+                "type": metadata.get("type"),
+                "description": node.text,
+                "relevance_score": node.score,
+                "metadata": metadata
+            })
 
         return rules
 
@@ -385,6 +1158,10 @@ class IndexService:
         Ask a natural language question and get an answer.
         Uses the query engine to synthesize an answer from retrieved context.
         """
+        if self.remote is not None:
+            return self.remote.ask(question)
+
+        self._ensure_active_version()
         if not self.query_engine:
             raise RuntimeError("Index not built. Call build_index() first.")
 
@@ -395,7 +1172,10 @@ class IndexService:
         """
         Get statistics about the indexed knowledge base.
         """
-        if not self.index:
+        if self.remote is not None:
+            return {**self.remote.stats(), "retrieval_service": self.remote.url}
+
+        if not self.index and not len(self.lexical_index):
             return {"status": "Index not built"}
 
         # Get document counts by type
@@ -404,8 +1184,16 @@ class IndexService:
         return {
             "status": "Index ready",
             "index_type": "VectorStoreIndex",
-            "vector_store": "ChromaDB",
-            "embedding_model": "nomic-embed-text (Ollama)",
+            "retrieval_mode": self.retrieval_mode,
+            "active_version": self.active_version or "legacy",
+            "lexical_documents": len(self.lexical_index),
+            "vector_store": {
+                "chroma": "ChromaDB",
+                "numpy": "NumPy (memory-mapped)",
+                "pgvector": "PostgreSQL (pgvector)",
+            }[self.vector_backend],
+            "embedding_model": self._embedding_model_name() if self.embed_model else None,
+            "embedding_backend": type(self.embed_model).__name__ if self.embed_model else None,
             "embedding_cost": "FREE (local)"
         }
 
@@ -0,0 +1,243 @@
+"""
+In-process BM25 lexical index for product knowledge retrieval.
+Complements vector search with exact matching on product names, SKUs and
+spelling variants, and keeps retrieval working when the embedding server is down.
+"""
+
+import difflib
+import hashlib
+import math
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "for", "from",
+    "has", "have", "i", "in", "is", "it", "me", "my", "of", "on", "or",
+    "show", "that", "the", "this", "to", "what", "with", "you", "your",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into normalized terms.
+    Accents are folded and simple plurals stripped so that spelling variants
+    ("Kampala"/"Kámpala", "boxes"/"box") map to the same term.
+    """
+    if not text:
+        return []
+
+    folded = unicodedata.normalize("NFKD", text)
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch)).lower()
+
+    terms = []
+    for token in TOKEN_PATTERN.findall(folded):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith(("xes", "ches", "shes", "sses")):
+            token = token[:-2]
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+
+class LexicalHit:
+    """A single BM25 search result."""
+
+    __slots__ = ("doc_id", "score", "text", "metadata")
+
+    def __init__(self, doc_id: str, score: float, text: str, metadata: Dict):
+        self.doc_id = doc_id
+        self.score = score
+        self.text = text
+        self.metadata = metadata
+
+
+class BM25Index:
+    """
+    Inverted index with Okapi BM25 scoring.
+
+    Documents are keyed by the same doc_id used in the vector store
+    (e.g. "product_12"), so results can be fused with vector hits.
+    Updates are incremental: `upsert` only touches the postings of the
+    changed document.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._doc_text: Dict[str, str] = {}
+        self._doc_metadata: Dict[str, Dict] = {}
+        self._doc_hashes: Dict[str, str] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def texts(self) -> List[str]:
+        """Texts of all indexed documents (e.g. to fit a catalog embedder)"""
+        with self._lock:
+            return list(self._doc_text.values())
+
+    @staticmethod
+    def _hash(text: str, metadata: Dict) -> str:
+        payload = text + repr(sorted(metadata.items()))
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def upsert(self, doc_id: str, text: str, metadata: Optional[Dict] = None) -> bool:
+        """
+        Add or replace a document.
+        Returns False when the document is already indexed with identical content.
+        """
+        metadata = metadata or {}
+        doc_hash = self._hash(text, metadata)
+
+        with self._lock:
+            if self._doc_hashes.get(doc_id) == doc_hash:
+                return False
+
+            self._remove_unlocked(doc_id)
+
+            terms = tokenize(text)
+            term_counts: Dict[str, int] = defaultdict(int)
+            for term in terms:
+                term_counts[term] += 1
+
+            for term, count in term_counts.items():
+                self._postings[term][doc_id] = count
+
+            self._doc_lengths[doc_id] = len(terms)
+            self._doc_terms[doc_id] = list(term_counts)
+            self._doc_text[doc_id] = text
+            self._doc_metadata[doc_id] = metadata
+            self._doc_hashes[doc_id] = doc_hash
+            self._total_length += len(terms)
+            return True
+
+    def remove(self, doc_id: str):
+        """Remove a document if present"""
+        with self._lock:
+            self._remove_unlocked(doc_id)
+
+    def _remove_unlocked(self, doc_id: str):
+        if doc_id not in self._doc_lengths:
+            return
+
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        self._doc_text.pop(doc_id, None)
+        self._doc_metadata.pop(doc_id, None)
+        self._doc_hashes.pop(doc_id, None)
+
+    def sync(self, documents: Iterable) -> Dict[str, int]:
+        """
+        Bring the index in line with a full set of LlamaIndex documents.
+        Only new or changed documents are re-tokenized; missing ones are removed.
+        """
+        seen = set()
+        changed = 0
+
+        for doc in documents:
+            seen.add(doc.doc_id)
+            if self.upsert(doc.doc_id, doc.text, doc.metadata):
+                changed += 1
+
+        with self._lock:
+            stale = [doc_id for doc_id in self._doc_lengths if doc_id not in seen]
+            for doc_id in stale:
+                self._remove_unlocked(doc_id)
+
+        return {"updated": changed, "removed": len(stale), "total": len(self)}
+
+    def _expand_term(self, term: str) -> List[Tuple[str, float]]:
+        """
+        Map a query term onto indexed terms.
+        Unknown terms are matched to close vocabulary entries (typos and
+        spelling variants) with a reduced weight.
+        """
+        if term in self._postings:
+            return [(term, 1.0)]
+
+        if len(term) < 4:
+            return []
+
+        matches = difflib.get_close_matches(term, self._postings.keys(), n=2, cutoff=0.8)
+        return [(match, 0.7) for match in matches]
+
+    @staticmethod
+    def _matches(metadata: Dict, doc_types: Optional[List[str]], category_id: Optional[int]) -> bool:
+        if doc_types and metadata.get("type") not in doc_types:
+            return False
+        if category_id is not None and metadata.get("category_id") != int(category_id):
+            return False
+        return True
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        doc_types: Optional[List[str]] = None,
+        category_id: Optional[int] = None
+    ) -> List[LexicalHit]:
+        """
+        Return the top-k documents by BM25 score, optionally restricted to
+        the given document types and category.
+        """
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not doc_count:
+                return []
+
+            avg_length = self._total_length / doc_count
+            scores: Dict[str, float] = defaultdict(float)
+
+            for term in set(tokenize(query)):
+                for indexed_term, weight in self._expand_term(term):
+                    postings = self._postings[indexed_term]
+                    df = len(postings)
+                    idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+
+                    for doc_id, tf in postings.items():
+                        length_norm = 1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length
+                        scores[doc_id] += weight * idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+            hits = []
+            for doc_id, score in ranked:
+                metadata = self._doc_metadata[doc_id]
+                if not self._matches(metadata, doc_types, category_id):
+                    continue
+                hits.append(LexicalHit(doc_id, score, self._doc_text[doc_id], metadata))
+                if len(hits) >= top_k:
+                    break
+
+            return hits
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Fuse several ranked lists of doc ids with Reciprocal Rank Fusion.
+    Each list contributes 1 / (k + rank) per document; scores are summed.
+    """
+    fused: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
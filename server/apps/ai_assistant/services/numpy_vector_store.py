@@ -0,0 +1,330 @@
+"""
+NumPy vector store for LlamaIndex
+Keeps all embeddings in one contiguous matrix and answers queries with an
+exact matrix-vector product. The matrix is persisted as a .npy file and
+memory-mapped on load, so every worker process shares one copy through the
+OS page cache and startup does not depend on catalog size.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    FilterCondition,
+    FilterOperator,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryResult,
+)
+from llama_index.core.vector_stores.utils import (
+    metadata_dict_to_node,
+    node_to_metadata_dict,
+)
+
+
+EMBEDDINGS_FILE = "embeddings.npy"
+SCALES_FILE = "scales.npy"
+NODES_FILE = "nodes.json"
+
+
+class NumpyVectorStore(BasePydanticVectorStore):
+    """
+    Exact cosine-similarity vector store backed by a NumPy matrix.
+
+    Embeddings are L2-normalized on insert, so similarity is a single
+    matrix-vector product. With `quantize=True` the matrix is stored as int8
+    with one float32 scale per row (4x smaller on disk and in memory).
+    """
+
+    stores_text: bool = True
+    flat_metadata: bool = False
+
+    persist_dir: Optional[str] = None
+    quantize: bool = False
+
+    _ids: List[str] = PrivateAttr(default_factory=list)
+    _texts: List[str] = PrivateAttr(default_factory=list)
+    _metadata: List[Dict[str, Any]] = PrivateAttr(default_factory=list)
+    _matrix: Optional[np.ndarray] = PrivateAttr(default=None)
+    _scales: Optional[np.ndarray] = PrivateAttr(default=None)
+    _pending: List[np.ndarray] = PrivateAttr(default_factory=list)
+    _columns: Dict[str, np.ndarray] = PrivateAttr(default_factory=dict)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "NumpyVectorStore"
+
+    @property
+    def client(self) -> Any:
+        return None
+
+    @classmethod
+    def exists(cls, persist_dir: str) -> bool:
+        """Whether a persisted index is present in persist_dir"""
+        return os.path.exists(os.path.join(persist_dir, NODES_FILE))
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: str) -> "NumpyVectorStore":
+        """Load a persisted index; the embedding matrix is memory-mapped read-only"""
+        with open(os.path.join(persist_dir, NODES_FILE)) as f:
+            payload = json.load(f)
+
+        store = cls(persist_dir=persist_dir, quantize=payload.get("quantize", False))
+        store._ids = payload["ids"]
+        store._texts = payload["texts"]
+        store._metadata = payload["metadata"]
+
+        if store._ids:
+            store._matrix = np.load(os.path.join(persist_dir, EMBEDDINGS_FILE), mmap_mode="r")
+            if store.quantize:
+                store._scales = np.load(os.path.join(persist_dir, SCALES_FILE))
+
+        return store
+
+    def count(self) -> int:
+        # Not __len__: an empty store would be falsy, and StorageContext.from_defaults
+        # silently swaps falsy vector stores for a SimpleVectorStore
+        return len(self._ids)
+
+    # ---------- Writes ----------
+
+    def add(self, nodes: List[BaseNode], **add_kwargs: Any) -> List[str]:
+        """Append nodes and their embeddings"""
+        if not nodes:
+            return []
+
+        embeddings = np.asarray([node.get_embedding() for node in nodes], dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._pending.append(embeddings / norms)
+
+        for node in nodes:
+            self._ids.append(node.node_id)
+            self._texts.append(node.get_content())
+            self._metadata.append(
+                node_to_metadata_dict(node, remove_text=True, flat_metadata=self.flat_metadata)
+            )
+
+        self._columns.clear()
+        return [node.node_id for node in nodes]
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        """Delete all nodes that came from the given source document"""
+        self._compact()
+
+        keep = [i for i, meta in enumerate(self._metadata) if meta.get("ref_doc_id") != ref_doc_id]
+        if len(keep) == len(self._ids):
+            return
+
+        self._ids = [self._ids[i] for i in keep]
+        self._texts = [self._texts[i] for i in keep]
+        self._metadata = [self._metadata[i] for i in keep]
+        if self._matrix is not None:
+            self._matrix = np.ascontiguousarray(self._matrix[keep])
+            if self._scales is not None:
+                self._scales = self._scales[keep]
+        self._columns.clear()
+
+    def _dense_matrix(self) -> Optional[np.ndarray]:
+        """Current embeddings as float32 (dequantized if needed)"""
+        if self._matrix is None:
+            return None
+        if self._scales is not None:
+            return self._matrix.astype(np.float32) * self._scales[:, None]
+        return np.asarray(self._matrix, dtype=np.float32)
+
+    def _compact(self):
+        """Merge pending rows into one contiguous (optionally quantized) matrix"""
+        if not self._pending:
+            return
+
+        blocks = self._pending
+        existing = self._dense_matrix()
+        if existing is not None:
+            blocks = [existing] + blocks
+        dense = np.ascontiguousarray(np.vstack(blocks), dtype=np.float32)
+        self._pending = []
+
+        if self.quantize:
+            scales = np.abs(dense).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._matrix = np.round(dense / scales[:, None]).astype(np.int8)
+            self._scales = scales.astype(np.float32)
+        else:
+            self._matrix = dense
+            self._scales = None
+
+    def persist(self, persist_path: Optional[str] = None, fs=None) -> None:
+        """
+        Write the index to persist_dir.
+        Files are written under temporary names and swapped in with os.replace,
+        so readers never see a partially written index.
+        """
+        persist_dir = persist_path or self.persist_dir
+        if not persist_dir:
+            raise ValueError("persist_dir is required to persist NumpyVectorStore")
+        os.makedirs(persist_dir, exist_ok=True)
+        self._compact()
+
+        def _replace(name: str, write):
+            tmp_path = os.path.join(persist_dir, f".{name}.tmp")
+            write(tmp_path)
+            os.replace(tmp_path, os.path.join(persist_dir, name))
+
+        def _array_writer(array: np.ndarray):
+            def _write(path: str):
+                with open(path, "wb") as f:
+                    np.save(f, array)
+            return _write
+
+        if self._matrix is not None:
+            _replace(EMBEDDINGS_FILE, _array_writer(self._matrix))
+            if self._scales is not None:
+                _replace(SCALES_FILE, _array_writer(self._scales))
+
+        def _write_nodes(path: str):
+            with open(path, "w") as f:
+                json.dump({
+                    "quantize": self.quantize,
+                    "ids": self._ids,
+                    "texts": self._texts,
+                    "metadata": self._metadata,
+                }, f)
+
+        # nodes.json goes last: its presence marks a complete index
+        _replace(NODES_FILE, _write_nodes)
+
+    def records(self) -> Iterator[Tuple[str, str, Dict[str, Any], List[float]]]:
+        """(node id, text, metadata dict, embedding) for every stored node, e.g. for snapshots"""
+        self._compact()
+        for row, node_id in enumerate(self._ids):
+            embedding = np.asarray(self._matrix[row], dtype=np.float32)
+            if self._scales is not None:
+                embedding = embedding * self._scales[row]
+            yield node_id, self._texts[row], self._metadata[row], embedding.tolist()
+
+    # ---------- Queries ----------
+
+    def _column(self, key: str) -> np.ndarray:
+        """Metadata values for one key as an object array (cached per key)"""
+        column = self._columns.get(key)
+        if column is None:
+            column = np.empty(len(self._metadata), dtype=object)
+            column[:] = [meta.get(key) for meta in self._metadata]
+            self._columns[key] = column
+        return column
+
+    def _filter_mask(self, filters: MetadataFilters) -> np.ndarray:
+        """Evaluate (possibly nested) metadata filters into a boolean row mask"""
+        masks = []
+        for metadata_filter in filters.filters:
+            if isinstance(metadata_filter, MetadataFilters):
+                masks.append(self._filter_mask(metadata_filter))
+                continue
+
+            column = self._column(metadata_filter.key)
+            value = metadata_filter.value
+            operator = metadata_filter.operator
+
+            if operator == FilterOperator.EQ:
+                mask = column == value
+            elif operator == FilterOperator.NE:
+                mask = column != value
+            elif operator in (FilterOperator.IN, FilterOperator.NIN):
+                values = set(value)
+                mask = np.fromiter((v in values for v in column), dtype=bool, count=len(column))
+                if operator == FilterOperator.NIN:
+                    mask = ~mask
+            else:
+                compare = {
+                    FilterOperator.GT: lambda v: v > value,
+                    FilterOperator.GTE: lambda v: v >= value,
+                    FilterOperator.LT: lambda v: v < value,
+                    FilterOperator.LTE: lambda v: v <= value,
+                }.get(operator)
+                if compare is None:
+                    raise ValueError(f"Unsupported filter operator: {operator}")
+                mask = np.fromiter(
+                    (v is not None and compare(v) for v in column), dtype=bool, count=len(column)
+                )
+            masks.append(np.asarray(mask, dtype=bool))
+
+        if not masks:
+            return np.ones(len(self._ids), dtype=bool)
+        if filters.condition == FilterCondition.OR:
+            return np.logical_or.reduce(masks)
+        return np.logical_and.reduce(masks)
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """Exact top-k by cosine similarity, with metadata filters applied first"""
+        return self.query_batch([query])[0]
+
+    def query_batch(self, queries: List[VectorStoreQuery]) -> List[VectorStoreQueryResult]:
+        """
+        Answer several queries at once. Queries that share the same filters
+        are scored together with a single matrix-matrix product.
+        """
+        self._compact()
+        empty = VectorStoreQueryResult(nodes=[], similarities=[], ids=[])
+        results: List[VectorStoreQueryResult] = [empty] * len(queries)
+
+        groups: Dict[Optional[str], List[int]] = {}
+        for position, query in enumerate(queries):
+            if self._matrix is None or query.query_embedding is None:
+                continue
+            key = query.filters.model_dump_json() if query.filters is not None else None
+            groups.setdefault(key, []).append(position)
+
+        for positions in groups.values():
+            rows = None
+            matrix = self._matrix
+            scales = self._scales
+            filters = queries[positions[0]].filters
+            if filters is not None:
+                rows = np.flatnonzero(self._filter_mask(filters))
+                if not len(rows):
+                    continue
+                matrix = matrix[rows]
+                scales = scales[rows] if scales is not None else None
+
+            query_matrix = np.stack([
+                self._normalize(queries[position].query_embedding) for position in positions
+            ], axis=1)
+            scores = matrix @ query_matrix
+            if scales is not None:
+                scores = scores * scales[:, None]
+
+            for column, position in enumerate(positions):
+                results[position] = self._top_k(
+                    scores[:, column], rows, queries[position].similarity_top_k
+                )
+
+        return results
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _top_k(self, scores: np.ndarray, rows: Optional[np.ndarray], k: int) -> VectorStoreQueryResult:
+        """Build the result for the k best scores (scores index into `rows` when filtered)"""
+        top_k = min(k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+
+        nodes, similarities, ids = [], [], []
+        for position in top:
+            row = int(rows[position]) if rows is not None else int(position)
+            node = metadata_dict_to_node(self._metadata[row])
+            node.set_content(self._texts[row])
+            nodes.append(node)
+            similarities.append(float(scores[position]))
+            ids.append(self._ids[row])
+
+        return VectorStoreQueryResult(nodes=nodes, similarities=similarities, ids=ids)
@@ -0,0 +1,300 @@
+"""
+pgvector store for LlamaIndex
+Keeps embeddings in the ai_embedded_document table so retrieval runs in
+Postgres next to the catalog: vector distance is combined with relational
+filters (category, live price, in-stock via stock) in a single SQL query.
+"""
+
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.db import connection, transaction
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    FilterCondition,
+    FilterOperator,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryResult,
+)
+from llama_index.core.vector_stores.utils import (
+    metadata_dict_to_node,
+    node_to_metadata_dict,
+)
+
+from apps.ai_assistant.models import AIEmbeddedDocument
+
+
+TABLE = AIEmbeddedDocument._meta.db_table
+
+# A product is in stock when every one of its part options has stock;
+# a part is in stock when at least one of its options has stock.
+IN_STOCK_SQL = """
+CASE e.document_type
+    WHEN 'product' THEN NOT EXISTS (
+        SELECT 1 FROM preconfiguredproductparts pp
+        WHERE pp.preconfigured_product_id = e.document_id
+          AND NOT EXISTS (
+              SELECT 1 FROM stock s
+              WHERE s.part_option_id = pp.part_option_id AND s.quantity > 0
+          )
+    )
+    WHEN 'part' THEN EXISTS (
+        SELECT 1 FROM partoption o
+        JOIN stock s ON s.part_option_id = o.id
+        WHERE o.part_id = e.document_id AND s.quantity > 0
+    )
+    ELSE TRUE
+END
+"""
+
+COMPARISON_OPERATORS = {
+    FilterOperator.EQ: "=",
+    FilterOperator.NE: "<>",
+    FilterOperator.GT: ">",
+    FilterOperator.GTE: ">=",
+    FilterOperator.LT: "<",
+    FilterOperator.LTE: "<=",
+}
+
+
+def _vector_literal(embedding: List[float]) -> str:
+    return "[" + ",".join(repr(float(value)) for value in embedding) + "]"
+
+
+def _document_id(ref_doc_id: Optional[str]) -> int:
+    """Numeric id of the source record, from keys like "product_12" (0 if none)"""
+    suffix = (ref_doc_id or "").rsplit("_", 1)[-1]
+    return int(suffix) if suffix.isdigit() else 0
+
+
+class PgVectorStore(BasePydanticVectorStore):
+    """
+    Vector store backed by AIEmbeddedDocument with an HNSW cosine index.
+
+    Besides metadata keys, filters understand relational keys that are
+    resolved against live catalog tables instead of indexed metadata:
+    - base_price: preconfiguredproduct.base_price
+    - category_id: preconfiguredproduct.category_id for products, metadata otherwise
+    - in_stock: stock rows with quantity > 0 (see IN_STOCK_SQL)
+
+    Each store instance reads and writes one `index_version`, so a rebuild
+    can fill a new version while the previous one keeps serving.
+    """
+
+    stores_text: bool = True
+    flat_metadata: bool = False
+
+    # HNSW candidate list size; raised for large top-k so filtered queries still fill up
+    ef_search: int = 100
+
+    # None addresses rows written before versioned builds existed
+    index_version: Optional[str] = None
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "PgVectorStore"
+
+    @property
+    def client(self) -> Any:
+        return connection
+
+    @classmethod
+    def versions(cls) -> List[str]:
+        """Index versions that have rows"""
+        return list(
+            AIEmbeddedDocument.objects.filter(index_version__isnull=False)
+            .values_list('index_version', flat=True)
+            .distinct()
+        )
+
+    def _rows(self):
+        """Index rows of this store's version (admin-authored knowledge rows excluded)"""
+        return AIEmbeddedDocument.objects.filter(
+            node_id__isnull=False,
+            index_version=self.index_version
+        )
+
+    def exists(self) -> bool:
+        """Whether any index rows have been written for this version"""
+        return self._rows().exists()
+
+    def count(self) -> int:
+        return self._rows().count()
+
+    def clear(self):
+        """Remove all index rows of this version"""
+        self._rows().delete()
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        """Delete all nodes that came from the given source document"""
+        self._rows().filter(ref_doc_id=ref_doc_id).delete()
+
+    def add(self, nodes: List[BaseNode], **add_kwargs: Any) -> List[str]:
+        """
+        Bulk upsert nodes: rows are streamed into a temp table with COPY and
+        merged with one INSERT ... ON CONFLICT, regardless of batch size.
+        """
+        if not nodes:
+            return []
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for node in nodes:
+            metadata = node_to_metadata_dict(node, remove_text=True, flat_metadata=self.flat_metadata)
+            writer.writerow([
+                node.node_id,
+                node.ref_doc_id or "",
+                node.metadata.get("type", ""),
+                _document_id(node.ref_doc_id),
+                node.get_content(),
+                json.dumps(metadata),
+                _vector_literal(node.get_embedding()),
+            ])
+        buffer.seek(0)
+
+        dimensions = AIEmbeddedDocument.EMBEDDING_DIMENSIONS
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TEMP TABLE ai_embedded_document_stage (
+                    node_id varchar(255),
+                    ref_doc_id varchar(255),
+                    document_type varchar(50),
+                    document_id integer,
+                    content text,
+                    metadata jsonb,
+                    embedding vector({dimensions})
+                ) ON COMMIT DROP
+            """)
+            cursor.copy_expert(
+                "COPY ai_embedded_document_stage FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+            cursor.execute(f"""
+                INSERT INTO {TABLE} (
+                    node_id, ref_doc_id, document_type, document_id,
+                    content, metadata, embedding, index_version, created_at, updated_at
+                )
+                SELECT node_id, NULLIF(ref_doc_id, ''), document_type, document_id,
+                       content, metadata, embedding, %s, now(), now()
+                FROM ai_embedded_document_stage
+                ON CONFLICT (node_id) DO UPDATE SET
+                    index_version = EXCLUDED.index_version,
+                    ref_doc_id = EXCLUDED.ref_doc_id,
+                    document_type = EXCLUDED.document_type,
+                    document_id = EXCLUDED.document_id,
+                    content = EXCLUDED.content,
+                    metadata = EXCLUDED.metadata,
+                    embedding = EXCLUDED.embedding,
+                    updated_at = now()
+            """, [self.index_version])
+
+        return [node.node_id for node in nodes]
+
+    def records(self) -> Iterator[Tuple[str, str, Dict[str, Any], List[float]]]:
+        """(node id, text, metadata dict, embedding) for every stored node, e.g. for snapshots"""
+        rows = self._rows().values_list('node_id', 'content', 'metadata', 'embedding')
+        for node_id, content, metadata, embedding in rows.iterator(chunk_size=1000):
+            yield node_id, content, metadata, [float(value) for value in embedding]
+
+    # ---------- Queries ----------
+
+    def _filter_sql(self, filters: MetadataFilters) -> Tuple[str, List[Any]]:
+        """Translate (possibly nested) metadata filters into a SQL predicate"""
+        clauses, params = [], []
+
+        for metadata_filter in filters.filters:
+            if isinstance(metadata_filter, MetadataFilters):
+                clause, clause_params = self._filter_sql(metadata_filter)
+                clauses.append(f"({clause})")
+                params.extend(clause_params)
+                continue
+
+            key = metadata_filter.key
+            value = metadata_filter.value
+            operator = metadata_filter.operator
+
+            if key == "in_stock":
+                negate = (operator == FilterOperator.NE) != bool(value)
+                clauses.append(f"NOT ({IN_STOCK_SQL})" if negate else f"({IN_STOCK_SQL})")
+                continue
+
+            if key == "type":
+                column = "e.document_type"
+            elif key == "base_price":
+                column = "p.base_price"
+            elif key == "category_id":
+                column = "COALESCE(p.category_id, (e.metadata->>'category_id')::bigint)"
+            else:
+                sample = value[0] if isinstance(value, (list, tuple)) and value else value
+                if isinstance(sample, bool):
+                    cast = "boolean"
+                elif isinstance(sample, (int, float)):
+                    cast = "numeric"
+                else:
+                    cast = "text"
+                column = f"(e.metadata->>%s)::{cast}"
+                params.append(key)
+
+            if operator in (FilterOperator.IN, FilterOperator.NIN):
+                prefix = "" if operator == FilterOperator.IN else "NOT "
+                clauses.append(f"{prefix}({column} = ANY(%s))")
+                params.append(list(value))
+            elif operator in COMPARISON_OPERATORS:
+                clauses.append(f"{column} {COMPARISON_OPERATORS[operator]} %s")
+                params.append(value)
+            else:
+                raise ValueError(f"Unsupported filter operator: {operator}")
+
+        if not clauses:
+            return "TRUE", []
+        joiner = " OR " if filters.condition == FilterCondition.OR else " AND "
+        return joiner.join(clauses), params
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """Nearest neighbours by cosine distance, filtered in the same SQL statement"""
+        if query.query_embedding is None:
+            return VectorStoreQueryResult(nodes=[], similarities=[], ids=[])
+
+        where_sql, where_params = "TRUE", []
+        if query.filters is not None:
+            where_sql, where_params = self._filter_sql(query.filters)
+
+        vector = _vector_literal(query.query_embedding)
+        sql = f"""
+            SELECT e.node_id, e.content, e.metadata, e.embedding <=> %s::vector AS distance
+            FROM {TABLE} e
+            LEFT JOIN preconfiguredproduct p
+                ON e.document_type = 'product' AND p.id = e.document_id
+            WHERE e.node_id IS NOT NULL AND e.embedding IS NOT NULL
+              AND e.index_version IS NOT DISTINCT FROM %s
+              AND ({where_sql})
+            ORDER BY e.embedding <=> %s::vector
+            LIMIT %s
+        """
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('hnsw.ef_search', %s, true)",
+                [str(max(self.ef_search, query.similarity_top_k))]
+            )
+            cursor.execute(
+                sql,
+                [vector, self.index_version, *where_params, vector, query.similarity_top_k]
+            )
+            rows = cursor.fetchall()
+
+        nodes, similarities, ids = [], [], []
+        for node_id, content, metadata, distance in rows:
+            if isinstance(metadata, str):
+                metadata = json.loads(metadata)
+            node = metadata_dict_to_node(metadata)
+            node.set_content(content)
+            nodes.append(node)
+            similarities.append(1.0 - float(distance))
+            ids.append(node_id)
+
+        return VectorStoreQueryResult(nodes=nodes, similarities=similarities, ids=ids)
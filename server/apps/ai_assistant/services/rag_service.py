@@ -4,9 +4,10 @@ Retrieves relevant information from the product catalog to enhance AI responses
 """
 
 from typing import List, Dict, Optional
-from django.db.models import Q
-from apps.products.models import Category, PartOption
+from apps.products.models import Category
+from apps.products.services import search_part_options as ranked_part_option_search
 from apps.preconfigured_products.models import PreConfiguredProduct
+from apps.preconfigured_products.services import search_products as ranked_product_search
 
 
 class RAGService:
@@ -44,20 +45,9 @@ class RAGService:
         Returns:
             List of matching products with relevance scores
         """
-        # Build query
-        products = PreConfiguredProduct.objects.select_related('category')
-
-        if category_id:
-            products = products.filter(category_id=category_id)
-
-        # Simple text search in name and description
-        query_terms = query.lower().split()
-        q_objects = Q()
-
-        for term in query_terms:
-            q_objects |= Q(name__icontains=term) | Q(description__icontains=term)
-
-        products = products.filter(q_objects).distinct()[:limit]
+        # Ranked full-text + trigram search (GIN indexes), best match first;
+        # chat text matches on any of its terms
+        products = ranked_product_search(query, category_id, match_any=True)[:limit]
 
         return [
             {
@@ -68,26 +58,11 @@ class RAGService:
                 "base_price": float(p.base_price),
                 "description": p.description or "",
                 "image_url": p.image.url if p.image else None,
-                "relevance_score": RAGService._calculate_relevance(p, query_terms)
+                "relevance_score": float(p.rank)
             }
             for p in products
         ]
 
-    @staticmethod
-    def _calculate_relevance(product, query_terms: List[str]) -> float:
-        """Calculate simple relevance score based on keyword matches"""
-        score = 0.0
-        name_lower = product.name.lower()
-        desc_lower = (product.description or "").lower()
-
-        for term in query_terms:
-            if term in name_lower:
-                score += 2.0  # Higher weight for name matches
-            if term in desc_lower:
-                score += 1.0  # Lower weight for description matches
-
-        return score
-
     @staticmethod
     def search_part_options(query: str, category_id: Optional[int] = None, limit: int = 5) -> List[Dict]:
         """
@@ -101,18 +76,7 @@ class RAGService:
         Returns:
             List of matching part options
         """
-        options = PartOption.objects.select_related('part', 'part__category')
-
-        if category_id:
-            options = options.filter(part__category_id=category_id)
-
-        query_terms = query.lower().split()
-        q_objects = Q()
-
-        for term in query_terms:
-            q_objects |= Q(name__icontains=term) | Q(description__icontains=term)
-
-        options = options.filter(q_objects).distinct()[:limit]
+        options = ranked_part_option_search(query, category_id, match_any=True)[:limit]
 
         return [
             {
@@ -16,8 +16,8 @@ class RAGService:
     Provides context for LLM responses by retrieving relevant information.
     """
 
-    def __init__(self):
-        self.index_service = get_index_service()
+    def __init__(self, index_service=None):
+        self.index_service = index_service or get_index_service()
 
     def retrieve_context_for_query(self, query: str, session_context: Dict = None) -> Dict:
         """
@@ -174,11 +174,11 @@ class RAGService:
         Search for products with optional filters.
         Uses LlamaIndex semantic search - NO HARDCODED LOGIC!
         """
-        products = self.index_service.search_products(query, category_id)
-
-        # Apply price filter if specified
-        if price_max:
-            products = [p for p in products if p.get("base_price", 0) <= price_max]
+        # Price filter is applied inside the index search so it does not
+        # shrink an already truncated top-k
+        products = self.index_service.search_products(
+            query, category_id, price_max=price_max or None
+        )
 
         return self._format_products(products)
 
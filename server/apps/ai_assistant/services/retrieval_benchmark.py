@@ -0,0 +1,464 @@
+"""
+Retrieval benchmark and quality suite for IndexService
+Generates a synthetic catalog with labelled queries, builds an index from it
+in a scratch directory, and measures build time, query latency (p50/p95),
+recall@k and MRR for product search, category search and intent
+classification. Runs offline with the hashing embedder and never touches
+the database or the live index.
+"""
+
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from django.test import override_settings
+from llama_index.core import Document
+
+from .index_service import IndexService
+from .rag_service_new import RAGService
+
+
+CATEGORY_STYLES = [
+    "Mountain", "Road", "Gravel", "Touring", "Electric", "Kids", "Racing", "Urban",
+    "Trail", "Cargo", "Folding", "Vintage", "Downhill", "Beach", "Winter", "Studio",
+]
+CATEGORY_KINDS = ["Bikes", "Skis", "Surfboards", "Scooters", "Skateboards", "Kayaks", "Snowboards", "Helmets"]
+PART_NAMES = ["Frame", "Wheels", "Rim Color", "Chain", "Saddle", "Handlebar", "Brakes", "Fork", "Tires", "Pedals"]
+OPTION_MATERIALS = ["Carbon", "Aluminium", "Steel", "Titanium", "Bamboo", "Chromoly", "Alloy", "Composite"]
+OPTION_FINISHES = ["Red", "Matte Black", "Ocean Blue", "Silver", "Forest Green", "Sunset Orange", "Pearl White"]
+PRODUCT_BRANDS = ["Apex", "Summit", "Velox", "Kestrel", "Nimbus", "Orion", "Falcon", "Zephyr", "Tundra", "Comet"]
+FAQ_TOPICS = [
+    ("How long does delivery to {place} take?", "Deliveries to {place} usually arrive within {days} business days."),
+    ("Can I return an order shipped to {place}?", "Returns from {place} are accepted within {days} days of delivery."),
+    ("Do you offer a warranty on orders from {place}?", "Every order to {place} has a {days} month warranty on parts."),
+    ("Which payment methods work in {place}?", "Customers in {place} can pay by card or mobile money within {days} minutes."),
+]
+FAQ_PLACES = ["Kampala", "Entebbe", "Jinja", "Mbarara", "Gulu", "Mbale", "Arua", "Fort Portal", "Masaka", "Lira"]
+
+# Expected RAGService intents for each labelled intent query template
+INTENT_TEMPLATES = {
+    "product_search": "{product}",
+    "recommendation": "I'm looking for the {product}",
+    "compatibility": "is {option1} compatible with {option2}",
+    "customization": "what options can I change for the {part} of {category}",
+    "support": "{question}",
+}
+
+
+def with_typo(text: str, rng: random.Random) -> str:
+    """Swap two adjacent letters in the longest word to simulate a spelling variant"""
+    words = text.split()
+    if not words:
+        return text
+    longest = max(range(len(words)), key=lambda i: len(words[i]))
+    word = words[longest]
+    if len(word) < 4:
+        return text
+    pos = rng.randrange(1, len(word) - 2)
+    words[longest] = word[:pos] + word[pos + 1] + word[pos] + word[pos + 2:]
+    return " ".join(words)
+
+
+def _unique_names(pool: List[str], count: int) -> List[str]:
+    """First `count` names of a shuffled pool, numbered once the pool runs out"""
+    return [
+        pool[i % len(pool)] if i < len(pool) else f"{pool[i % len(pool)]} {i // len(pool) + 1}"
+        for i in range(count)
+    ]
+
+
+class SyntheticCatalog:
+    """
+    Deterministic catalog of LlamaIndex documents in the same format as the
+    document loaders, plus labelled queries for every benchmarked task.
+
+    Labelled queries are dicts with "task", "query" and "expected" (the id
+    or intent a correct answer returns).
+    """
+
+    def __init__(
+        self,
+        categories: int = 10,
+        options: int = 400,
+        products_per_category: int = 5,
+        rules: int = 50,
+        faqs: int = 20,
+        seed: int = 42
+    ):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.categories: List[Dict] = []
+        self.parts: List[Dict] = []
+        self.products: List[Dict] = []
+        self.rules: List[Dict] = []
+        self.faqs: List[Dict] = []
+
+        self._generate(categories, options, products_per_category, rules, faqs)
+
+    # ---------- Catalog ----------
+
+    def _generate(self, categories: int, options: int, products_per_category: int, rules: int, faqs: int):
+        rng = self.rng
+        styles = [f"{style} {kind}" for kind in CATEGORY_KINDS for style in CATEGORY_STYLES]
+        rng.shuffle(styles)
+
+        for category_id, name in enumerate(_unique_names(styles, categories), start=1):
+            self.categories.append({"id": category_id, "name": name})
+
+        # One part per (category, part name); options are spread across parts
+        part_count = max(1, min(options, categories * len(PART_NAMES)))
+        for part_id in range(1, part_count + 1):
+            category = self.categories[(part_id - 1) % categories]
+            self.parts.append({
+                "id": part_id,
+                "name": PART_NAMES[(part_id - 1) // categories % len(PART_NAMES)],
+                "category": category,
+                "step": (part_id - 1) // categories + 1,
+                "options": [],
+            })
+
+        for option_id in range(1, options + 1):
+            part = self.parts[(option_id - 1) % part_count]
+            part["options"].append({
+                "id": option_id,
+                "name": f"{rng.choice(OPTION_FINISHES)} {rng.choice(OPTION_MATERIALS)} {part['name']} {option_id}",
+                "price": rng.randrange(20, 800),
+                "in_stock": rng.random() > 0.2,
+                "part": part,
+            })
+
+        product_id = 0
+        for category in self.categories:
+            category_parts = [part for part in self.parts if part["category"] is category and part["options"]]
+            for _ in range(products_per_category):
+                product_id += 1
+                style = category["name"].split()[0]
+                self.products.append({
+                    "id": product_id,
+                    "name": f"{rng.choice(PRODUCT_BRANDS)} {style} {100 + product_id * 7}",
+                    "category": category,
+                    "base_price": float(rng.randrange(300, 5000)),
+                    "options": [rng.choice(part["options"]) for part in category_parts],
+                })
+
+        all_options = [option for part in self.parts for option in part["options"]]
+        for rule_id in range(1, rules + 1):
+            option1, option2 = rng.sample(all_options, 2)
+            self.rules.append({
+                "id": rule_id,
+                "option1": option1,
+                "option2": option2,
+                "message": f"The {option1['name']} does not fit the {option2['name']}",
+            })
+
+        places = _unique_names(FAQ_PLACES, faqs)
+        for faq_id in range(1, faqs + 1):
+            question, answer = FAQ_TOPICS[(faq_id - 1) % len(FAQ_TOPICS)]
+            values = {"place": places[faq_id - 1], "days": rng.randrange(2, 30)}
+            self.faqs.append({
+                "id": faq_id,
+                "question": question.format(**values),
+                "answer": answer.format(**values),
+            })
+
+    # ---------- Documents ----------
+
+    def documents(self) -> Iterator[Document]:
+        """Yield the catalog as documents shaped like MasterDocumentLoader's"""
+        for category in self.categories:
+            parts_count = sum(1 for part in self.parts if part["category"] is category)
+            yield Document(
+                text=f"""
+Category: {category['name']}
+Description: {category['name']} built to order
+Available Parts: {parts_count}
+Category ID: {category['id']}
+
+This is a product category in Marcus Custom Bikes e-commerce platform.
+Customers can browse and customize products in this category.
+""",
+                doc_id=f"category_{category['id']}",
+                metadata={
+                    "type": "category",
+                    "category_id": category["id"],
+                    "category_name": category["name"],
+                    "parts_count": parts_count
+                }
+            )
+
+        for product in self.products:
+            category = product["category"]
+            configuration = "\n".join(
+                f"- {option['part']['name']}: {option['name']} (${option['price']})"
+                for option in product["options"]
+            )
+            yield Document(
+                text=f"""
+Product: {product['name']}
+Category: {category['name']}
+Base Price: ${product['base_price']}
+Description: The {product['name']} is our {category['name'].lower()} model
+
+Configuration:
+{configuration}
+
+Product ID: {product['id']}
+
+This is a pre-configured {category['name'].lower()} that customers can purchase as-is
+or customize by changing individual parts. The base price includes all listed components.
+""",
+                doc_id=f"product_{product['id']}",
+                metadata={
+                    "type": "product",
+                    "product_id": product["id"],
+                    "product_name": product["name"],
+                    "category_id": category["id"],
+                    "category_name": category["name"],
+                    "base_price": product["base_price"]
+                }
+            )
+
+        for part in self.parts:
+            category = part["category"]
+            options = "\n".join(
+                f"- {option['name']}: ${option['price']} ({'In Stock' if option['in_stock'] else 'Out of Stock'})"
+                for option in part["options"]
+            )
+            yield Document(
+                text=f"""
+Part Type: {part['name']}
+Category: {category['name']}
+Configuration Step: {part['step']}
+
+Available Options:
+{options}
+
+This is a customizable part for {category['name'].lower()}.
+Customers must select one option from this part type when building their product.
+""",
+                doc_id=f"part_{part['id']}",
+                metadata={
+                    "type": "part",
+                    "part_name": part["name"],
+                    "category_id": category["id"],
+                    "category_name": category["name"],
+                    "step": part["step"],
+                    "options_count": len(part["options"])
+                }
+            )
+
+        for rule in self.rules:
+            option1, option2 = rule["option1"], rule["option2"]
+            yield Document(
+                text=f"""
+Incompatibility Rule:
+{option1['part']['name']} "{option1['name']}" is NOT compatible with
+{option2['part']['name']} "{option2['name']}"
+
+Reason: {rule['message']}
+
+When a customer selects one of these options, the other option should not be available.
+This is an important configuration constraint.
+""",
+                doc_id=f"incompatibility_rule_{rule['id']}",
+                metadata={
+                    "type": "incompatibility_rule",
+                    "rule_id": rule["id"],
+                    "option1_id": option1["id"],
+                    "option2_id": option2["id"],
+                    "rule_message": rule["message"]
+                }
+            )
+
+        for faq in self.faqs:
+            yield Document(
+                text=f"Question: {faq['question']}\nAnswer: {faq['answer']}",
+                doc_id=f"knowledge_{faq['id']}",
+                metadata={"type": "faq", "document_id": faq["id"]}
+            )
+
+    # ---------- Labelled queries ----------
+
+    def queries(self) -> List[Dict]:
+        """Labelled queries for search_products, search_categories and intent classification"""
+        rng = random.Random(self.seed + 1)
+        queries = []
+
+        for product in self.products:
+            for query in (product["name"], product["name"].lower(), with_typo(product["name"], rng)):
+                queries.append({
+                    "task": "search_products",
+                    "query": query,
+                    "expected": product["id"],
+                })
+
+        for category in self.categories:
+            for query in (category["name"], f"show me {category['name'].lower()}", with_typo(category["name"], rng)):
+                queries.append({
+                    "task": "search_categories",
+                    "query": query,
+                    "expected": category["id"],
+                })
+
+        for product in self.products:
+            for intent in ("product_search", "recommendation"):
+                queries.append({
+                    "task": "intent",
+                    "query": INTENT_TEMPLATES[intent].format(product=product["name"]),
+                    "expected": intent,
+                })
+        for rule in self.rules:
+            queries.append({
+                "task": "intent",
+                "query": INTENT_TEMPLATES["compatibility"].format(
+                    option1=rule["option1"]["name"], option2=rule["option2"]["name"]
+                ),
+                "expected": "compatibility",
+            })
+        for part in self.parts:
+            queries.append({
+                "task": "intent",
+                "query": INTENT_TEMPLATES["customization"].format(
+                    part=part["name"].lower(), category=part["category"]["name"].lower()
+                ),
+                "expected": "customization",
+            })
+        for faq in self.faqs:
+            queries.append({
+                "task": "intent",
+                "query": INTENT_TEMPLATES["support"].format(question=faq["question"]),
+                "expected": "support",
+            })
+
+        return queries
+
+
+class SyntheticIndexService(IndexService):
+    """IndexService that indexes a synthetic catalog instead of the database"""
+
+    def __init__(self, catalog: SyntheticCatalog, **kwargs):
+        self.catalog = catalog
+        super().__init__(**kwargs)
+
+    def _stream_documents(self) -> Iterator[Document]:
+        return self.catalog.documents()
+
+
+# ---------- Metrics ----------
+
+def reciprocal_rank(expected, ranked: List) -> float:
+    """1/rank of the expected item in a ranking (0 when missing)"""
+    for rank, item in enumerate(ranked, start=1):
+        if item == expected:
+            return 1.0 / rank
+    return 0.0
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(latencies: List[float], ranks: List[float], k: int) -> Dict:
+    """Latency percentiles (ms), recall@k and MRR of one task"""
+    return {
+        "queries": len(ranks),
+        "recall_at_k": round(sum(1 for rank in ranks if rank >= 1.0 / k) / len(ranks), 4),
+        "mrr": round(statistics.fmean(ranks), 4),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+    }
+
+
+def _timed(func: Callable, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run_benchmark(
+    catalog: SyntheticCatalog,
+    k: int = 5,
+    modes: Optional[List[str]] = None,
+    vector_backend: str = "numpy",
+    embedding_backend: str = "hashing",
+    persist_dir: Optional[str] = None
+) -> Dict:
+    """
+    Build an index of the catalog and run every labelled query against it
+    in each retrieval mode. The cache is swapped for a local one and the
+    index lives in a scratch directory, so the live index is never touched.
+    """
+    modes = modes or list(IndexService.RETRIEVAL_MODES)
+    queries = catalog.queries()
+    scratch_dir = persist_dir or tempfile.mkdtemp(prefix="ai_benchmark_")
+    local_cache = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+    try:
+        with override_settings(CACHES=local_cache):
+            service = SyntheticIndexService(
+                catalog,
+                persist_dir=scratch_dir,
+                retrieval_mode="hybrid",
+                vector_backend=vector_backend,
+                embedding_backend=embedding_backend,
+                service_url=""
+            )
+            _, build_ms = _timed(service.build_index, force=True)
+            rag_service = RAGService(index_service=service)
+
+            report = {
+                "catalog": {
+                    "categories": len(catalog.categories),
+                    "parts": len(catalog.parts),
+                    "options": sum(len(part["options"]) for part in catalog.parts),
+                    "products": len(catalog.products),
+                    "rules": len(catalog.rules),
+                    "faqs": len(catalog.faqs),
+                    "documents": len(service.lexical_index),
+                },
+                "vector_backend": vector_backend,
+                "embedding_model": service._embedding_model_name(),
+                "k": k,
+                "build_seconds": round(build_ms / 1000, 3),
+                "modes": {},
+            }
+
+            for mode in modes:
+                service.retrieval_mode = mode
+                report["modes"][mode] = _run_queries(service, rag_service, queries, k)
+
+            return report
+    finally:
+        if persist_dir is None:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def _run_queries(service: IndexService, rag_service: RAGService, queries: List[Dict], k: int) -> Dict:
+    latencies: Dict[str, List[float]] = {}
+    ranks: Dict[str, List[float]] = {}
+
+    for labelled in queries:
+        task = labelled["task"]
+        if task == "search_products":
+            results, elapsed = _timed(service.search_products, labelled["query"], top_k=k)
+            ranked = [result["id"] for result in results]
+        elif task == "search_categories":
+            results, elapsed = _timed(service.search_categories, labelled["query"], top_k=k)
+            ranked = [result["id"] for result in results]
+        else:
+            intent, elapsed = _timed(rag_service._classify_intent, labelled["query"])
+            ranked = [intent]
+
+        latencies.setdefault(task, []).append(elapsed)
+        ranks.setdefault(task, []).append(reciprocal_rank(labelled["expected"], ranked))
+
+    results = {task: summarize(latencies[task], ranks[task], k) for task in ranks}
+    # Intent classification returns one label: recall@k and MRR both equal accuracy
+    if "intent" in results:
+        results["intent"]["accuracy"] = results["intent"].pop("mrr")
+        results["intent"].pop("recall_at_k")
+    return results
@@ -0,0 +1,119 @@
+"""
+Client for the shared retrieval daemon (see retrieval_server.py)
+Lets IndexService run as a thin client: web and Celery workers send
+retrieval requests to one process that owns the index, instead of each
+loading LlamaIndex, the vector store and the embedding model themselves.
+"""
+
+import http.client
+import json
+import socket
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from llama_index.core.schema import NodeRelationship, NodeWithScore, RelatedNodeInfo, TextNode
+from llama_index.core.vector_stores import MetadataFilter
+
+
+def node_to_payload(node: NodeWithScore) -> Dict[str, Any]:
+    """JSON-safe form of a retrieved node"""
+    return {
+        "id": node.node.node_id,
+        "ref_doc_id": node.node.ref_doc_id,
+        "text": node.node.get_content(),
+        "metadata": node.node.metadata,
+        "score": node.score,
+    }
+
+
+def node_from_payload(payload: Dict[str, Any]) -> NodeWithScore:
+    """Inverse of node_to_payload; keeps the source document id for fusion and dedup"""
+    relationships = {}
+    if payload.get("ref_doc_id"):
+        relationships[NodeRelationship.SOURCE] = RelatedNodeInfo(node_id=payload["ref_doc_id"])
+
+    node = TextNode(
+        id_=payload["id"],
+        text=payload["text"],
+        metadata=payload["metadata"],
+        relationships=relationships,
+    )
+    return NodeWithScore(node=node, score=payload["score"])
+
+
+def filters_to_payload(filters: Optional[List[MetadataFilter]]) -> List[Dict[str, Any]]:
+    return [metadata_filter.model_dump(mode="json") for metadata_filter in filters or []]
+
+
+def filters_from_payload(payload: Optional[List[Dict[str, Any]]]) -> List[MetadataFilter]:
+    return [MetadataFilter(**item) for item in payload or []]
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP over a Unix domain socket"""
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class RetrievalClient:
+    """
+    Talks to the retrieval daemon over localhost HTTP ("http://127.0.0.1:8765")
+    or a Unix socket ("unix:///tmp/ai_retrieval.sock").
+    """
+
+    def __init__(self, url: str, timeout: float = 30):
+        self.url = url
+        self.timeout = timeout
+        parsed = urlparse(url)
+        self._socket_path = parsed.path if parsed.scheme == "unix" else None
+        self._host = parsed.hostname
+        self._port = parsed.port or 80
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._socket_path:
+            return _UnixHTTPConnection(self._socket_path, self.timeout)
+        return http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+
+    def _request(self, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
+        connection = self._connection()
+        try:
+            body = json.dumps(payload) if payload is not None else None
+            connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            data = json.loads(response.read() or b"{}")
+        finally:
+            connection.close()
+
+        if response.status != 200:
+            raise RuntimeError(f"Retrieval service error ({response.status}): {data.get('error')}")
+        return data
+
+    def retrieve(
+        self,
+        query: str,
+        top_k: int = 5,
+        doc_types: Optional[List[str]] = None,
+        category_id: Optional[int] = None,
+        extra_filters: Optional[List[MetadataFilter]] = None
+    ) -> List[NodeWithScore]:
+        data = self._request("POST", "/retrieve", {
+            "query": query,
+            "top_k": top_k,
+            "doc_types": doc_types,
+            "category_id": category_id,
+            "extra_filters": filters_to_payload(extra_filters),
+        })
+        return [node_from_payload(item) for item in data["nodes"]]
+
+    def ask(self, question: str) -> str:
+        return self._request("POST", "/ask", {"question": question})["answer"]
+
+    def stats(self) -> Dict:
+        return self._request("GET", "/stats")
@@ -0,0 +1,167 @@
+"""
+Shared retrieval daemon
+One process owns the index (vector store, embedding model, BM25) and serves
+retrieval over localhost HTTP or a Unix socket, so worker memory stays flat
+as gunicorn/Celery workers are added. Concurrent requests are collected into
+small batches and answered with IndexService.retrieve_batch.
+
+Endpoints (JSON):
+    POST /retrieve  {query, top_k, doc_types, category_id, extra_filters}
+    POST /ask       {question}
+    GET  /stats
+    GET  /health
+"""
+
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+
+from .index_service import IndexService
+from .retrieval_client import filters_from_payload, node_to_payload
+
+
+class QueryBatcher:
+    """
+    Collects requests from concurrent handler threads and passes them to
+    `handler` in batches: a batch closes when it reaches `max_batch` requests
+    or `max_wait` seconds after its first request arrived.
+    """
+
+    def __init__(self, handler: Callable[[List[Dict]], List], max_batch: int = 32, max_wait: float = 0.005):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Tuple[Dict, Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="retrieval-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, request: Dict):
+        """Queue a request and block until its batch has been answered"""
+        future: Future = Future()
+        self._queue.put((request, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            requests = [request for request, _ in batch]
+            try:
+                results = self.handler(requests)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+class RetrievalRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints; `self.server.index_service` and `self.server.batcher` are set by RetrievalServer"""
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send(200, self.server.index_service.get_stats())
+        else:
+            self._send(404, {"error": f"Unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        try:
+            payload = self._read_json()
+            if self.path == "/retrieve":
+                nodes = self.server.batcher.submit({
+                    "query": payload["query"],
+                    "top_k": int(payload.get("top_k", 5)),
+                    "doc_types": payload.get("doc_types"),
+                    "category_id": payload.get("category_id"),
+                    "extra_filters": filters_from_payload(payload.get("extra_filters")),
+                })
+                self._send(200, {"nodes": [node_to_payload(node) for node in nodes]})
+            elif self.path == "/ask":
+                answer = self.server.index_service.ask_question(payload["question"])
+                self._send(200, {"answer": answer})
+            else:
+                self._send(404, {"error": f"Unknown endpoint {self.path}"})
+        except (KeyError, ValueError) as e:
+            self._send(400, {"error": f"Invalid request: {e}"})
+        except Exception as e:
+            self._send(500, {"error": str(e)[:500]})
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class RetrievalServer:
+    """Owns an in-process IndexService and serves it on a TCP port or Unix socket"""
+
+    def __init__(
+        self,
+        index_service: IndexService,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        socket_path: str = None,
+        max_batch: int = 32,
+        max_wait_ms: float = 5,
+        verbose: bool = False
+    ):
+        if index_service.remote is not None:
+            raise ValueError("The retrieval server needs an in-process IndexService, not a client")
+
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            self.httpd = _ThreadingUnixHTTPServer(socket_path, RetrievalRequestHandler)
+            self.address = f"unix://{socket_path}"
+        else:
+            self.httpd = ThreadingHTTPServer((host, port), RetrievalRequestHandler)
+            self.address = f"http://{host}:{self.httpd.server_address[1]}"
+
+        self.httpd.index_service = index_service
+        self.httpd.batcher = QueryBatcher(index_service.retrieve_batch, max_batch, max_wait_ms / 1000)
+        self.httpd.verbose = verbose
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -17,8 +17,10 @@ def rebuild_ai_index():
 
     try:
         index_service = get_index_service()
-        index_service.rebuild_index()
-        return {"status": "success", "message": "AI index rebuilt successfully"}
+        version = index_service.rebuild_index()
+        if version is None:
+            return {"status": "skipped", "message": "Another rebuild is running or there is nothing to index"}
+        return {"status": "success", "message": "AI index rebuilt successfully", "version": version}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -33,9 +35,11 @@ def update_ai_index():
 
     try:
         index_service = get_index_service()
-        # Use rebuild_index to delete old collection and avoid duplicates
-        index_service.rebuild_index()
-        return {"status": "success", "message": "AI index updated successfully"}
+        # Builds a new index version and swaps it in once complete
+        version = index_service.rebuild_index()
+        if version is None:
+            return {"status": "skipped", "message": "Another rebuild is running or there is nothing to index"}
+        return {"status": "success", "message": "AI index updated successfully", "version": version}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
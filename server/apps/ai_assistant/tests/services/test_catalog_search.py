@@ -0,0 +1,63 @@
+"""
+Tests for the ranked full-text + trigram catalog search behind RAGService
+"""
+
+from django.test import TestCase
+from apps.ai_assistant.services.rag_service import RAGService
+from apps.preconfigured_products.models import PreConfiguredProduct
+from apps.products.models import Category, Part, PartOption
+
+
+class TestCatalogSearch(TestCase):
+    """search_vector columns are maintained by triggers; no Python-side indexing."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bikes = Category.objects.create(name="Bikes")
+        cls.boards = Category.objects.create(name="Surfboards")
+        PreConfiguredProduct.objects.create(
+            category=cls.bikes, name="Mountain Bike Pro", base_price=1200, description="Full suspension trail bike"
+        )
+        PreConfiguredProduct.objects.create(
+            category=cls.bikes, name="City Cruiser", base_price=500, description="Comfortable bike for mountain towns"
+        )
+        PreConfiguredProduct.objects.create(
+            category=cls.boards, name="Wave Rider", base_price=700, description="Longboard for small waves"
+        )
+        frame = Part.objects.create(name="Frame", category=cls.bikes)
+        PartOption.objects.create(part=frame, name="Carbon Frame", default_price=300, description="Light and stiff")
+        PartOption.objects.create(part=frame, name="Steel Frame", default_price=100, description="Durable classic")
+
+    def test_name_matches_rank_above_description_matches(self):
+        results = RAGService.search_products("mountain")
+
+        assert [r["name"] for r in results] == ["Mountain Bike Pro", "City Cruiser"]
+        assert results[0]["relevance_score"] > results[1]["relevance_score"]
+
+    def test_typos_match_by_trigram_similarity(self):
+        results = RAGService.search_products("mountian")
+
+        assert results[0]["name"] == "Mountain Bike Pro"
+
+    def test_conversational_queries_match_any_term(self):
+        results = RAGService.search_products("show me mountain bikes for trails")
+
+        # Pro matches mountain, bike and trail; Cruiser only bike and mountain
+        assert [r["name"] for r in results] == ["Mountain Bike Pro", "City Cruiser"]
+        assert [r["name"] for r in RAGService.search_part_options("do you have a carbon frame?")][0] == "Carbon Frame"
+
+    def test_category_filter_and_stemming(self):
+        assert [r["name"] for r in RAGService.search_products("waves", self.boards.id)] == ["Wave Rider"]
+        assert RAGService.search_products("waves", self.bikes.id) == []
+
+    def test_updates_refresh_the_search_vector(self):
+        product = PreConfiguredProduct.objects.get(name="Wave Rider")
+        product.name = "Gravel Explorer"
+        product.save()
+
+        assert [r["name"] for r in RAGService.search_products("gravel")] == ["Gravel Explorer"]
+
+    def test_part_option_search(self):
+        results = RAGService.search_part_options("carbon")
+
+        assert [r["name"] for r in results] == ["Carbon Frame"]
@@ -0,0 +1,57 @@
+"""
+Query-count tests for the streaming document loaders
+Loader queries must not grow with the size of the catalog.
+"""
+
+from django.test import TestCase
+from apps.ai_assistant.services.document_loaders import (
+    CategoryDocumentLoader,
+    PartOptionDocumentLoader,
+)
+from apps.products.models import Category, Part, PartOption, Stock
+
+
+class TestDocumentLoaderQueries(TestCase):
+    """10k part options across 200 parts in 10 categories."""
+
+    CATEGORIES = 10
+    PARTS = 200
+    OPTIONS = 10_000
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = Category.objects.bulk_create([
+            Category(name=f"Category {i}") for i in range(cls.CATEGORIES)
+        ])
+        parts = Part.objects.bulk_create([
+            Part(name=f"Part {i}", category=categories[i % cls.CATEGORIES], step=i)
+            for i in range(cls.PARTS)
+        ])
+        options = PartOption.objects.bulk_create([
+            PartOption(part=parts[i % cls.PARTS], name=f"Option {i}", default_price=10)
+            for i in range(cls.OPTIONS)
+        ])
+        # Every other option of each part is out of stock
+        Stock.objects.bulk_create([
+            Stock(part_option=option, quantity=(i // cls.PARTS) % 2)
+            for i, option in enumerate(options)
+        ])
+
+    def test_part_loader_uses_constant_queries(self):
+        """Parts with categories in one query, options with stock flags in one more."""
+        with self.assertNumQueries(2):
+            documents = list(PartOptionDocumentLoader.stream())
+
+        assert len(documents) == self.PARTS
+        first = documents[0]
+        assert first.metadata["options_count"] == self.OPTIONS // self.PARTS
+        assert "(In Stock)" in first.text
+        assert "(Out of Stock)" in first.text
+
+    def test_category_loader_counts_parts_in_one_query(self):
+        """Part counts come from a COUNT annotation, not a query per category."""
+        with self.assertNumQueries(1):
+            documents = list(CategoryDocumentLoader.stream())
+
+        assert len(documents) == self.CATEGORIES
+        assert {doc.metadata["parts_count"] for doc in documents} == {self.PARTS // self.CATEGORIES}
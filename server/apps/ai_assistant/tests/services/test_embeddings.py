@@ -0,0 +1,90 @@
+"""
+Unit tests for the embedding backends
+"""
+
+import numpy as np
+import pytest
+from apps.ai_assistant.services.embeddings import (
+    EmbeddingUnavailableError,
+    HashingEmbedding,
+    OllamaEmbedding,
+    get_embedding_model,
+)
+
+
+CATALOG = [
+    "Mountain bike frame full suspension aluminium",
+    "Road bike frame carbon diamond",
+    "Wheels road spoke carbon rim",
+    "Wheels mountain fat bike tubeless",
+    "Chain single speed rust proof",
+    "Rim color red black blue",
+]
+
+
+def cosine(a, b):
+    return float(np.dot(a, b))
+
+
+class TestHashingEmbedding:
+    """Test suite for HashingEmbedding."""
+
+    def test_embeddings_are_deterministic_and_normalized(self):
+        """Same text gives the same unit vector, even across instances."""
+        first = HashingEmbedding(dimensions=64).fit(CATALOG)
+        second = HashingEmbedding(dimensions=64).fit(CATALOG)
+
+        vector = first.get_text_embedding("carbon road frame")
+        assert len(vector) == 64
+        assert vector == second.get_text_embedding("carbon road frame")
+        assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-5)
+
+    def test_related_texts_score_higher(self):
+        """A query is closer to the document it shares terms with."""
+        embedder = HashingEmbedding(dimensions=256).fit(CATALOG)
+        query = embedder.get_query_embedding("carbon road frame")
+        road = embedder.get_text_embedding(CATALOG[1])
+        chain = embedder.get_text_embedding(CATALOG[4])
+
+        assert cosine(query, road) > cosine(query, chain)
+
+    def test_empty_text_is_zero_vector(self):
+        """Texts without tokens do not produce NaNs."""
+        vector = HashingEmbedding(dimensions=32).get_text_embedding("!!!")
+        assert vector == [0.0] * 32
+
+    def test_svd_output_is_padded_to_dimensions(self):
+        """A catalog smaller than `dimensions` yields zero-padded vectors."""
+        embedder = HashingEmbedding(dimensions=32, svd=True, hash_features=512).fit(CATALOG)
+        vector = embedder.get_text_embedding("mountain bike wheels")
+
+        assert len(vector) == 32
+        assert np.count_nonzero(vector[len(CATALOG):]) == 0
+        assert embedder.model_name == "hashing-tfidf-svd-32"
+
+    def test_save_load_round_trip(self, tmp_path):
+        """A loaded state embeds exactly like the fitted one."""
+        path = str(tmp_path / "embedder.npz")
+        fitted = HashingEmbedding(dimensions=32, svd=True, hash_features=512).fit(CATALOG)
+        fitted.save(path)
+
+        loaded = HashingEmbedding(dimensions=32, svd=True).load(path)
+        assert loaded.get_text_embedding("red rim") == fitted.get_text_embedding("red rim")
+
+        with pytest.raises(ValueError):
+            HashingEmbedding(dimensions=64, svd=True).load(path)
+
+
+class TestEmbeddingBackends:
+    """Test suite for the backend registry and Ollama failure handling."""
+
+    def test_registry_selects_backend(self):
+        assert isinstance(get_embedding_model("hashing"), HashingEmbedding)
+        with pytest.raises(ValueError):
+            get_embedding_model("unknown")
+
+    def test_ollama_failure_raises(self):
+        """An unreachable server raises instead of returning a zero vector."""
+        embedder = OllamaEmbedding(base_url="http://127.0.0.1:9")
+        with pytest.raises(EmbeddingUnavailableError):
+            embedder.get_query_embedding("bike")
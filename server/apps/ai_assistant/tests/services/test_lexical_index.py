@@ -0,0 +1,66 @@
+"""
+Unit tests for the BM25 lexical index and reciprocal rank fusion
+"""
+
+import pytest
+from apps.ai_assistant.services.lexical_index import (
+    BM25Index,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+
+
+class TestLexicalIndex:
+    """Test suite for BM25Index."""
+
+    @pytest.fixture
+    def index(self):
+        """Small index with a mix of document types."""
+        index = BM25Index()
+        index.upsert("product_1", "Red Rose Explosion Box with chocolates",
+                     {"type": "product", "category_id": 1})
+        index.upsert("product_2", "Helium Balloon Bouquet for birthdays",
+                     {"type": "product", "category_id": 2})
+        index.upsert("category_1", "Explosion Boxes category",
+                     {"type": "category", "category_id": 1})
+        index.upsert("faq_1", "Delivery to Kampala takes one day",
+                     {"type": "faq"})
+        return index
+
+    def test_tokenize_normalizes_variants(self):
+        """Accents, case and simple plurals map to the same term."""
+        assert tokenize("Kámpala BOXES") == tokenize("kampala box")
+
+    def test_exact_name_ranks_first(self, index):
+        """An exact product name returns that product first."""
+        hits = index.search("balloon bouquet", top_k=2)
+        assert hits[0].doc_id == "product_2"
+
+    def test_type_and_category_filters(self, index):
+        """Filters restrict results to matching documents."""
+        hits = index.search("explosion box", doc_types=["category"])
+        assert [hit.doc_id for hit in hits] == ["category_1"]
+
+        hits = index.search("explosion box", doc_types=["product"], category_id=2)
+        assert hits == []
+
+    def test_spelling_variant(self, index):
+        """A misspelled term still matches the close vocabulary term."""
+        hits = index.search("ballon bouqet", doc_types=["product"])
+        assert hits and hits[0].doc_id == "product_2"
+
+    def test_incremental_upsert_and_remove(self, index):
+        """Unchanged documents are skipped; removed documents disappear."""
+        assert index.upsert("faq_1", "Delivery to Kampala takes one day", {"type": "faq"}) is False
+        assert index.upsert("faq_1", "Delivery to Entebbe takes two days", {"type": "faq"}) is True
+        assert index.search("kampala") == []
+
+        index.remove("product_2")
+        assert len(index) == 3
+        assert index.search("balloon") == []
+
+    def test_reciprocal_rank_fusion(self):
+        """Documents ranked well by both lists come first."""
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "a", "d"]])
+        assert [doc_id for doc_id, _ in fused][:2] in (["a", "b"], ["b", "a"])
+        assert fused[-1][0] in ("c", "d")
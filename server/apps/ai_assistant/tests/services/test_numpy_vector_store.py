@@ -0,0 +1,117 @@
+"""
+Unit tests for the NumPy vector store backend
+"""
+
+import pytest
+from llama_index.core.schema import NodeRelationship, RelatedNodeInfo, TextNode
+from llama_index.core.vector_stores.types import (
+    FilterCondition,
+    MetadataFilter,
+    MetadataFilters,
+    VectorStoreQuery,
+)
+from llama_index.core.vector_stores.utils import metadata_dict_to_node
+from apps.ai_assistant.services.numpy_vector_store import NumpyVectorStore
+
+
+def _node(node_id, embedding, **metadata):
+    return TextNode(
+        id_=node_id,
+        text=f"text of {node_id}",
+        metadata=metadata,
+        embedding=embedding,
+        relationships={NodeRelationship.SOURCE: RelatedNodeInfo(node_id=f"doc_{node_id}")},
+    )
+
+
+class TestNumpyVectorStore:
+    """Test suite for NumpyVectorStore."""
+
+    @pytest.fixture
+    def nodes(self):
+        return [
+            _node("p1", [1.0, 0.0, 0.0], type="product", category_id=1),
+            _node("p2", [0.9, 0.1, 0.0], type="product", category_id=2),
+            _node("c1", [0.8, 0.0, 0.2], type="category", category_id=1),
+            _node("f1", [0.0, 1.0, 0.0], type="faq"),
+        ]
+
+    @pytest.mark.parametrize("quantize", [False, True])
+    def test_exact_top_k_after_persist(self, tmp_path, nodes, quantize):
+        """Persisted and memory-mapped store returns the same ranking."""
+        store = NumpyVectorStore(persist_dir=str(tmp_path), quantize=quantize)
+        store.add(nodes)
+        store.persist()
+
+        loaded = NumpyVectorStore.from_persist_dir(str(tmp_path))
+        result = loaded.query(VectorStoreQuery(query_embedding=[1.0, 0.0, 0.0], similarity_top_k=2))
+
+        assert result.ids == ["p1", "p2"]
+        assert result.nodes[0].get_content() == "text of p1"
+        assert result.similarities[0] == pytest.approx(1.0, abs=0.01)
+
+    def test_metadata_filters(self, nodes):
+        """Nested type/category filters restrict candidates before ranking."""
+        store = NumpyVectorStore()
+        store.add(nodes)
+
+        filters = MetadataFilters(
+            filters=[
+                MetadataFilters(
+                    filters=[
+                        MetadataFilter(key="type", value="product"),
+                        MetadataFilter(key="type", value="category"),
+                    ],
+                    condition=FilterCondition.OR,
+                ),
+                MetadataFilter(key="category_id", value=1),
+            ],
+            condition=FilterCondition.AND,
+        )
+        result = store.query(VectorStoreQuery(
+            query_embedding=[0.0, 0.0, 1.0], similarity_top_k=5, filters=filters
+        ))
+
+        assert result.ids == ["c1", "p1"]
+
+    def test_delete_by_ref_doc(self, nodes):
+        """Deleting a source document removes its rows."""
+        store = NumpyVectorStore()
+        store.add(nodes)
+        store.delete("doc_p1")
+
+        result = store.query(VectorStoreQuery(query_embedding=[1.0, 0.0, 0.0], similarity_top_k=4))
+        assert store.count() == 3
+        assert result.ids == ["p2", "c1", "f1"]
+
+    @pytest.mark.parametrize("quantize", [False, True])
+    def test_records_round_trip(self, nodes, quantize):
+        """Exported records rebuild an equivalent store (used by index snapshots)."""
+        store = NumpyVectorStore(quantize=quantize)
+        store.add(nodes)
+
+        copy = NumpyVectorStore()
+        for node_id, text, metadata, embedding in store.records():
+            node = metadata_dict_to_node(metadata, text=text)
+            node.embedding = embedding
+            copy.add([node])
+
+        query = VectorStoreQuery(query_embedding=[0.0, 0.0, 1.0], similarity_top_k=4)
+        assert copy.query(query).ids == store.query(query).ids
+        assert copy.query(query).nodes[0].metadata == store.query(query).nodes[0].metadata
+
+    def test_query_batch_matches_single_queries(self, nodes):
+        """Batched queries (mixed filters) rank exactly like one-at-a-time queries."""
+        store = NumpyVectorStore()
+        store.add(nodes)
+
+        product_filter = MetadataFilters(filters=[MetadataFilter(key="type", value="product")])
+        queries = [
+            VectorStoreQuery(query_embedding=[1.0, 0.0, 0.0], similarity_top_k=2),
+            VectorStoreQuery(query_embedding=[0.0, 0.0, 1.0], similarity_top_k=2, filters=product_filter),
+            VectorStoreQuery(query_embedding=[0.0, 1.0, 0.0], similarity_top_k=1),
+        ]
+
+        batched = store.query_batch(queries)
+        assert [result.ids for result in batched] == [store.query(q).ids for q in queries]
+        assert batched[2].ids == ["f1"]
@@ -0,0 +1,98 @@
+"""
+Tests for the pgvector store backend (runs against the test Postgres database)
+"""
+
+from django.test import TransactionTestCase
+from llama_index.core.schema import NodeRelationship, RelatedNodeInfo, TextNode
+from llama_index.core.vector_stores.types import (
+    FilterCondition,
+    MetadataFilter,
+    MetadataFilters,
+    VectorStoreQuery,
+)
+from llama_index.core.vector_stores.utils import metadata_dict_to_node
+from apps.ai_assistant.models import AIEmbeddedDocument
+from apps.ai_assistant.services.pgvector_store import PgVectorStore
+
+
+def _embedding(*head):
+    return list(head) + [0.0] * (AIEmbeddedDocument.EMBEDDING_DIMENSIONS - len(head))
+
+
+def _node(node_id, embedding, **metadata):
+    return TextNode(
+        id_=node_id,
+        text=f"text of {node_id}",
+        metadata=metadata,
+        embedding=embedding,
+        relationships={NodeRelationship.SOURCE: RelatedNodeInfo(node_id=f"doc_{node_id}")},
+    )
+
+
+def _query(store, filters=None):
+    return store.query(VectorStoreQuery(
+        query_embedding=_embedding(1.0), similarity_top_k=10, filters=filters
+    )).ids
+
+
+class TestPgVectorStore(TransactionTestCase):
+    """add() stages rows in an ON COMMIT DROP temp table, so every call has to commit"""
+
+    def setUp(self):
+        self.store = PgVectorStore(index_version="v1")
+        self.store.add([
+            _node("p1", _embedding(1.0, 0.0, 0.0), type="product", category_id=1),
+            _node("p2", _embedding(0.75, 0.25, 0.0), type="product", category_id=2),
+            _node("c1", _embedding(0.5, 0.0, 0.5), type="category", category_id=1),
+            _node("f1", _embedding(0.25, 0.75, 0.0), type="faq"),
+        ])
+
+    def test_add_query_with_filters_then_delete(self):
+        other = PgVectorStore(index_version="v2")
+        other.add([_node("v2-p1", _embedding(1.0), type="product", category_id=1)])
+
+        assert _query(self.store) == ["p1", "p2", "c1", "f1"]
+        assert _query(self.store, MetadataFilters(filters=[
+            MetadataFilter(key="type", value="product"),
+            MetadataFilter(key="category_id", value=1),
+        ])) == ["p1"]
+        assert _query(self.store, MetadataFilters(filters=[
+            MetadataFilters(
+                filters=[
+                    MetadataFilter(key="type", value="product"),
+                    MetadataFilter(key="type", value="category"),
+                ],
+                condition=FilterCondition.OR,
+            ),
+            MetadataFilter(key="category_id", value=1),
+        ])) == ["p1", "c1"]
+
+        self.store.delete("doc_p1")
+        assert _query(self.store, MetadataFilters(filters=[MetadataFilter(key="type", value="product")])) == ["p2"]
+
+        self.store.clear()
+        assert (self.store.count(), other.count()) == (0, 1)
+        assert PgVectorStore.versions() == ["v2"]
+        assert _query(other) == ["v2-p1"]
+
+    def test_records_round_trip_into_a_new_version(self):
+        records = sorted(self.store.records())
+        nodes = []
+        for node_id, text, metadata, embedding in records:
+            node = metadata_dict_to_node(metadata, text=text)
+            node.id_ = f"copy-{node_id}"
+            node.embedding = embedding
+            nodes.append(node)
+        copy = PgVectorStore(index_version="v2")
+        copy.add(nodes)
+
+        copied = sorted(copy.records())
+        assert [node_id for node_id, _, _, _ in copied] == [f"copy-{node_id}" for node_id, _, _, _ in records]
+        assert [(text, embedding) for _, text, _, embedding in copied] == [
+            (text, embedding) for _, text, _, embedding in records
+        ]
+        result = copy.query(VectorStoreQuery(query_embedding=_embedding(1.0), similarity_top_k=10))
+        assert result.ids == ["copy-p1", "copy-p2", "copy-c1", "copy-f1"]
+        assert result.nodes[0].metadata == {"type": "product", "category_id": 1}
+        assert result.nodes[0].ref_doc_id == "doc_p1"
+        assert result.nodes[0].get_content() == "text of p1"
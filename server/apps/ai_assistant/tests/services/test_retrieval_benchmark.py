@@ -0,0 +1,66 @@
+"""
+Unit tests for the synthetic retrieval benchmark
+"""
+
+import pytest
+from apps.ai_assistant.services.retrieval_benchmark import (
+    SyntheticCatalog,
+    reciprocal_rank,
+    run_benchmark,
+    summarize,
+)
+
+
+class TestSyntheticCatalog:
+    """Test suite for SyntheticCatalog."""
+
+    def test_catalog_is_deterministic(self):
+        """The same seed gives the same documents and queries."""
+        first = SyntheticCatalog(categories=3, options=40, rules=5, faqs=4, seed=7)
+        second = SyntheticCatalog(categories=3, options=40, rules=5, faqs=4, seed=7)
+
+        assert [doc.text for doc in first.documents()] == [doc.text for doc in second.documents()]
+        assert first.queries() == second.queries()
+        assert first.queries() == first.queries()
+
+    def test_labels_point_at_generated_documents(self):
+        """Every search label names a document the catalog contains."""
+        catalog = SyntheticCatalog(categories=3, options=40, rules=5, faqs=4)
+        doc_ids = {doc.doc_id for doc in catalog.documents()}
+
+        assert len(doc_ids) == 3 + 15 + len(catalog.parts) + 5 + 4
+        for labelled in catalog.queries():
+            if labelled["task"] == "search_products":
+                assert f"product_{labelled['expected']}" in doc_ids
+            elif labelled["task"] == "search_categories":
+                assert f"category_{labelled['expected']}" in doc_ids
+
+
+class TestMetrics:
+    """Test suite for the benchmark metrics."""
+
+    def test_reciprocal_rank(self):
+        assert reciprocal_rank(3, [3, 1]) == 1.0
+        assert reciprocal_rank(1, [3, 1]) == 0.5
+        assert reciprocal_rank(9, [3, 1]) == 0.0
+
+    def test_summarize(self):
+        result = summarize([1.0, 2.0, 3.0, 4.0], [1.0, 0.5, 0.2, 0.0], k=2)
+
+        assert result["recall_at_k"] == 0.5
+        assert result["mrr"] == pytest.approx(0.425)
+        assert result["p50_ms"] == 2.5
+
+
+class TestRunBenchmark:
+    """Test suite for an offline end-to-end run."""
+
+    def test_report_covers_every_task(self, tmp_path):
+        catalog = SyntheticCatalog(categories=2, options=20, products_per_category=2, rules=2, faqs=2)
+        report = run_benchmark(catalog, k=3, modes=["lexical", "vector"], persist_dir=str(tmp_path))
+
+        assert report["embedding_model"].startswith("hashing-tfidf")
+        assert set(report["modes"]) == {"lexical", "vector"}
+        for tasks in report["modes"].values():
+            assert set(tasks) == {"search_products", "search_categories", "intent"}
+            assert tasks["search_products"]["recall_at_k"] > 0.5
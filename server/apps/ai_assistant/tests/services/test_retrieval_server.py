@@ -0,0 +1,91 @@
+"""
+Unit tests for the shared retrieval daemon and its client
+"""
+
+import threading
+
+import pytest
+from llama_index.core.schema import NodeRelationship, NodeWithScore, RelatedNodeInfo, TextNode
+from llama_index.core.vector_stores import FilterOperator, MetadataFilter
+from apps.ai_assistant.services.retrieval_client import RetrievalClient
+from apps.ai_assistant.services.retrieval_server import QueryBatcher, RetrievalServer
+
+
+class FakeIndexService:
+    """Records the batches it receives and echoes one node per request."""
+
+    remote = None
+
+    def __init__(self):
+        self.batches = []
+
+    def retrieve_batch(self, requests):
+        self.batches.append(requests)
+        return [
+            [NodeWithScore(
+                node=TextNode(
+                    id_=f"node-{request['query']}",
+                    text=request["query"],
+                    metadata={"type": "product", "filters": len(request["extra_filters"])},
+                    relationships={NodeRelationship.SOURCE: RelatedNodeInfo(node_id=f"product_{request['query']}")},
+                ),
+                score=0.5,
+            )]
+            for request in requests
+        ]
+
+    def get_stats(self):
+        return {"status": "Index ready"}
+
+
+class TestRetrievalServer:
+    """Test suite for RetrievalServer, RetrievalClient and QueryBatcher."""
+
+    @pytest.fixture(params=["tcp", "unix"])
+    def server(self, request, tmp_path):
+        index_service = FakeIndexService()
+        socket_path = str(tmp_path / "retrieval.sock") if request.param == "unix" else None
+        server = RetrievalServer(index_service, port=0, socket_path=socket_path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+
+    def test_client_round_trip(self, server):
+        """Nodes come back with their text, metadata and source document id."""
+        client = RetrievalClient(server.address)
+        nodes = client.retrieve(
+            "12",
+            top_k=3,
+            doc_types=["product"],
+            extra_filters=[MetadataFilter(key="base_price", value=100.0, operator=FilterOperator.LTE)],
+        )
+
+        assert len(nodes) == 1
+        assert nodes[0].node.get_content() == "12"
+        assert nodes[0].node.ref_doc_id == "product_12"
+        assert nodes[0].node.metadata == {"type": "product", "filters": 1}
+        assert client.stats() == {"status": "Index ready"}
+
+    def test_batcher_groups_concurrent_requests(self):
+        """Requests arriving within the wait window are handled as one batch."""
+        batches = []
+
+        def handler(requests):
+            batches.append(len(requests))
+            return [request["query"].upper() for request in requests]
+
+        batcher = QueryBatcher(handler, max_batch=8, max_wait=0.2)
+        results = {}
+        threads = [
+            threading.Thread(target=lambda q=q: results.__setitem__(q, batcher.submit({"query": q})))
+            for q in ["a", "b", "c"]
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == {"a": "A", "b": "B", "c": "C"}
+        assert sum(batches) == 3
+        assert len(batches) < 3
@@ -0,0 +1,83 @@
+"""
+Unit tests for typed retrieval: type and category filters pushed into the index
+"""
+
+import pytest
+from django.test import override_settings
+from llama_index.core.schema import NodeRelationship, RelatedNodeInfo, TextNode
+from llama_index.core.vector_stores.types import VectorStoreQuery
+from apps.ai_assistant.services.numpy_vector_store import NumpyVectorStore
+from apps.ai_assistant.services.retrieval_benchmark import SyntheticCatalog, SyntheticIndexService
+
+LOCAL_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def _node(node_id, embedding, **metadata):
+    return TextNode(
+        id_=node_id,
+        text=f"text of {node_id}",
+        metadata=metadata,
+        embedding=embedding,
+        relationships={NodeRelationship.SOURCE: RelatedNodeInfo(node_id=f"doc_{node_id}")},
+    )
+
+
+class TestRetrieveByType:
+    """Test suite for IndexService._build_filters and retrieve_by_type."""
+
+    @pytest.fixture
+    def catalog(self):
+        return SyntheticCatalog(categories=2, options=20, products_per_category=3, rules=2, faqs=2)
+
+    @pytest.fixture
+    def service(self, tmp_path, catalog):
+        with override_settings(CACHES=LOCAL_CACHE):
+            service = SyntheticIndexService(
+                catalog,
+                persist_dir=str(tmp_path),
+                retrieval_mode="vector",
+                vector_backend="numpy",
+                embedding_backend="hashing",
+                service_url=""
+            )
+            service.build_index(force=True)
+            yield service
+
+    def test_filters_restrict_vector_store_candidates(self, service):
+        """Type filters are OR'd and the category filter AND'd onto them."""
+        store = NumpyVectorStore()
+        store.add([
+            _node("p1", [1.0, 0.0, 0.0], type="product", category_id=1),
+            _node("p2", [0.9, 0.1, 0.0], type="product", category_id=2),
+            _node("c1", [0.8, 0.0, 0.2], type="category", category_id=1),
+            _node("r1", [0.9, 0.0, 0.1], type="part", category_id=1),
+            _node("f1", [1.0, 0.0, 0.0], type="faq"),
+        ])
+
+        def query(filters):
+            return store.query(VectorStoreQuery(
+                query_embedding=[1.0, 0.0, 0.0], similarity_top_k=5, filters=filters
+            )).ids
+
+        assert query(service._build_filters(["product"])) == ["p1", "p2"]
+        assert query(service._build_filters(["product", "category"], category_id=1)) == ["p1", "c1"]
+        assert query(service._build_filters(["faq"], category_id=1)) == []
+
+    @pytest.mark.parametrize("mode", ["vector", "hybrid"])
+    def test_only_requested_types_and_category_are_returned(self, service, catalog, mode):
+        """Every hit has a requested type and the requested category, whatever ranks higher."""
+        service.retrieval_mode = mode
+        category = catalog.categories[0]
+
+        nodes = service.retrieve_by_type(
+            f"{category['name']} frame options and price", ["product", "part"], top_k=10,
+            category_id=category["id"]
+        )
+
+        assert nodes
+        for node in nodes:
+            assert node.node.metadata["type"] in ("product", "part")
+            assert node.node.metadata["category_id"] == category["id"]
+
+        faqs = service.retrieve_by_type(catalog.faqs[0]["question"], ["faq"], top_k=10)
+        assert {node.node.metadata["type"] for node in faqs} == {"faq"}
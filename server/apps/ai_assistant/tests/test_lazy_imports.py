@@ -0,0 +1,37 @@
+"""
+Tests that loading the URL conf leaves the LLM/RAG stack unimported
+"""
+
+import json
+import os
+import subprocess
+import sys
+from django.conf import settings
+
+CHILD_SCRIPT = """
+import json, sys
+import django
+django.setup()
+import ecommerce_backend.urls
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps([m for m in ('llama_index', 'langgraph', 'langchain_core', 'chromadb') if m in sys.modules]))
+"""
+
+
+class TestLazyAIImports:
+    """Test suite for the lazy boundary in apps.ai_assistant.views."""
+
+    def test_url_conf_does_not_load_the_ai_stack(self):
+        """A fresh process that loads the URL conf imports neither LlamaIndex nor LangGraph."""
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'ecommerce_backend.settings'}
+        result = subprocess.run(
+            [sys.executable, '-c', CHILD_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert json.loads(result.stdout.strip().splitlines()[-1]) == []
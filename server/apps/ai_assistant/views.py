@@ -11,17 +11,18 @@ from .serializers import (
     ChatRequestSerializer,
     ChatResponseSerializer
 )
-from .services.agent_service import get_agent_service
 from .services.context_builder import context_builder
-from .services.rag_service_new import get_rag_service
 from .services.cart_service import get_cart_service
 from .services.checkout_service import get_checkout_service
 from .services.shipping_service import get_shipping_service
 from .services.payment_service import get_payment_service
-from .orchestration.langgraph_workflow import get_multi_agent_workflow
 from .orchestration.state_manager import get_state_manager
 from .adapters.channel_adapter import get_channel_adapter
 
+# The LLM/RAG stack (LangGraph, LangChain, LlamaIndex, ChromaDB) is imported
+# inside the views that use it, so loading the URL conf stays cheap for
+# processes that never serve an AI endpoint (catalog workers, migrate, Celery).
+
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -78,6 +79,8 @@ def chat(request):
     # Gracefully handle OpenAI quota errors - RAG is optional for checkout flow
     rag_context = {}
     try:
+        from .services.rag_service_new import get_rag_service
+
         rag_service = get_rag_service()
         rag_context = rag_service.retrieve_context_for_query(user_message, context)
     except Exception as e:
@@ -98,6 +101,8 @@ def chat(request):
     channel = context.get('channel', 'web')
 
     # Generate AI response using MULTI-AGENT WORKFLOW (NEW!)
+    from .orchestration.langgraph_workflow import get_multi_agent_workflow
+
     workflow = get_multi_agent_workflow()
     ai_response = workflow.run(
         session_id=session_id,
@@ -223,6 +228,8 @@ def recommend_products(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
     # Search for matching products using RAG service
+    from .services.rag_service_new import get_rag_service
+
     rag_service = get_rag_service()
     products = rag_service.search_products(query, category_id, price_max)
 
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class ConfiguratorConfig(AppConfig):
+    name = 'apps.configurator'
+
+    def ready(self):
+        import apps.configurator.signals
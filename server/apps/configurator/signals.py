@@ -0,0 +1,18 @@
+"""
+Signal handlers for catalog versioning in configurator app.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import PriceAdjustmentRule, IncompatibilityRule
+from utils.catalog_version import bump_catalog_version_on_commit
+from utils.response_cache import invalidate_tags_on_commit
+
+
+@receiver([post_save, post_delete], sender=PriceAdjustmentRule)
+@receiver([post_save, post_delete], sender=IncompatibilityRule)
+def catalog_changed(sender, **kwargs):
+    """
+    Move the catalog to a new version and purge tagged cached responses when configurator rules change.
+    """
+    bump_catalog_version_on_commit(sender, **kwargs)
+    invalidate_tags_on_commit(sender, **kwargs)
@@ -2,8 +2,9 @@ from rest_framework.viewsets import ModelViewSet
 from .models import PriceAdjustmentRule, IncompatibilityRule
 from .serializers import PriceAdjustmentRuleSerializer, IncompatibilityRuleSerializer
 from .permissions import AllowGetAnonymously
+from utils.http_caching import CatalogHTTPCacheMixin
 
-class PriceAdjustmentRuleViewSet(ModelViewSet):
+class PriceAdjustmentRuleViewSet(CatalogHTTPCacheMixin, ModelViewSet):
     """
     API endpoint for viewing and editing price adjustment rules.
     
@@ -24,7 +25,7 @@ class PriceAdjustmentRuleViewSet(ModelViewSet):
         """
         return PriceAdjustmentRule.objects.all()
 
-class IncompatibilityRuleViewSet(ModelViewSet):
+class IncompatibilityRuleViewSet(CatalogHTTPCacheMixin, ModelViewSet):
     """
     API endpoint for viewing and editing incompatibility rules.
     
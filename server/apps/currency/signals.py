@@ -0,0 +1,17 @@
+"""
+Signal handlers for catalog versioning in currency app.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import ExchangeRate
+from utils.catalog_version import bump_catalog_version_on_commit
+from utils.response_cache import invalidate_tags_on_commit
+
+
+@receiver([post_save, post_delete], sender=ExchangeRate)
+def catalog_changed(sender, **kwargs):
+    """
+    Move the catalog to a new version and purge tagged cached responses when exchange rates change.
+    """
+    bump_catalog_version_on_commit(sender, **kwargs)
+    invalidate_tags_on_commit(sender, **kwargs)
@@ -2,6 +2,7 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, action
 from rest_framework.response import Response
 from .models import ExchangeRate
+from utils.http_caching import catalog_http_cache
 from .serializers import (
     ExchangeRateSerializer,
     CurrencyConversionSerializer,
@@ -71,6 +72,7 @@ def get_currency_info(request, currency_code):
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@catalog_http_cache
 @api_view(['GET'])
 def get_all_currencies(request):
     """
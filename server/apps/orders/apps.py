@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class OrdersConfig(AppConfig):
+    name = 'apps.orders'
+
+    def ready(self):
+        import apps.orders.signals
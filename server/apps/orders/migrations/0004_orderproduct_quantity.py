@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_orders_base_currency_total_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderproduct',
+            name='quantity',
+            field=models.PositiveIntegerField(default=1, help_text='Units ordered with this configuration; items are per unit'),
+        ),
+    ]
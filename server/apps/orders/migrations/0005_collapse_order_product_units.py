@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:06
+
+from django.db import migrations
+
+
+# Orders used to store one OrderProduct (with all its items) per unit. Collapse
+# sibling rows with the same product and the same items into the oldest row,
+# carrying the unit count in quantity. Runs after the sales counter triggers
+# count units (preconfigured_products/0007), so the counters do not move.
+COLLAPSE_SQL = r"""
+CREATE TEMP TABLE orderproduct_collapse AS
+SELECT id, quantity,
+       MIN(id) OVER (
+           PARTITION BY order_id, preconfigured_product_id, custom_name, base_product_name, items_signature
+       ) AS keep_id
+FROM (
+    SELECT op.id, op.order_id, op.preconfigured_product_id, op.custom_name, op.base_product_name, op.quantity,
+           COALESCE((
+               SELECT string_agg(
+                   concat_ws(E'\x1f', i.part_name, i.option_name, i.final_price, i.minimum_payment_required),
+                   E'\x1e' ORDER BY i.part_name, i.option_name, i.final_price, i.minimum_payment_required
+               )
+               FROM orderitem i
+               WHERE i.order_product_id = op.id
+           ), '') AS items_signature
+    FROM orderproduct op
+) lines;
+
+UPDATE orderproduct op
+SET quantity = g.units
+FROM (
+    SELECT keep_id, SUM(quantity) AS units
+    FROM orderproduct_collapse
+    GROUP BY keep_id
+    HAVING COUNT(*) > 1
+) g
+WHERE op.id = g.keep_id;
+
+DELETE FROM orderitem i
+USING orderproduct_collapse c
+WHERE i.order_product_id = c.id AND c.id <> c.keep_id;
+
+DELETE FROM orderproduct op
+USING orderproduct_collapse c
+WHERE op.id = c.id AND c.id <> c.keep_id;
+
+DROP TABLE orderproduct_collapse;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_orderproduct_quantity'),
+        ('preconfigured_products', '0007_sales_counter_quantity'),
+    ]
+
+    operations = [
+        # Collapsed rows are not split again on reverse; quantity keeps the units
+        migrations.RunSQL(COLLAPSE_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
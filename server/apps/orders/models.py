@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
 from django.core.validators import RegexValidator
 from decimal import Decimal
 from apps.customers.models import Customer
@@ -82,7 +83,7 @@ class Orders(models.Model):
         total_minimum = 0
         for order_product in self.products.all():
             for item in order_product.items.all():
-                total_minimum += item.minimum_payment_required
+                total_minimum += item.minimum_payment_required * order_product.quantity
         return total_minimum
 
     def update_payment_status(self):
@@ -96,7 +97,27 @@ class Orders(models.Model):
         else:
             self.payment_status = 'pending'
             self.is_fulfillable = False
-        self.save()
+        self.save(update_fields=['amount_paid', 'payment_status', 'is_fulfillable'])
+
+    def add_payment(self, amount):
+        """
+        Add `amount` to amount_paid and recompute the payment status in a single
+        UPDATE, so concurrent payments to the order never lose each other.
+        Same rules as update_payment_status.
+        """
+        amount_paid = F('amount_paid') + Value(Decimal(str(amount)), output_field=models.DecimalField())
+        Orders.objects.filter(pk=self.pk).update(
+            amount_paid=amount_paid,
+            payment_status=Case(
+                When(total_price__lte=amount_paid, then=Value('completed')),
+                When(minimum_required_amount__lte=amount_paid, then=Value('partial')),
+                default=Value('pending'),
+            ),
+            is_fulfillable=Case(
+                When(Q(total_price__lte=amount_paid) | Q(minimum_required_amount__lte=amount_paid), then=Value(True)),
+                default=Value(False),
+            ),
+        )
 
     @property
     def balance_due(self):
@@ -115,9 +136,19 @@ class OrderProduct(models.Model):
                                              on_delete=models.CASCADE, db_column='preconfigured_product_id', null=True)
     custom_name = models.CharField(max_length=255, null=True, blank=True)
     base_product_name = models.CharField(max_length=255)
+    quantity = models.PositiveIntegerField(default=1, help_text="Units ordered with this configuration; items are per unit")
 
     def __str__(self):
-        return f"{self.base_product_name} in Order {self.order.id}"
+        return f"{self.quantity} x {self.base_product_name} in Order {self.order.id}"
+
+    @property
+    def unit_price(self):
+        """Price of one unit: the sum of its items"""
+        return sum((item.final_price for item in self.items.all()), Decimal('0.00'))
+
+    @property
+    def line_total(self):
+        return self.unit_price * self.quantity
     
     class Meta:
         db_table = 'orderproduct'
@@ -155,11 +186,26 @@ class Payment(models.Model):
         return f"Payment {self.id} for Order {self.order.id} - ${self.amount}"
 
     def save(self, *args, **kwargs):
-        """Override save to update order payment status"""
-        super().save(*args, **kwargs)
-        # Update order's total paid amount
-        self.order.amount_paid = sum(p.amount for p in self.order.payments.all())
-        self.order.update_payment_status()
+        """
+        Override save to keep the order's amount paid and payment status in step:
+        a new payment adds its amount, an edited one the change in amount (moving
+        it between orders if its order changed). The stored row is locked first,
+        so concurrent edits apply one after the other.
+        """
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = Payment.objects.select_for_update().filter(pk=self.pk).values('order_id', 'amount').first()
+            super().save(*args, **kwargs)
+
+            if previous is None:
+                self.order.add_payment(self.amount)
+            elif previous['order_id'] != self.order_id:
+                Orders(pk=previous['order_id']).add_payment(-previous['amount'])
+                self.order.add_payment(self.amount)
+            elif Decimal(str(self.amount)) != previous['amount']:
+                self.order.add_payment(Decimal(str(self.amount)) - previous['amount'])
+        self.order.refresh_from_db(fields=['amount_paid', 'payment_status', 'is_fulfillable'])
 
     class Meta:
         db_table = 'payment'
@@ -14,6 +14,8 @@ class OrderItemSerializer(serializers.ModelSerializer):
 
 class OrderProductSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    line_total = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
 
     class Meta:
         model = OrderProduct
@@ -37,3 +39,18 @@ class OrdersSerializer(serializers.ModelSerializer):
     class Meta:
         model = Orders
         fields = '__all__'
+
+
+class OrderListSerializer(serializers.ModelSerializer):
+    """Order summary for listings: no nested products, payments or addresses"""
+    balance_due = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    customer_name = serializers.CharField(source='customer.name', read_only=True)
+    customer_email = serializers.CharField(source='customer.email', read_only=True)
+
+    class Meta:
+        model = Orders
+        fields = [
+            'id', 'customer', 'customer_name', 'customer_email', 'subtotal', 'shipping_cost',
+            'total_price', 'minimum_required_amount', 'amount_paid', 'balance_due',
+            'payment_status', 'fulfillment_status', 'is_fulfillable', 'order_currency', 'created_at'
+        ]
@@ -0,0 +1,211 @@
+"""
+Order creation and payment services
+Builds order lines in memory and writes them with bulk INSERTs, so creating an
+order costs the same number of queries whatever its size. Each distinct
+configuration is one OrderProduct with a quantity, whatever the unit count.
+Payments are recorded under the order's row lock.
+"""
+import re
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Q
+from apps.preconfigured_products.models import ProductSalesCounter
+from apps.products.models import Category, PartOption
+from utils.response_cache import invalidate_tags_on_commit
+from .models import Orders, OrderProduct, OrderItem, Payment
+
+
+def get_cart_items(products_data):
+    """Cart items for the shipping calculator, with all categories fetched in one query"""
+    category_ids = {_as_int(p.get('category_id')) for p in products_data} - {None}
+    categories = Category.objects.in_bulk(category_ids)
+
+    cart_items = []
+    for product in products_data:
+        category = categories.get(_as_int(product.get('category_id')))
+        if category:
+            cart_items.append({
+                'category': category,
+                'quantity': int(product.get('quantity', 1))
+            })
+    return cart_items
+
+
+def build_order_lines(products_data):
+    """
+    Unsaved OrderProduct rows and their per-unit OrderItems for the requested
+    products, one row per distinct configuration carrying its quantity, plus the
+    order's minimum required payment computed in the same pass.
+    Part options are looked up by name in one query.
+
+    Returns (lines, minimum_required_amount), lines being (OrderProduct, [OrderItem]) pairs.
+    """
+    option_names = {
+        part_data.get('name', '')
+        for product in products_data
+        for part_data in product.get('configuration', {}).values()
+        if isinstance(part_data, dict)
+    }
+    # Option names are not enforced unique: use the oldest option with the name
+    percentages = {}
+    for name, percentage in PartOption.objects.filter(name__in=option_names).order_by('-id').values_list(
+        'name', 'minimum_payment_percentage'
+    ):
+        percentages[name] = percentage
+
+    # One line per distinct configuration: repeated entries add to its quantity
+    lines = {}
+    minimum_required_amount = Decimal('0.00')
+    for product_data in products_data:
+        product_name = product_data.get('name', 'Custom Product')
+        quantity = int(product_data.get('quantity', 1))
+        configuration = product_data.get('configuration', {})
+
+        # Items of one unit of this product
+        unit_items = []
+        for part_key, part_data in configuration.items():
+            if isinstance(part_data, dict):
+                option_name = part_data.get('name', '')
+                final_price = Decimal(str(part_data.get('price', 0)))
+
+                # Calculate minimum payment required based on part option percentage
+                # Note: minimum_payment_percentage is stored as decimal (0.25 = 25%, 1.00 = 100%)
+                # If part option not found, default to 0
+                minimum_payment_required = Decimal('0.00')
+                if option_name in percentages:
+                    minimum_payment_required = (final_price * percentages[option_name]).quantize(Decimal('0.01'))
+
+                unit_items.append((part_key.capitalize(), option_name, final_price, minimum_payment_required))
+
+        key = (product_name, tuple(unit_items))
+        if key in lines:
+            lines[key][0].quantity += quantity
+        else:
+            order_product = OrderProduct(base_product_name=product_name, quantity=quantity)
+            lines[key] = (order_product, [
+                OrderItem(
+                    part_name=part_name,
+                    option_name=option_name,
+                    final_price=final_price,
+                    minimum_payment_required=minimum_payment_required
+                )
+                for part_name, option_name, final_price, minimum_payment_required in unit_items
+            ])
+        minimum_required_amount += quantity * sum((item[3] for item in unit_items), Decimal('0.00'))
+
+    return list(lines.values()), minimum_required_amount
+
+
+def stock_demand(products_data):
+    """
+    Units of each part option the requested products take out of stock: {part_option_id: units}
+
+    Option names are not unique across parts, so each configuration entry is
+    resolved by its option id if the client sent one, else by its part (the
+    configuration key) and option name, else by a name only one option has.
+    Entries that stay ambiguous take no stock rather than another part's.
+    """
+    entries = [
+        (product, part_key, part_data)
+        for product in products_data
+        for part_key, part_data in product.get('configuration', {}).items()
+        if isinstance(part_data, dict)
+    ]
+    option_ids = {_as_int(part_data.get('id')) for _, _, part_data in entries} - {None}
+    option_names = {part_data.get('name', '') for _, _, part_data in entries}
+
+    by_id, by_part, by_name = set(), {}, {}
+    for option_id, name, part_name, category_id in PartOption.objects.filter(
+        Q(id__in=option_ids) | Q(name__in=option_names)
+    ).order_by('-id').values_list('id', 'name', 'part__name', 'part__category_id'):
+        by_id.add(option_id)
+        # Overwritten in -id order: the oldest option wins, as in build_order_lines
+        by_part[(category_id, _part_key(part_name), name)] = option_id
+        by_part[(None, _part_key(part_name), name)] = option_id
+        by_name.setdefault(name, set()).add(option_id)
+
+    demand = {}
+    for product, part_key, part_data in entries:
+        name = part_data.get('name', '')
+        option_id = _as_int(part_data.get('id'))
+        if option_id not in by_id:
+            option_id = (
+                by_part.get((_as_int(product.get('category_id')), _part_key(part_key), name))
+                or by_part.get((None, _part_key(part_key), name))
+            )
+        if option_id is None and len(by_name.get(name, ())) == 1:
+            option_id = next(iter(by_name[name]))
+        if option_id is not None:
+            demand[option_id] = demand.get(option_id, 0) + int(product.get('quantity', 1))
+    return demand
+
+
+def _part_key(part_name):
+    """Part names as clients key configurations: "Frame Type" and "frametype" match"""
+    return re.sub(r'\s+', '', part_name).lower()
+
+
+def save_order_lines(order, lines):
+    """Insert lines built by build_order_lines for `order`: one INSERT per table"""
+    for order_product, _ in lines:
+        order_product.order = order
+    OrderProduct.objects.bulk_create([order_product for order_product, _ in lines])
+
+    items = []
+    for order_product, order_items in lines:
+        for item in order_items:
+            item.order_product = order_product
+            items.append(item)
+    OrderItem.objects.bulk_create(items)
+
+    # bulk_create sends no post_save: purge cached best-sellers explicitly
+    # (the sales counters themselves are updated by database triggers)
+    invalidate_tags_on_commit(ProductSalesCounter)
+
+
+def record_payment(order_id, amount, payment_method, paid_by='customer', transaction_reference=''):
+    """
+    Record a payment for an order in one transaction: the order row is locked
+    (SELECT ... FOR UPDATE) so concurrent payments are checked against the
+    balance one at a time, and the payment is added to amount_paid in SQL.
+
+    Raises Orders.DoesNotExist, or ValueError if the amount exceeds the remaining balance.
+    """
+    with transaction.atomic():
+        order = Orders.objects.select_for_update().get(pk=order_id)
+        if order.amount_paid + amount > order.total_price:
+            raise ValueError(f'Payment amount exceeds remaining balance of {order.balance_due}')
+
+        payment = Payment(
+            order=order,
+            amount=amount,
+            payment_method=payment_method,
+            paid_by=paid_by,
+            transaction_reference=transaction_reference
+        )
+        payment.save()
+    return payment
+
+
+def orders_with_details():
+    """Orders with everything OrdersSerializer reads, in a fixed number of queries"""
+    return Orders.objects.select_related(
+        'customer', 'shipping_address', 'shipping_details__zone'
+    ).prefetch_related('products__items', 'payments')
+
+
+def orders_for_listing():
+    """Orders with everything OrderListSerializer reads, in one query"""
+    return Orders.objects.select_related('customer')
+
+
+def order_products_with_items():
+    """Order products with their items, in two queries per page"""
+    return OrderProduct.objects.prefetch_related('items')
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
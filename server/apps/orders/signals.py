@@ -0,0 +1,17 @@
+"""
+Signal handlers for sales analytics in orders app.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import OrderProduct
+from apps.preconfigured_products.models import ProductSalesCounter
+from utils.response_cache import invalidate_tags_on_commit
+
+
+@receiver([post_save, post_delete], sender=OrderProduct)
+def sales_changed(sender, **kwargs):
+    """
+    Purge cached best-seller responses when order lines change.
+    The counters themselves are maintained by database triggers.
+    """
+    invalidate_tags_on_commit(ProductSalesCounter)
@@ -0,0 +1,133 @@
+"""
+Tests for Idempotency-Key handling on order creation
+"""
+
+import threading
+import time
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.customers.models import Customer
+from apps.orders.models import Orders
+from apps.shipping.models import ShippingZone
+from utils.idempotency import IdempotencyKeyMiddleware
+
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class TestIdempotentOrderCreation(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="buyer", password="secret-pass-123")
+        Customer.objects.create(user=cls.user, name="Buyer")
+        zone = ShippingZone.objects.create(
+            zone_code="KLA-1", zone_name="Kampala Central", distance_range_min_km=0, distance_range_max_km=10
+        )
+        cls.payload = {
+            'shipping_zone_id': zone.id,
+            'products': [{'name': "Trail Bike", 'price': 400, 'quantity': 1, 'configuration': {}}],
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.client = self.client_for(self.user)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
+
+    def post(self, client, payload, key):
+        return client.post('/api/orders/', payload, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post(self.client, self.payload, 'checkout-1')
+
+        with self.assertNumQueries(0):
+            retry = self.post(self.client, self.payload, 'checkout-1')
+
+        assert first.status_code == retry.status_code == 201
+        assert retry['Idempotent-Replayed'] == 'true'
+        assert retry.json()['id'] == first.data['id']
+        assert Orders.objects.count() == 1
+
+        assert self.post(self.client, self.payload, 'checkout-2').status_code == 201
+        assert Orders.objects.count() == 2
+
+    def test_key_reused_for_another_request_is_rejected(self):
+        self.post(self.client, self.payload, 'checkout-1')
+        other = dict(self.payload, products=[dict(self.payload['products'][0], quantity=2)])
+
+        assert self.post(self.client, other, 'checkout-1').status_code == 422
+        assert Orders.objects.count() == 1
+
+    def test_keys_are_scoped_to_the_user(self):
+        other_user = User.objects.create_user(username="other", password="secret-pass-123")
+        Customer.objects.create(user=other_user, name="Other")
+        first = self.post(self.client, self.payload, 'checkout-1')
+        other = self.post(self.client_for(other_user), self.payload, 'checkout-1')
+
+        assert other.status_code == 201
+        assert other.data['id'] != first.data['id']
+
+
+@override_settings(CACHES=LOCAL_CACHE, IDEMPOTENT_PATHS=[r'^/pay/$'])
+class TestIdempotencyMiddleware(TestCase):
+
+    def test_conflict_is_not_replayed_to_the_retry(self):
+        cache.clear()
+        statuses = iter([409, 201])
+
+        def view(request):
+            return JsonResponse({}, status=next(statuses))
+
+        middleware = IdempotencyKeyMiddleware(view)
+
+        def send():
+            request = RequestFactory().post(
+                '/pay/', {'amount': 100}, content_type='application/json', HTTP_IDEMPOTENCY_KEY='momo-1'
+            )
+            request.user = User(id=7)
+            return middleware(request)
+
+        assert send().status_code == 409
+        retry = send()
+        assert retry.status_code == 201
+        assert not retry.has_header('Idempotent-Replayed')
+        assert send().has_header('Idempotent-Replayed')
+
+    def test_duplicate_in_flight_waits_for_the_first_result(self):
+        cache.clear()
+        calls = []
+
+        def view(request):
+            calls.append(request)
+            time.sleep(0.3)
+            return JsonResponse({'payment': len(calls)}, status=201)
+
+        middleware = IdempotencyKeyMiddleware(view)
+        user = User(id=7)
+        responses = []
+
+        def send():
+            request = RequestFactory().post(
+                '/pay/', {'amount': 100}, content_type='application/json', HTTP_IDEMPOTENCY_KEY='momo-1'
+            )
+            request.user = user
+            responses.append(middleware(request))
+
+        threads = [threading.Thread(target=send) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert {r.content for r in responses} == {b'{"payment": 1}'}
+        assert sum(r.has_header('Idempotent-Replayed') for r in responses) == 4
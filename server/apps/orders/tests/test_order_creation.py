@@ -0,0 +1,84 @@
+"""
+Tests for query-batched order creation
+"""
+
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.customers.models import Customer
+from apps.orders.models import Orders
+from apps.products.models import Category, Part, PartOption
+from apps.shipping.models import ShippingZone
+
+
+class TestOrderCreation(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="buyer", password="secret-pass-123")
+        Customer.objects.create(user=cls.user, name="Buyer")
+        cls.zone = ShippingZone.objects.create(
+            zone_code="KLA-1", zone_name="Kampala Central", distance_range_min_km=0, distance_range_max_km=10
+        )
+        frame = Part.objects.create(name="Frame", category=Category.objects.create(name="Bikes"))
+        PartOption.objects.create(part=frame, name="Carbon", default_price=300, minimum_payment_percentage="0.50")
+        PartOption.objects.create(part=frame, name="Steel", default_price=100, minimum_payment_percentage="0.25")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_order(self, quantity):
+        payload = {
+            'shipping_zone_id': self.zone.id,
+            'products': [{
+                'name': "Trail Bike",
+                'price': 400,
+                'quantity': quantity,
+                'configuration': {
+                    'frame': {'name': "Carbon", 'price': 300},
+                    'wheels': {'name': "Steel", 'price': 100},
+                    'bell': {'name': "Unknown", 'price': 10},
+                },
+            }],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/orders/', payload, format='json')
+        assert response.status_code == 201, response.data
+        return response, len(queries)
+
+    def test_query_count_does_not_grow_with_quantity(self):
+        _, single = self.create_order(quantity=1)
+        response, bulk = self.create_order(quantity=50)
+
+        assert bulk == single
+        assert len(response.data['products']) == 1
+        assert response.data['products'][0]['quantity'] == 50
+        assert len(response.data['products'][0]['items']) == 3
+
+    def test_minimum_payment_is_computed_in_the_same_pass(self):
+        response, _ = self.create_order(quantity=3)
+
+        order = Orders.objects.get(id=response.data['id'])
+        # Per unit: 50% of 300 + 25% of 100 + 0 for the unknown option
+        assert order.minimum_required_amount == Decimal('525.00')
+        assert order.minimum_required_amount == order.calculate_minimum_required_amount()
+
+    def test_identical_entries_share_one_line(self):
+        payload = {
+            'shipping_zone_id': self.zone.id,
+            'products': [
+                {'name': "Gift Bike", 'price': 300, 'quantity': 200, 'configuration': {'frame': {'name': "Carbon", 'price': 300}}},
+                {'name': "Gift Bike", 'price': 300, 'quantity': 100, 'configuration': {'frame': {'name': "Carbon", 'price': 300}}},
+                {'name': "Gift Bike", 'price': 100, 'quantity': 1, 'configuration': {'frame': {'name': "Steel", 'price': 100}}},
+            ],
+        }
+        response = self.client.post('/api/orders/', payload, format='json')
+
+        lines = sorted(response.data['products'], key=lambda line: line['quantity'])
+        assert [line['quantity'] for line in lines] == [1, 300]
+        assert lines[1]['line_total'] == '90000.00'
+        assert Decimal(response.data['minimum_required_amount']) == Decimal('45025.00')
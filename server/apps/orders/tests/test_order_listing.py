@@ -0,0 +1,64 @@
+"""
+Tests for paginated order listings
+"""
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.customers.models import Customer
+from apps.orders.models import Orders, OrderProduct, OrderItem, Payment
+
+
+class TestOrderListing(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="staff", password="secret-pass-123", is_staff=True)
+        for i in range(12):
+            customer = Customer.objects.create(name=f"Customer {i}", email=f"c{i}@example.com")
+            order = Orders.objects.create(customer=customer, total_price=500)
+            product = OrderProduct.objects.create(order=order, base_product_name="Bike", quantity=2)
+            OrderItem.objects.create(order_product=product, part_name="Frame", option_name="Steel", final_price=250)
+            Payment.objects.create(order=order, amount=100, payment_method="Cash")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def list_queries(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        assert response.status_code == 200
+        return response, len(queries)
+
+    def test_order_pages_cost_constant_queries(self):
+        small, few = self.list_queries('/api/orders/', {'page_size': 2})
+        large, many = self.list_queries('/api/orders/', {'page_size': 10})
+
+        assert few == many == 1
+        assert len(large.data['results']) == 10
+        assert large.data['results'][0]['customer_name'] == "Customer 11"
+        assert 'products' not in large.data['results'][0]
+
+        rest = self.client.get(large.data['next'])
+        assert [o['id'] for o in rest.data['results']] == list(
+            Orders.objects.order_by('-id').values_list('id', flat=True)[10:]
+        )
+        assert rest.data['next'] is None
+
+    def test_order_detail_is_prefetched(self):
+        order = Orders.objects.first()
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/orders/{order.id}/')
+
+        assert response.data['products'][0]['quantity'] == 2
+        assert response.data['products'][0]['line_total'] == '500.00'
+        assert len(response.data['payments']) == 1
+
+    def test_order_product_pages_cost_constant_queries(self):
+        _, few = self.list_queries('/api/orders/products/', {'page_size': 2})
+        _, many = self.list_queries('/api/orders/products/', {'page_size': 10})
+
+        assert few == many == 2
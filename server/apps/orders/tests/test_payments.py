@@ -0,0 +1,90 @@
+"""
+Tests for atomic payment recording
+"""
+
+import threading
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from apps.customers.models import Customer
+from apps.orders.models import Orders, Payment
+from apps.orders.services import record_payment
+
+
+class TestPaymentStatus(TestCase):
+
+    def setUp(self):
+        customer = Customer.objects.create(name="Buyer")
+        self.order = Orders.objects.create(customer=customer, total_price=1000, minimum_required_amount=300)
+
+    def test_status_follows_amount_paid(self):
+        record_payment(self.order.id, Decimal('200'), "Cash")
+        self.order.refresh_from_db()
+        assert (self.order.amount_paid, self.order.payment_status, self.order.is_fulfillable) == (200, 'pending', False)
+
+        payment = Payment.objects.create(order=self.order, amount=Decimal('100'), payment_method="Cash")
+        assert (payment.order.amount_paid, payment.order.payment_status) == (300, 'partial')
+        assert payment.order.is_fulfillable
+
+        record_payment(self.order.id, Decimal('700'), "Cash")
+        self.order.refresh_from_db()
+        assert (self.order.amount_paid, self.order.payment_status) == (1000, 'completed')
+
+    def test_editing_a_payment_applies_the_change(self):
+        payment = record_payment(self.order.id, Decimal('200'), "Cash")
+        record_payment(self.order.id, Decimal('100'), "Cash")
+
+        payment.amount = Decimal('900')
+        payment.save()
+        assert (payment.order.amount_paid, payment.order.payment_status) == (1000, 'completed')
+
+        payment.amount = Decimal('50')
+        payment.save()
+        self.order.refresh_from_db()
+        assert (self.order.amount_paid, self.order.payment_status, self.order.is_fulfillable) == (150, 'pending', False)
+
+        other = Orders.objects.create(customer=self.order.customer, total_price=50)
+        payment.order = other
+        payment.save()
+        self.order.refresh_from_db()
+        assert self.order.amount_paid == 100
+        assert (payment.order.amount_paid, payment.order.payment_status) == (50, 'completed')
+
+    def test_overpayment_is_rejected(self):
+        record_payment(self.order.id, Decimal('900'), "Cash")
+        with pytest.raises(ValueError, match="100"):
+            record_payment(self.order.id, Decimal('200'), "Cash")
+        assert Payment.objects.count() == 1
+
+
+class TestConcurrentPayments(TransactionTestCase):
+    """Parallel payments to one order, each on its own connection"""
+
+    def test_parallel_payments_neither_overpay_nor_lose_updates(self):
+        order = Orders.objects.create(customer=Customer.objects.create(name="Buyer"), total_price=1000)
+        workers = 16
+        barrier = threading.Barrier(workers)
+        outcomes = []
+
+        def pay():
+            try:
+                barrier.wait()
+                record_payment(order.id, Decimal('100'), "MTN MoMo")
+                outcomes.append('paid')
+            except ValueError:
+                outcomes.append('rejected')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=pay) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        order.refresh_from_db()
+        assert sorted(outcomes) == ['paid'] * 10 + ['rejected'] * 6
+        assert order.amount_paid == Decimal('1000')
+        assert order.payment_status == 'completed'
+        assert Payment.objects.filter(order=order).count() == 10
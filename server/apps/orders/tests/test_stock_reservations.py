@@ -0,0 +1,191 @@
+"""
+Tests for stock holds at checkout and their conversion on order creation
+"""
+
+import threading
+import pytest
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.customers.models import Customer
+from apps.orders.models import Orders
+from apps.orders.services import stock_demand
+from apps.products.models import Category, Part, PartOption, Stock, StockReservation
+from apps.products.reservations import (
+    InsufficientStock,
+    convert_stock_holds,
+    hold_stock,
+    release_expired_holds
+)
+from apps.shipping.models import ShippingZone
+
+
+def bike(quantity):
+    return [{
+        'name': "Trail Bike",
+        'price': 400,
+        'quantity': quantity,
+        'configuration': {'frame': {'name': "Carbon", 'price': 300}},
+    }]
+
+
+class TestStockReservations(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="buyer", password="secret-pass-123")
+        Customer.objects.create(user=cls.user, name="Buyer")
+        cls.zone = ShippingZone.objects.create(
+            zone_code="KLA-1", zone_name="Kampala Central", distance_range_min_km=0, distance_range_max_km=10
+        )
+        frame = Part.objects.create(name="Frame", category=Category.objects.create(name="Bikes"))
+        cls.carbon = PartOption.objects.create(part=frame, name="Carbon", default_price=300)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.stock = Stock.objects.create(part_option=self.carbon, quantity=5)
+
+    def order(self, quantity, hold_token=None):
+        payload = {'shipping_zone_id': self.zone.id, 'products': bike(quantity)}
+        if hold_token:
+            payload['stock_hold'] = hold_token
+        return self.client.post('/api/orders/', payload, format='json')
+
+    def test_hold_then_order_takes_stock_out(self):
+        response = self.client.post('/api/orders/stock-hold/', {'products': bike(2)}, format='json')
+        assert response.status_code == 201, response.data
+        self.stock.refresh_from_db()
+        assert (self.stock.quantity, self.stock.reserved) == (5, 2)
+
+        response = self.order(2, response.data['hold_token'])
+        assert response.status_code == 201, response.data
+        self.stock.refresh_from_db()
+        assert (self.stock.quantity, self.stock.reserved) == (3, 0)
+        assert StockReservation.objects.get().status == 'converted'
+
+    def test_order_without_hold_still_takes_stock(self):
+        assert self.order(5).status_code == 201
+        self.stock.refresh_from_db()
+        assert (self.stock.quantity, self.stock.reserved) == (0, 0)
+
+    def test_held_stock_cannot_be_sold_twice(self):
+        hold_stock({self.carbon.id: 4})
+
+        response = self.order(2)
+        assert response.status_code == 409
+        assert response.data['unavailable'][0]['available'] == 1
+        assert not Orders.objects.exists()
+        self.stock.refresh_from_db()
+        assert (self.stock.quantity, self.stock.reserved) == (5, 4)
+
+    def test_option_names_shared_by_parts_resolve_to_the_chosen_part(self):
+        seat = Part.objects.create(name="Seat Post", category=self.carbon.part.category)
+        carbon_seat = PartOption.objects.create(part=seat, name="Carbon", default_price=80)
+        products = [{
+            'name': "Trail Bike",
+            'quantity': 2,
+            'configuration': {'seatpost': {'name': "Carbon", 'price': 80}},
+        }]
+
+        assert stock_demand(products) == {carbon_seat.id: 2}
+        products[0]['configuration'] = {'frame': {'id': self.carbon.id, 'name': "Carbon", 'price': 300}}
+        assert stock_demand(products) == {self.carbon.id: 2}
+        products[0]['configuration'] = {'wheels': {'name': "Carbon", 'price': 300}}
+        # Ambiguous: neither Carbon option belongs to a "wheels" part
+        assert stock_demand(products) == {}
+
+    def test_hold_is_split_across_stock_rows(self):
+        Stock.objects.create(part_option=self.carbon, quantity=3)
+
+        _, _, reservations = hold_stock({self.carbon.id: 7})
+        assert sorted(r.quantity for r in reservations) == [2, 5]
+        assert sum(Stock.objects.values_list('reserved', flat=True)) == 7
+        with pytest.raises(InsufficientStock) as error:
+            hold_stock({self.carbon.id: 2})
+        assert error.value.shortages[0]['available'] == 1
+
+    def test_expired_holds_are_released(self):
+        token, _, _ = hold_stock({self.carbon.id: 3})
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        hold_stock({self.carbon.id: 1})
+
+        assert release_expired_holds(batch_size=1) == 1
+        self.stock.refresh_from_db()
+        assert self.stock.reserved == 1
+        assert not StockReservation.objects.filter(hold_token=token).exists()
+
+
+class TestConcurrentHolds(TransactionTestCase):
+    """Parallel checkouts, each on its own connection"""
+
+    def test_parallel_holds_never_oversell(self):
+        frame = Part.objects.create(name="Frame", category=Category.objects.create(name="Bikes"))
+        option = PartOption.objects.create(part=frame, name="Carbon", default_price=300)
+        Stock.objects.create(part_option=option, quantity=6)
+        Stock.objects.create(part_option=option, quantity=4)
+        workers = 16
+        barrier = threading.Barrier(workers)
+        outcomes = []
+
+        def hold():
+            try:
+                barrier.wait()
+                hold_stock({option.id: 1})
+                outcomes.append('held')
+            except InsufficientStock:
+                outcomes.append('rejected')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=hold) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert outcomes.count('held') == 10
+        assert list(Stock.objects.order_by('id').values_list('quantity', 'reserved')) == [(6, 6), (4, 4)]
+
+    def test_orders_with_and_without_holds_do_not_deadlock(self):
+        customer = Customer.objects.create(name="Buyer")
+        frame = Part.objects.create(name="Frame", category=Category.objects.create(name="Bikes"))
+        options = [PartOption.objects.create(part=frame, name=f"Option {i}", default_price=100) for i in range(3)]
+        for option in reversed(options):
+            Stock.objects.create(part_option=option, quantity=20)
+            Stock.objects.create(part_option=option, quantity=20)
+        demand = {option.id: 3 for option in options}
+        # Half the checkouts hold one option and take the rest at order time;
+        # no retries, so a deadlock fails the test
+        tokens = [hold_stock({options[i % 3].id: 3})[0] if i % 2 else None for i in range(12)]
+        barrier = threading.Barrier(len(tokens))
+        failures = []
+
+        def place_order(hold_token):
+            with transaction.atomic():
+                order = Orders.objects.create(customer=customer, total_price=900)
+                convert_stock_holds(order, demand, hold_token)
+
+        def checkout(hold_token):
+            try:
+                barrier.wait()
+                place_order(hold_token)
+            except Exception as e:
+                failures.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=checkout, args=(token,)) for token in tokens]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert failures == []
+        for option in options:
+            stock = Stock.objects.filter(part_option=option)
+            assert sum(s.quantity for s in stock) == 40 - 12 * 3
+            assert sum(s.reserved for s in stock) == 0
@@ -3,10 +3,11 @@ from rest_framework.routers import DefaultRouter
 from .views import OrdersViewSet, OrderProductViewSet, OrderItemViewSet, PaymentViewSet
 
 router = DefaultRouter()
-router.register(r'', OrdersViewSet)
 router.register(r'products', OrderProductViewSet)
 router.register(r'items', OrderItemViewSet)
 router.register(r'payments', PaymentViewSet)
+# Last: its detail route would otherwise capture "products/", "items/" and "payments/"
+router.register(r'', OrdersViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,19 +1,80 @@
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework import status
-from decimal import Decimal
+import uuid
+from decimal import Decimal, InvalidOperation
 from datetime import timedelta
 from django.utils import timezone
+from django.db import transaction
 from .models import Orders, OrderProduct, OrderItem, Payment, ShippingAddress
-from .serializers import OrdersSerializer, OrderProductSerializer, OrderItemSerializer, PaymentSerializer
+from .serializers import (
+    OrdersSerializer,
+    OrderListSerializer,
+    OrderProductSerializer,
+    OrderItemSerializer,
+    PaymentSerializer
+)
 from .permissions import AllowPostAnonymously
+from .services import (
+    build_order_lines,
+    get_cart_items,
+    order_products_with_items,
+    orders_for_listing,
+    orders_with_details,
+    record_payment,
+    save_order_lines,
+    stock_demand
+)
 from apps.customers.models import Customer
-from apps.products.models import PartOption, Category
+from apps.products.reservations import (
+    InsufficientStock,
+    StockBusy,
+    convert_stock_holds,
+    hold_stock,
+    release_stock_hold,
+    retry_on_lock_conflict
+)
 from apps.shipping.models import ShippingZone, ShippingRate, OrderShippingMethod
 from apps.shipping.services import get_shipping_options
 
+def _parse_hold_token(value):
+    """(hold token, None), or (None, 400 response) if it is not a UUID"""
+    if not value:
+        return None, None
+    try:
+        return uuid.UUID(str(value)), None
+    except ValueError:
+        return None, Response(
+            {'error': 'Invalid stock_hold token'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+def _out_of_stock(error):
+    return Response(
+        {'error': str(error), 'unavailable': error.shortages},
+        status=status.HTTP_409_CONFLICT
+    )
+
+
+def _stock_busy(error):
+    return Response({'error': str(error)}, status=status.HTTP_409_CONFLICT)
+
+
+class OrderCursorPagination(CursorPagination):
+    """
+    Keyset pagination for order listings, newest first: every page costs the
+    same however deep it is. Follow `next` for more.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = '-id'
+
+
 class OrdersViewSet(ModelViewSet):
     """
     API endpoint for viewing and editing orders.
@@ -24,17 +85,31 @@ class OrdersViewSet(ModelViewSet):
     
     Regular users can only see their own orders.
     Staff users can see all orders.
+
+    The list is paginated and returns order summaries (no products, payments
+    or addresses); retrieve an order for its full details.
     """
     queryset = Orders.objects.all()
     serializer_class = OrdersSerializer
     permission_classes = [AllowPostAnonymously]
-    
+    pagination_class = OrderCursorPagination
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return OrderListSerializer
+        return OrdersSerializer
+
     def get_queryset(self):
         """
         Filter orders to return only orders belonging to the current user
         if the user is not a staff member
         """
-        queryset = Orders.objects.all()
+        if self.action == 'list':
+            queryset = orders_for_listing()
+        elif self.action in ('record_payment', 'stock_hold'):
+            queryset = Orders.objects.all()
+        else:
+            queryset = orders_with_details()
         if self.request.user.is_authenticated and not self.request.user.is_staff:
             # If a regular user is logged in, only show their orders
             queryset = queryset.filter(customer__user=self.request.user)
@@ -49,6 +124,7 @@ class OrdersViewSet(ModelViewSet):
             "shipping_address": {...},
             "shipping_zone_id": 1,
             "shipping_rate_id": 2,  // Optional - will recalculate if not provided
+            "stock_hold": "<hold_token>",  // Optional - from POST /orders/stock-hold/
             "products": [
                 {
                     "name": "Product Name",
@@ -62,6 +138,8 @@ class OrdersViewSet(ModelViewSet):
                 }
             ]
         }
+
+        Stock is taken out with the order; 409 lists the parts that ran out.
         """
         # Get the authenticated user's customer record
         if not request.user.is_authenticated:
@@ -90,6 +168,10 @@ class OrdersViewSet(ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        hold_token, error = _parse_hold_token(request.data.get('stock_hold'))
+        if error:
+            return error
+
         if not shipping_zone_id:
             return Response(
                 {'error': 'Shipping zone is required'},
@@ -105,31 +187,13 @@ class OrdersViewSet(ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Create shipping address
-        shipping_address = None
-        if shipping_address_data:
-            shipping_address = ShippingAddress.objects.create(**shipping_address_data)
-
         # Calculate products subtotal and build cart items for shipping calculation
         subtotal = Decimal('0.00')
-        cart_items = []
-
         for product in products_data:
             price = Decimal(str(product.get('price', 0)))
             quantity = int(product.get('quantity', 1))
             subtotal += price * quantity
-
-            # Build cart item for shipping calculation
-            category_id = product.get('category_id')
-            if category_id:
-                try:
-                    category = Category.objects.get(id=category_id)
-                    cart_items.append({
-                        'category': category,
-                        'quantity': quantity
-                    })
-                except Category.DoesNotExist:
-                    pass
+        cart_items = get_cart_items(products_data)
 
         # Calculate shipping options
         shipping_cost = Decimal('0.00')
@@ -172,86 +236,125 @@ class OrdersViewSet(ModelViewSet):
         # Calculate total price (subtotal + shipping)
         total_price = subtotal + shipping_cost
 
-        # Create order
-        order = Orders.objects.create(
-            customer=customer,
-            shipping_address=shipping_address,
-            subtotal=subtotal,
-            shipping_cost=shipping_cost,
-            total_price=total_price
-        )
+        demand = stock_demand(products_data)
 
-        # Create shipping method record
-        if shipping_details:
-            estimated_delivery_date = None
-            if 'estimated_delivery_date' in shipping_details:
-                estimated_delivery_date = shipping_details['estimated_delivery_date']
-
-            OrderShippingMethod.objects.create(
-                order=order,
-                zone=shipping_zone,
-                rate_id=shipping_details.get('rate_id'),
-                delivery_method=shipping_details['delivery_method'],
-                service_level=shipping_details['service_level'],
-                base_shipping_cost_ugx=Decimal(str(shipping_details['base_cost_ugx'])),
-                helper_fee_ugx=Decimal(str(shipping_details['helper_fee_ugx'])),
-                extra_care_fee_ugx=Decimal(str(shipping_details['extra_care_fee_ugx'])),
-                total_weight_kg=Decimal(str(shipping_details['total_weight_kg'])),
-                total_volume_m3=Decimal(str(shipping_details['total_volume_m3'])),
-                calculation_notes={
-                    'reasons': shipping_details['reasons'],
-                    'requires_helper': shipping_details['requires_helper'],
-                    'requires_extra_care': shipping_details['requires_extra_care'],
-                },
-                estimated_delivery_date=estimated_delivery_date
+        try:
+            order = self._create_order(
+                customer, shipping_address_data, shipping_zone, shipping_details, products_data,
+                subtotal, shipping_cost, total_price, demand, hold_token
+            )
+        except InsufficientStock as e:
+            return _out_of_stock(e)
+        except StockBusy as e:
+            return _stock_busy(e)
+
+        # Serialize and return
+        serializer = self.get_serializer(orders_with_details().get(pk=order.pk))
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @retry_on_lock_conflict
+    def _create_order(self, customer, shipping_address_data, shipping_zone, shipping_details, products_data,
+                      subtotal, shipping_cost, total_price, demand, hold_token):
+        """
+        Write the order in one transaction, taking its stock last so stock rows
+        are locked briefly. Run again from scratch if it loses a lock conflict.
+        """
+        # Build order products and items in memory, with the minimum payment
+        lines, minimum_required_amount = build_order_lines(products_data)
+
+        with transaction.atomic():
+            # Create shipping address
+            shipping_address = None
+            if shipping_address_data:
+                shipping_address = ShippingAddress.objects.create(**shipping_address_data)
+
+            # Create order
+            order = Orders.objects.create(
+                customer=customer,
+                shipping_address=shipping_address,
+                subtotal=subtotal,
+                shipping_cost=shipping_cost,
+                total_price=total_price,
+                minimum_required_amount=minimum_required_amount
             )
 
-        # Create order products and items
-        for product_data in products_data:
-            product_name = product_data.get('name', 'Custom Product')
-            product_price = Decimal(str(product_data.get('price', 0)))
-            quantity = int(product_data.get('quantity', 1))
-            configuration = product_data.get('configuration', {})
+            # Create shipping method record
+            if shipping_details:
+                estimated_delivery_date = None
+                if 'estimated_delivery_date' in shipping_details:
+                    estimated_delivery_date = shipping_details['estimated_delivery_date']
 
-            # Create OrderProduct for each product (respecting quantity)
-            for _ in range(quantity):
-                order_product = OrderProduct.objects.create(
+                OrderShippingMethod.objects.create(
                     order=order,
-                    base_product_name=product_name
+                    zone=shipping_zone,
+                    rate_id=shipping_details.get('rate_id'),
+                    delivery_method=shipping_details['delivery_method'],
+                    service_level=shipping_details['service_level'],
+                    base_shipping_cost_ugx=Decimal(str(shipping_details['base_cost_ugx'])),
+                    helper_fee_ugx=Decimal(str(shipping_details['helper_fee_ugx'])),
+                    extra_care_fee_ugx=Decimal(str(shipping_details['extra_care_fee_ugx'])),
+                    total_weight_kg=Decimal(str(shipping_details['total_weight_kg'])),
+                    total_volume_m3=Decimal(str(shipping_details['total_volume_m3'])),
+                    calculation_notes={
+                        'reasons': shipping_details['reasons'],
+                        'requires_helper': shipping_details['requires_helper'],
+                        'requires_extra_care': shipping_details['requires_extra_care'],
+                    },
+                    estimated_delivery_date=estimated_delivery_date
                 )
 
-                # Create OrderItems for each configuration part
-                for part_key, part_data in configuration.items():
-                    if isinstance(part_data, dict):
-                        option_name = part_data.get('name', '')
-                        final_price = Decimal(str(part_data.get('price', 0)))
-
-                        # Calculate minimum payment required based on part option percentage
-                        # Note: minimum_payment_percentage is stored as decimal (0.25 = 25%, 1.00 = 100%)
-                        minimum_payment_required = Decimal('0.00')
-                        try:
-                            part_option = PartOption.objects.get(name=option_name)
-                            minimum_payment_percentage = part_option.minimum_payment_percentage
-                            minimum_payment_required = (final_price * minimum_payment_percentage).quantize(Decimal('0.01'))
-                        except PartOption.DoesNotExist:
-                            # If part option not found, default to 0
-                            pass
-
-                        OrderItem.objects.create(
-                            order_product=order_product,
-                            part_name=part_key.capitalize(),
-                            option_name=option_name,
-                            final_price=final_price,
-                            minimum_payment_required=minimum_payment_required
-                        )
+            # Create order products and items: one INSERT per table
+            save_order_lines(order, lines)
 
-        # Calculate minimum required amount
-        order.minimum_required_amount = order.calculate_minimum_required_amount()
-        order.save()
+            # Consume the checkout's stock holds; rolls the order back if stock ran out
+            convert_stock_holds(order, demand, hold_token)
+        return order
 
-        # Serialize and return
-        serializer = self.get_serializer(order)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='stock-hold', permission_classes=[IsAuthenticated])
+    def stock_hold(self, request):
+        """
+        Hold stock for a cart while the customer checks out.
+
+        Expected request data:
+        {
+            "products": [...],  // as for order creation
+            "stock_hold": "<hold_token>"  // Optional - previous hold of this checkout, released first
+        }
+
+        Returns the hold token to send with the order, and when the hold expires.
+        409 lists the parts that are out of stock.
+        """
+        products_data = request.data.get('products', [])
+        if not products_data:
+            return Response(
+                {'error': 'At least one product is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        previous_token, error = _parse_hold_token(request.data.get('stock_hold'))
+        if error:
+            return error
+        if previous_token:
+            try:
+                release_stock_hold(previous_token)
+            except StockBusy as e:
+                return _stock_busy(e)
+
+        try:
+            hold_token, expires_at, reservations = hold_stock(stock_demand(products_data))
+        except InsufficientStock as e:
+            return _out_of_stock(e)
+        except StockBusy as e:
+            return _stock_busy(e)
+
+        return Response({
+            'hold_token': str(hold_token),
+            'expires_at': expires_at,
+            'items': [
+                {'part_option_id': r.part_option_id, 'quantity': r.quantity}
+                for r in reservations
+            ]
+        }, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def record_payment(self, request, pk=None):
@@ -275,27 +378,18 @@ class OrdersViewSet(ModelViewSet):
             )
 
         try:
-            from decimal import Decimal
             amount = Decimal(str(amount))
             if amount <= 0:
                 return Response(
                     {'error': 'Amount must be greater than 0'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-        except (ValueError, TypeError):
+        except (ValueError, TypeError, InvalidOperation):
             return Response(
                 {'error': 'Invalid amount'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Check if payment would exceed total price
-        if order.amount_paid + amount > order.total_price:
-            return Response(
-                {'error': f'Payment amount exceeds remaining balance of {order.balance_due}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Create payment
         payment_data = {
             'order': order.id,
             'amount': amount,
@@ -305,20 +399,30 @@ class OrdersViewSet(ModelViewSet):
         }
 
         serializer = PaymentSerializer(data=payment_data)
-        if serializer.is_valid():
-            serializer.save()
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            # Refresh order data to get updated payment status
-            order.refresh_from_db()
-            order_serializer = OrdersSerializer(order)
+        # Check the balance and create the payment under the order's row lock
+        data = serializer.validated_data
+        try:
+            payment = record_payment(
+                order.id,
+                data['amount'],
+                data['payment_method'],
+                paid_by=data.get('paid_by', 'customer'),
+                transaction_reference=data.get('transaction_reference', '')
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            return Response({
-                'message': 'Payment recorded successfully',
-                'payment': serializer.data,
-                'order': order_serializer.data
-            }, status=status.HTTP_201_CREATED)
+        # Re-read the order to get updated payment status
+        order_serializer = OrdersSerializer(orders_with_details().get(pk=order.pk))
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'message': 'Payment recorded successfully',
+            'payment': PaymentSerializer(payment).data,
+            'order': order_serializer.data
+        }, status=status.HTTP_201_CREATED)
 
 class OrderProductViewSet(ModelViewSet):
     """
@@ -333,13 +437,14 @@ class OrderProductViewSet(ModelViewSet):
     queryset = OrderProduct.objects.all()
     serializer_class = OrderProductSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OrderCursorPagination
     
     def get_queryset(self):
         """
         Filter order products to return only those belonging to the current user's orders
         if the user is not a staff member
         """
-        queryset = OrderProduct.objects.all()
+        queryset = order_products_with_items()
         if self.request.user.is_authenticated and not self.request.user.is_staff:
             # If a regular user is logged in, only show their order products
             queryset = queryset.filter(order__customer__user=self.request.user)
@@ -358,6 +463,7 @@ class OrderItemViewSet(ModelViewSet):
     queryset = OrderItem.objects.all()
     serializer_class = OrderItemSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OrderCursorPagination
 
     def get_queryset(self):
         """
@@ -384,6 +490,7 @@ class PaymentViewSet(ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OrderCursorPagination
 
     def get_queryset(self):
         """
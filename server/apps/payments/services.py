@@ -1,5 +1,6 @@
 from typing import Optional, Dict, Any
 from decimal import Decimal
+from django.db import transaction as db_transaction
 from django.utils import timezone
 
 from .models import PaymentGatewayConfig, PaymentTransaction
@@ -10,6 +11,10 @@ from .gateways.airtel_money import AirtelMoneyGateway
 from apps.orders.models import Orders, Payment
 
 
+# PaymentTransaction fields written from a gateway result
+GATEWAY_RESULT_FIELDS = ['status', 'gateway_response', 'error_message', 'completed_at', 'updated_at']
+
+
 class PaymentService:
     """
     Payment service using Factory pattern
@@ -182,7 +187,8 @@ class PaymentService:
             if result.success:
                 transaction.completed_at = timezone.now()
 
-            transaction.save()
+            # Only the gateway fields: a concurrent callback may have linked the payment
+            transaction.save(update_fields=GATEWAY_RESULT_FIELDS)
 
             # Create Payment record if successful and not already created
             if result.success and transaction.payment is None:
@@ -244,7 +250,7 @@ class PaymentService:
                     if result.success:
                         transaction.completed_at = timezone.now()
 
-                    transaction.save()
+                    transaction.save(update_fields=GATEWAY_RESULT_FIELDS)
 
                     # Create Payment record if successful
                     if result.success and transaction.payment is None:
@@ -267,19 +273,25 @@ class PaymentService:
         """
         Create Payment record from successful transaction
 
+        The transaction row is locked first, so a webhook and a verification
+        (or retried callbacks) arriving together record the payment once.
+
         Args:
             transaction: PaymentTransaction instance
         """
-        payment = Payment.objects.create(
-            order=transaction.order,
-            amount=transaction.amount,
-            payment_method=transaction.gateway,
-            paid_by='customer',
-            transaction_reference=transaction.gateway_transaction_id
-        )
+        with db_transaction.atomic():
+            locked = PaymentTransaction.objects.select_for_update().get(pk=transaction.pk)
+            if locked.payment_id is None:
+                locked.payment = Payment.objects.create(
+                    order_id=locked.order_id,
+                    amount=locked.amount,
+                    payment_method=locked.gateway,
+                    paid_by='customer',
+                    transaction_reference=locked.gateway_transaction_id
+                )
+                locked.save(update_fields=['payment', 'updated_at'])
 
-        transaction.payment = payment
-        transaction.save()
+        transaction.payment = locked.payment
 
     @classmethod
     def get_available_gateways(cls) -> list:
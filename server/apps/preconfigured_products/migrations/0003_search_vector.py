@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('preconfigured_products', '0002_create_materialized_views'),
+        ('products', '0003_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='preconfiguredproduct',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION preconfiguredproduct_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector :=
+                setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER preconfiguredproduct_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF name, description ON preconfiguredproduct
+            FOR EACH ROW EXECUTE FUNCTION preconfiguredproduct_search_vector_update();
+
+            -- Backfill existing rows
+            UPDATE preconfiguredproduct SET search_vector =
+                setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(description, '')), 'B');
+            """,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS preconfiguredproduct_search_vector_trigger ON preconfiguredproduct;
+            DROP FUNCTION IF EXISTS preconfiguredproduct_search_vector_update();
+            """
+        ),
+        migrations.AddIndex(
+            model_name='preconfiguredproduct',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='preconfiguredproduct_search'),
+        ),
+        migrations.AddIndex(
+            model_name='preconfiguredproduct',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='preconfiguredproduct_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('preconfigured_products', '0003_search_vector'),
+        ('products', '0003_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='preconfiguredproduct',
+            index=models.Index(fields=['category', 'base_price'], name='preconfiguredproduct_cat_price'),
+        ),
+    ]
@@ -0,0 +1,147 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# trending_score adds 2^((ordered_at - epoch) / half-life) per order; keep the
+# epoch and 30-day half-life in sync with preconfigured_products.services
+SALES_COUNTER_SQL = """
+CREATE OR REPLACE FUNCTION product_sales_score(ordered_at timestamptz) RETURNS double precision
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT power(
+        2.0::double precision,
+        (extract(epoch FROM ordered_at - TIMESTAMPTZ '2025-01-01 00:00:00+00') / 2592000.0)::double precision
+    )
+$$;
+
+-- Statement-level: one aggregated upsert per INSERT/UPDATE/DELETE statement,
+-- in product id order so concurrent orders lock counter rows consistently
+CREATE OR REPLACE FUNCTION product_sales_counter_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE product_sales_counter c
+        SET times_ordered = c.times_ordered - d.times_ordered,
+            trending_score = GREATEST(c.trending_score - d.trending_score, 0)
+        FROM (
+            SELECT r.preconfigured_product_id,
+                   COUNT(*) AS times_ordered,
+                   SUM(product_sales_score(COALESCE(o.created_at, now()))) AS trending_score
+            FROM old_rows r
+            LEFT JOIN orders o ON o.id = r.order_id
+            WHERE r.preconfigured_product_id IS NOT NULL
+            GROUP BY r.preconfigured_product_id
+        ) d
+        WHERE c.preconfigured_product_id = d.preconfigured_product_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO product_sales_counter AS c
+            (preconfigured_product_id, times_ordered, trending_score, last_ordered_at)
+        SELECT r.preconfigured_product_id,
+               COUNT(*),
+               SUM(product_sales_score(COALESCE(o.created_at, now()))),
+               MAX(COALESCE(o.created_at, now()))
+        FROM new_rows r
+        LEFT JOIN orders o ON o.id = r.order_id
+        WHERE r.preconfigured_product_id IS NOT NULL
+        GROUP BY r.preconfigured_product_id
+        ORDER BY r.preconfigured_product_id
+        ON CONFLICT (preconfigured_product_id) DO UPDATE
+        SET times_ordered = c.times_ordered + EXCLUDED.times_ordered,
+            trending_score = c.trending_score + EXCLUDED.trending_score,
+            last_ordered_at = GREATEST(c.last_ordered_at, EXCLUDED.last_ordered_at);
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER orderproduct_sales_insert AFTER INSERT ON orderproduct
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION product_sales_counter_apply();
+CREATE TRIGGER orderproduct_sales_update AFTER UPDATE ON orderproduct
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION product_sales_counter_apply();
+CREATE TRIGGER orderproduct_sales_delete AFTER DELETE ON orderproduct
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION product_sales_counter_apply();
+
+-- Backfill from existing orders
+INSERT INTO product_sales_counter (preconfigured_product_id, times_ordered, trending_score, last_ordered_at)
+SELECT op.preconfigured_product_id, COUNT(*), SUM(product_sales_score(o.created_at)), MAX(o.created_at)
+FROM orderproduct op
+JOIN orders o ON o.id = op.order_id
+WHERE op.preconfigured_product_id IS NOT NULL
+GROUP BY op.preconfigured_product_id;
+
+-- The read models become plain views over the counters: always current,
+-- nothing to refresh
+DROP MATERIALIZED VIEW IF EXISTS bestsellingpreconfiguredproduct;
+DROP MATERIALIZED VIEW IF EXISTS toppreconfiguredproductspercategory;
+
+CREATE VIEW toppreconfiguredproductspercategory AS
+SELECT pp.category_id, pp.id AS preconfigured_product_id, pp.name AS preconfigured_name, c.times_ordered
+FROM product_sales_counter c
+JOIN preconfiguredproduct pp ON pp.id = c.preconfigured_product_id
+WHERE c.times_ordered > 0;
+
+CREATE VIEW bestsellingpreconfiguredproduct AS
+SELECT pp.id AS preconfigured_product_id, pp.name, c.times_ordered
+FROM product_sales_counter c
+JOIN preconfiguredproduct pp ON pp.id = c.preconfigured_product_id
+WHERE c.times_ordered > 0
+ORDER BY c.times_ordered DESC, pp.id
+LIMIT 1;
+"""
+
+REVERSE_SALES_COUNTER_SQL = """
+DROP VIEW IF EXISTS bestsellingpreconfiguredproduct;
+DROP VIEW IF EXISTS toppreconfiguredproductspercategory;
+DROP TRIGGER IF EXISTS orderproduct_sales_insert ON orderproduct;
+DROP TRIGGER IF EXISTS orderproduct_sales_update ON orderproduct;
+DROP TRIGGER IF EXISTS orderproduct_sales_delete ON orderproduct;
+DROP FUNCTION IF EXISTS product_sales_counter_apply();
+DROP FUNCTION IF EXISTS product_sales_score(timestamptz);
+
+CREATE MATERIALIZED VIEW toppreconfiguredproductspercategory AS
+SELECT pp.category_id, pp.id AS preconfigured_product_id, pp.name AS preconfigured_name, COUNT(op.id) AS times_ordered
+FROM preconfiguredproduct pp
+JOIN orderproduct op ON op.preconfigured_product_id = pp.id
+GROUP BY pp.category_id, pp.id, pp.name
+ORDER BY pp.category_id, times_ordered DESC;
+
+CREATE MATERIALIZED VIEW bestsellingpreconfiguredproduct AS
+SELECT pp.id AS preconfigured_product_id, pp.name, COUNT(op.id) AS times_ordered
+FROM preconfiguredproduct pp
+JOIN orderproduct op ON op.preconfigured_product_id = pp.id
+GROUP BY pp.id, pp.name
+ORDER BY times_ordered DESC
+LIMIT 1;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('preconfigured_products', '0004_category_price_index'),
+        ('orders', '0003_orders_base_currency_total_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSalesCounter',
+            fields=[
+                ('preconfigured_product', models.OneToOneField(db_column='preconfigured_product_id', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sales_counter', serialize=False, to='preconfigured_products.preconfiguredproduct')),
+                ('times_ordered', models.IntegerField(default=0)),
+                ('trending_score', models.FloatField(default=0)),
+                ('last_ordered_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'product_sales_counter',
+                'indexes': [models.Index(fields=['-times_ordered'], name='product_sales_times_ordered'), models.Index(fields=['-trending_score'], name='product_sales_trending')],
+            },
+        ),
+        migrations.RunSQL(SALES_COUNTER_SQL, reverse_sql=REVERSE_SALES_COUNTER_SQL),
+    ]
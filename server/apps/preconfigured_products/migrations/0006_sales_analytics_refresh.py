@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('preconfigured_products', '0005_product_sales_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesAnalyticsRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('trigger', models.CharField(choices=[('scheduled', 'Scheduled'), ('on_demand', 'On demand'), ('manual', 'Manual')], max_length=20)),
+                ('status', models.CharField(choices=[('completed', 'Completed'), ('failed', 'Failed')], max_length=20)),
+                ('duration_ms', models.IntegerField(blank=True, null=True)),
+                ('products_counted', models.IntegerField(blank=True, help_text='Products with sales', null=True)),
+                ('counters_corrected', models.IntegerField(blank=True, help_text='Counters that had drifted', null=True)),
+                ('change_watermark', models.BigIntegerField(blank=True, help_text='orderproduct write count (pg_stat_user_tables) when the run started', null=True)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'db_table': 'sales_analytics_refresh',
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:05
+
+from django.db import migrations
+
+
+# Order lines carry a quantity since orders/0004: count units, not rows.
+# An UPDATE of quantity subtracts the old units and adds the new ones.
+def sales_counter_function(units):
+    return f"""
+CREATE OR REPLACE FUNCTION product_sales_counter_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE product_sales_counter c
+        SET times_ordered = c.times_ordered - d.times_ordered,
+            trending_score = GREATEST(c.trending_score - d.trending_score, 0)
+        FROM (
+            SELECT r.preconfigured_product_id,
+                   SUM({units}) AS times_ordered,
+                   SUM({units} * product_sales_score(COALESCE(o.created_at, now()))) AS trending_score
+            FROM old_rows r
+            LEFT JOIN orders o ON o.id = r.order_id
+            WHERE r.preconfigured_product_id IS NOT NULL
+            GROUP BY r.preconfigured_product_id
+        ) d
+        WHERE c.preconfigured_product_id = d.preconfigured_product_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO product_sales_counter AS c
+            (preconfigured_product_id, times_ordered, trending_score, last_ordered_at)
+        SELECT r.preconfigured_product_id,
+               SUM({units}),
+               SUM({units} * product_sales_score(COALESCE(o.created_at, now()))),
+               MAX(COALESCE(o.created_at, now()))
+        FROM new_rows r
+        LEFT JOIN orders o ON o.id = r.order_id
+        WHERE r.preconfigured_product_id IS NOT NULL
+        GROUP BY r.preconfigured_product_id
+        ORDER BY r.preconfigured_product_id
+        ON CONFLICT (preconfigured_product_id) DO UPDATE
+        SET times_ordered = c.times_ordered + EXCLUDED.times_ordered,
+            trending_score = c.trending_score + EXCLUDED.trending_score,
+            last_ordered_at = GREATEST(c.last_ordered_at, EXCLUDED.last_ordered_at);
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('preconfigured_products', '0006_sales_analytics_refresh'),
+        ('orders', '0004_orderproduct_quantity'),
+    ]
+
+    operations = [
+        migrations.RunSQL(sales_counter_function('r.quantity'), reverse_sql=sales_counter_function('1')),
+    ]
@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
 from apps.products.models import PartOption, Category
 
 class PreConfiguredProduct(models.Model):
@@ -7,9 +10,18 @@ class PreConfiguredProduct(models.Model):
     base_price = models.DecimalField(max_digits=10, decimal_places=2)
     image = models.ImageField(upload_to='preconfigured_products/', null=True, blank=True)
     description = models.TextField(null=True, blank=True)
+    # Weighted name (A) + description (B) tsvector, maintained by a database
+    # trigger (migration 0003_search_vector)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         db_table = 'preconfiguredproduct'
+        indexes = [
+            GinIndex(fields=['search_vector'], name='preconfiguredproduct_search'),
+            GinIndex(fields=['name'], name='preconfiguredproduct_name_trgm', opclasses=['gin_trgm_ops']),
+            # Category browsing with price range filters and facets
+            models.Index(fields=['category', 'base_price'], name='preconfiguredproduct_cat_price'),
+        ]
 
     def __str__(self):
         return self.name
@@ -28,7 +40,75 @@ class PreConfiguredProductParts(models.Model):
     def __str__(self):
         return f"{self.preconfigured_product.name} - {self.part_option.name}"
 
-# Materialized view models
+class ProductSalesCounter(models.Model):
+    """
+    Running sales totals per preconfigured product, kept current by statement
+    triggers on orderproduct (migration 0005_product_sales_counter), so
+    best-seller rankings never rescan order history. Sales are counted in
+    units: an order line adds its quantity (migration 0007).
+
+    trending_score sums 2^((ordered_at - epoch) / half-life) over the product's
+    orders: ordering by it ranks by exponentially time-decayed sales without
+    ever rewriting old rows (see services.current_trending_score).
+    """
+    preconfigured_product = models.OneToOneField(
+        PreConfiguredProduct,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='sales_counter',
+        db_column='preconfigured_product_id'
+    )
+    times_ordered = models.IntegerField(default=0)
+    trending_score = models.FloatField(default=0)
+    last_ordered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'product_sales_counter'
+        indexes = [
+            models.Index(fields=['-times_ordered'], name='product_sales_times_ordered'),
+            models.Index(fields=['-trending_score'], name='product_sales_trending'),
+        ]
+
+    def __str__(self):
+        return f"{self.preconfigured_product_id}: ordered {self.times_ordered} times"
+
+class SalesAnalyticsRefresh(models.Model):
+    """
+    One executed recount of the sales counters (see services.refresh_sales_analytics).
+    Skipped runs are not recorded.
+    """
+    TRIGGER_CHOICES = [
+        ('scheduled', 'Scheduled'),
+        ('on_demand', 'On demand'),
+        ('manual', 'Manual'),
+    ]
+    STATUS_CHOICES = [
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    started_at = models.DateTimeField(default=timezone.now)
+    trigger = models.CharField(max_length=20, choices=TRIGGER_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    duration_ms = models.IntegerField(null=True, blank=True)
+    products_counted = models.IntegerField(null=True, blank=True, help_text="Products with sales")
+    counters_corrected = models.IntegerField(null=True, blank=True, help_text="Counters that had drifted")
+    change_watermark = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="orderproduct write count (pg_stat_user_tables) when the run started"
+    )
+    error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'sales_analytics_refresh'
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.trigger} refresh at {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
+
+# Read models over product_sales_counter (plain views since migration 0005;
+# they were materialized views refreshed by pg_cron before)
 class BestSellingPreconfiguredProduct(models.Model):
     preconfigured_product_id = models.IntegerField(primary_key=True)
     name = models.CharField(max_length=255)
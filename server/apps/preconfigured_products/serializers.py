@@ -34,7 +34,7 @@ class PreConfiguredProductSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = PreConfiguredProduct
-        fields = '__all__'
+        exclude = ['search_vector']
 
     def get_image_url(self, obj):
         """Return full URL for image if it exists."""
@@ -113,3 +113,22 @@ class TopPreconfiguredProductsPerCategorySerializer(serializers.ModelSerializer)
                 return request.build_absolute_uri(obj.image.url)
             return obj.image.url
         return None
+
+class PreConfiguredProductSearchSerializer(serializers.ModelSerializer):
+    """Compact search result: no nested parts, plus the search rank (null when browsing)"""
+    image_url = serializers.SerializerMethodField()
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    rank = serializers.FloatField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = PreConfiguredProduct
+        fields = ['id', 'name', 'description', 'base_price', 'category', 'category_name', 'image_url', 'rank']
+
+    def get_image_url(self, obj):
+        """Return full URL for image if it exists."""
+        if obj.image:
+            request = self.context.get('request')
+            if request:
+                return request.build_absolute_uri(obj.image.url)
+            return obj.image.url
+        return None
@@ -0,0 +1,372 @@
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Exists, F, OuterRef, Prefetch, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from apps.products.services import ranked_search, text_match
+from utils.catalog_version import get_catalog_version
+from utils.response_cache import invalidate_tags
+from .models import PreConfiguredProduct, PreConfiguredProductParts, ProductSalesCounter, SalesAnalyticsRefresh
+
+
+# Lower edges of the price facet buckets; the last bucket is open-ended
+PRICE_BUCKET_EDGES = [0, 100, 250, 500, 1000, 2500]
+
+FACETS_CACHE_TIMEOUT = 60 * 60  # Entries are per catalog version; this only bounds memory
+
+# Sales rankings: lifetime order count, or exponentially time-decayed orders.
+# The epoch and half-life mirror product_sales_score() in migration 0005.
+SALES_RANKINGS = {'orders': 'times_ordered', 'trending': 'trending_score'}
+SALES_SCORE_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+SALES_SCORE_HALF_LIFE = timedelta(days=30)
+
+
+def products_with_details():
+    """
+    Products with everything PreConfiguredProductSerializer reads, fetched in
+    two queries (products + category + sales counter, then parts + part
+    option + part) however many products are serialized.
+    """
+    parts = PreConfiguredProductParts.objects.select_related('part_option__part').defer(
+        'part_option__search_vector'
+    ).order_by('id')
+    return PreConfiguredProduct.objects.select_related('category', 'sales_counter').defer(
+        'search_vector'
+    ).prefetch_related(Prefetch('parts', queryset=parts))
+
+
+# Every product's counters recounted from orderproduct
+SALES_TOTALS_CTE = """totals AS (
+    SELECT op.preconfigured_product_id,
+           SUM(op.quantity) AS times_ordered,
+           SUM(op.quantity * product_sales_score(o.created_at)) AS trending_score,
+           MAX(o.created_at) AS last_ordered_at
+    FROM orderproduct op
+    JOIN orders o ON o.id = op.order_id
+    WHERE op.preconfigured_product_id IS NOT NULL
+    GROUP BY op.preconfigured_product_id
+)"""
+
+# A counter drifted if the recount would write it (same rules as the rebuild
+# below). Read-only: returns (products with sales, drifted counters).
+COUNT_DRIFTED_SALES_COUNTERS_SQL = f"""
+WITH {SALES_TOTALS_CTE}
+SELECT (SELECT COUNT(*) FROM totals), COUNT(*)
+FROM totals t
+FULL JOIN product_sales_counter c ON c.preconfigured_product_id = t.preconfigured_product_id
+WHERE CASE
+    WHEN t.preconfigured_product_id IS NULL THEN c.times_ordered <> 0
+    WHEN c.preconfigured_product_id IS NULL THEN TRUE
+    ELSE c.times_ordered <> t.times_ordered
+      OR c.last_ordered_at IS DISTINCT FROM t.last_ordered_at
+      OR abs(c.trending_score - t.trending_score) > 1e-9 * GREATEST(abs(t.trending_score), 1)
+END
+"""
+
+# Recount every product from orderproduct, for counters that drifted (e.g.
+# rows loaded with triggers disabled). Products without orders drop to zero;
+# only counters that differ are written. Returns (products with sales,
+# counters corrected).
+REBUILD_SALES_COUNTERS_SQL = f"""
+WITH {SALES_TOTALS_CTE},
+zeroed AS (
+    UPDATE product_sales_counter c
+    SET times_ordered = 0, trending_score = 0
+    WHERE NOT EXISTS (SELECT 1 FROM totals t WHERE t.preconfigured_product_id = c.preconfigured_product_id)
+      AND c.times_ordered <> 0
+    RETURNING 1
+),
+upserted AS (
+    INSERT INTO product_sales_counter AS c (preconfigured_product_id, times_ordered, trending_score, last_ordered_at)
+    SELECT preconfigured_product_id, times_ordered, trending_score, last_ordered_at
+    FROM totals
+    ORDER BY preconfigured_product_id
+    ON CONFLICT (preconfigured_product_id) DO UPDATE
+    SET times_ordered = EXCLUDED.times_ordered,
+        trending_score = EXCLUDED.trending_score,
+        last_ordered_at = EXCLUDED.last_ordered_at
+    WHERE c.times_ordered <> EXCLUDED.times_ordered
+       OR c.last_ordered_at IS DISTINCT FROM EXCLUDED.last_ordered_at
+       OR abs(c.trending_score - EXCLUDED.trending_score) > 1e-9 * GREATEST(abs(EXCLUDED.trending_score), 1)
+    RETURNING 1
+)
+SELECT (SELECT COUNT(*) FROM totals), (SELECT COUNT(*) FROM upserted) + (SELECT COUNT(*) FROM zeroed)
+"""
+
+# pg advisory lock held by the node recounting the sales counters
+SALES_ANALYTICS_LOCK_ID = 0x5A1E5
+SALES_ANALYTICS_RUN_RETENTION = timedelta(days=30)
+
+
+def count_drifted_sales_counters():
+    """
+    (products with sales, counters the rebuild would correct), without taking
+    any lock: one statement reads one snapshot, in which the triggers' counter
+    updates and the order lines they count are always both visible or both not.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(COUNT_DRIFTED_SALES_COUNTERS_SQL)
+        return cursor.fetchone()
+
+
+def rebuild_sales_counters():
+    """
+    Recompute product_sales_counter from the full order history and return
+    (products with sales, counters corrected). New order lines wait for the
+    rebuild (SHARE lock on orderproduct) so none is counted twice or missed.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("LOCK TABLE orderproduct IN SHARE MODE")
+        cursor.execute(REBUILD_SALES_COUNTERS_SQL)
+        products, corrected = cursor.fetchone()
+        return products, corrected
+
+
+def orderproduct_change_watermark():
+    """
+    Rows ever inserted, updated or deleted in orderproduct according to the
+    statistics collector. Any write moves it (so does a stats reset, which
+    only costs one extra refresh).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT n_tup_ins + n_tup_upd + n_tup_del FROM pg_stat_user_tables WHERE relname = 'orderproduct'"
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def refresh_sales_analytics(force=False, trigger='scheduled'):
+    """
+    Recount the sales counters on one node at a time and record the run.
+
+    Skipped when another node holds the advisory lock, or (unless `force`)
+    when orderproduct has not been written since the last completed run.
+    Scheduled runs first compare the counters with the order history without
+    blocking writers, and only rebuild (blocking new order lines) when some
+    drifted; forced runs always rebuild.
+    Returns a status dict for task results and command output.
+    """
+    watermark = orderproduct_change_watermark()
+    if not force:
+        last_run = SalesAnalyticsRefresh.objects.filter(status='completed').first()
+        if last_run and watermark is not None and last_run.change_watermark == watermark:
+            return {"status": "skipped", "reason": "No order lines changed since the last refresh"}
+
+    run = SalesAnalyticsRefresh(trigger=trigger, change_watermark=watermark)
+    started = time.monotonic()
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [SALES_ANALYTICS_LOCK_ID])
+                if not cursor.fetchone()[0]:
+                    return {"status": "skipped", "reason": "Another node is refreshing"}
+            drifted = None
+            if not force:
+                run.products_counted, drifted = count_drifted_sales_counters()
+                run.counters_corrected = 0
+            if force or drifted:
+                run.products_counted, run.counters_corrected = rebuild_sales_counters()
+        run.status = 'completed'
+    except Exception as e:
+        run.status = 'failed'
+        run.error = str(e)
+        print(f"✗ Sales analytics refresh failed: {e}")
+    run.duration_ms = int((time.monotonic() - started) * 1000)
+    run.save()
+
+    SalesAnalyticsRefresh.objects.filter(started_at__lt=timezone.now() - SALES_ANALYTICS_RUN_RETENTION).delete()
+    if run.status == 'failed':
+        return {"status": "error", "message": run.error}
+
+    if run.counters_corrected:
+        invalidate_tags(ProductSalesCounter)
+        print(f"⚠️ Corrected {run.counters_corrected} drifted sales counters")
+    return {
+        "status": "success",
+        "duration_ms": run.duration_ms,
+        "products_counted": run.products_counted,
+        "counters_corrected": run.counters_corrected,
+    }
+
+
+def request_sales_analytics_refresh():
+    """
+    Queue a forced refresh once the current transaction commits, e.g. after a
+    bulk order import that may have bypassed the triggers (seed_db). Runs it
+    in-process if the task cannot be queued.
+    """
+    from .tasks import refresh_sales_analytics_task
+
+    def queue_refresh():
+        try:
+            refresh_sales_analytics_task.delay(force=True, trigger='on_demand')
+        except Exception as e:
+            print(f"⚠️ Could not queue the sales analytics refresh, running it now: {e}")
+            refresh_sales_analytics(force=True, trigger='on_demand')
+
+    transaction.on_commit(queue_refresh)
+
+
+def current_trending_score(score, now=None):
+    """
+    A stored trending_score decayed to `now`: each order counts 1 when placed
+    and half as much every SALES_SCORE_HALF_LIFE after.
+    """
+    now = now or timezone.now()
+    return score * 2 ** (-((now - SALES_SCORE_EPOCH) / SALES_SCORE_HALF_LIFE))
+
+
+def sold_products(ranking='orders'):
+    """Products with at least one order, best first by the given ranking"""
+    field = f'sales_counter__{SALES_RANKINGS[ranking]}'
+    return products_with_details().filter(sales_counter__times_ordered__gt=0).order_by(F(field).desc(), 'id')
+
+
+def top_products_per_category(limit=3, category_id=None, ranking='orders'):
+    """
+    The `limit` best-selling products of each category, ranked in SQL with
+    ROW_NUMBER() OVER (PARTITION BY category_id) over the live sales
+    counters, ordered by category then rank.
+    """
+    field = f'sales_counter__{SALES_RANKINGS[ranking]}'
+    ranked = products_with_details().filter(sales_counter__times_ordered__gt=0).annotate(
+        position=Window(
+            RowNumber(),
+            partition_by=[F('category_id')],
+            order_by=[F(field).desc(), F('id').asc()],
+        )
+    )
+    if category_id:
+        ranked = ranked.filter(category_id=category_id)
+    return ranked.filter(position__lte=limit).order_by('category_id', 'position')
+
+
+def search_products(query, category_id=None, match_any=False):
+    """
+    Preconfigured products matching `query` (any of its terms with
+    `match_any`), ranked by full-text rank plus name similarity (annotated
+    as `rank`), optionally limited to a category.
+    """
+    products = PreConfiguredProduct.objects.select_related('category')
+    if category_id:
+        products = products.filter(category_id=category_id)
+    return ranked_search(products, query, match_any)
+
+
+def in_stock_condition():
+    """Products whose every part option has stock (NOT EXISTS an out-of-stock part)"""
+    out_of_stock_parts = PreConfiguredProductParts.objects.filter(
+        preconfigured_product=OuterRef('pk')
+    ).exclude(part_option__stock__quantity__gt=0)
+    return ~Exists(out_of_stock_parts)
+
+
+def price_condition(price_min=None, price_max=None):
+    condition = Q()
+    if price_min is not None:
+        condition &= Q(base_price__gte=price_min)
+    if price_max is not None:
+        condition &= Q(base_price__lte=price_max)
+    return condition
+
+
+def price_buckets():
+    """(label, condition) per price facet bucket"""
+    buckets = []
+    for i, low in enumerate(PRICE_BUCKET_EDGES):
+        high = PRICE_BUCKET_EDGES[i + 1] if i + 1 < len(PRICE_BUCKET_EDGES) else None
+        condition = Q(base_price__gte=low) & (Q(base_price__lt=high) if high is not None else Q())
+        buckets.append((f"{low}-{high}" if high is not None else f"{low}+", condition))
+    return buckets
+
+
+def filter_products(query=None, category_id=None, price_min=None, price_max=None, in_stock=False):
+    """
+    Products for the storefront search: ranked text matches when `query` is
+    given (annotated as `rank`), otherwise the whole catalog, narrowed by
+    category, price range and stock.
+    """
+    if query:
+        products = search_products(query)
+    else:
+        products = PreConfiguredProduct.objects.select_related('category').defer('search_vector')
+
+    if in_stock:
+        products = products.filter(in_stock_condition())
+    if category_id:
+        products = products.filter(category_id=category_id)
+    return products.filter(price_condition(price_min, price_max))
+
+
+def compute_facets(query=None, category_id=None, price_min=None, price_max=None, in_stock=False):
+    """
+    Category and price-bucket counts in one pass (GROUP BY category with
+    FILTER aggregates).
+
+    Facets are disjunctive: category counts apply every filter except the
+    category, and price bucket counts apply every filter except the price
+    range, so the storefront can show what switching either would return.
+    """
+    base = PreConfiguredProduct.objects.all()
+    if query:
+        base = base.filter(text_match(query))
+    if in_stock:
+        base = base.filter(in_stock_condition())
+
+    buckets = price_buckets()
+    aggregates = {
+        'in_price_range': Count('id', filter=price_condition(price_min, price_max)),
+        **{f'bucket_{i}': Count('id', filter=condition) for i, (_, condition) in enumerate(buckets)},
+    }
+    rows = base.values('category_id', 'category__name').annotate(**aggregates).order_by('category__name')
+
+    categories = []
+    bucket_counts = [0] * len(buckets)
+    for row in rows:
+        if row['in_price_range']:
+            categories.append({
+                'id': row['category_id'],
+                'name': row['category__name'],
+                'count': row['in_price_range'],
+            })
+        if not category_id or row['category_id'] == int(category_id):
+            for i in range(len(buckets)):
+                bucket_counts[i] += row[f'bucket_{i}']
+
+    return {
+        'categories': categories,
+        'price_ranges': [
+            {'range': label, 'count': count}
+            for (label, _), count in zip(buckets, bucket_counts)
+        ],
+    }
+
+
+def get_facets(**filters):
+    """
+    Facet counts for a search, cached per catalog version: any catalog change
+    moves the version, so cached counts are never stale.
+    """
+    version = get_catalog_version()
+    if version is None:
+        return compute_facets(**filters)
+
+    digest = hashlib.sha1(json.dumps(filters, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    cache_key = f'product_search_facets:{version}:{digest}'
+    try:
+        facets = cache.get(cache_key)
+    except Exception:
+        return compute_facets(**filters)
+
+    if facets is None:
+        facets = compute_facets(**filters)
+        try:
+            cache.set(cache_key, facets, timeout=FACETS_CACHE_TIMEOUT)
+        except Exception:
+            pass
+    return facets
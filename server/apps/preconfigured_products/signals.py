@@ -1,9 +1,11 @@
 """
-Signal handlers for automatic image cleanup in preconfigured_products app.
+Signal handlers for automatic image cleanup and catalog versioning in preconfigured_products app.
 """
-from django.db.models.signals import pre_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import PreConfiguredProduct
+from .models import PreConfiguredProduct, PreConfiguredProductParts
+from utils.catalog_version import bump_catalog_version_on_commit
+from utils.response_cache import invalidate_tags_on_commit
 from utils.image_cleanup import delete_image_file, get_old_image
 
 
@@ -28,3 +30,13 @@ def preconfigured_product_post_delete(sender, instance, **kwargs):
     """
     if instance.image:
         delete_image_file(instance.image)
+
+
+@receiver([post_save, post_delete], sender=PreConfiguredProduct)
+@receiver([post_save, post_delete], sender=PreConfiguredProductParts)
+def catalog_changed(sender, **kwargs):
+    """
+    Move the catalog to a new version and purge tagged cached responses when preconfigured products change.
+    """
+    bump_catalog_version_on_commit(sender, **kwargs)
+    invalidate_tags_on_commit(sender, **kwargs)
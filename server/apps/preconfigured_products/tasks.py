@@ -0,0 +1,20 @@
+"""
+Celery tasks for preconfigured products
+Keeps the best-seller sales counters consistent with the order history
+"""
+
+from celery import shared_task
+
+
+@shared_task(name='preconfigured_products.refresh_sales_analytics')
+def refresh_sales_analytics_task(force=False, trigger='scheduled'):
+    """
+    Recount the sales counters (scheduled by Celery beat, or queued on demand
+    after bulk order imports). Only one node runs it at a time.
+    """
+    from .services import refresh_sales_analytics
+
+    try:
+        return refresh_sales_analytics(force=force, trigger=trigger)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
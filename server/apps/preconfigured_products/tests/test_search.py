@@ -0,0 +1,85 @@
+"""
+Tests for the faceted product search endpoint
+"""
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.preconfigured_products.models import PreConfiguredProduct, PreConfiguredProductParts
+from apps.preconfigured_products.services import compute_facets
+from apps.products.models import Category, Part, PartOption, Stock
+
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class TestProductSearch(TestCase):
+    """Six bikes and two boards; one bike has an out-of-stock part."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bikes = Category.objects.create(name="Bikes")
+        cls.boards = Category.objects.create(name="Surfboards")
+        frame = Part.objects.create(name="Frame", category=cls.bikes)
+        cls.in_stock = PartOption.objects.create(part=frame, name="Steel", default_price=10)
+        cls.sold_out = PartOption.objects.create(part=frame, name="Carbon", default_price=90)
+        Stock.objects.create(part_option=cls.in_stock, quantity=5)
+        Stock.objects.create(part_option=cls.sold_out, quantity=0)
+
+        for i, price in enumerate([50, 150, 300, 700, 1500, 3000]):
+            product = PreConfiguredProduct.objects.create(
+                category=cls.bikes, name=f"Trail Bike {i}", base_price=price
+            )
+            PreConfiguredProductParts.objects.create(
+                preconfigured_product=product,
+                part_option=cls.sold_out if i == 0 else cls.in_stock
+            )
+        PreConfiguredProduct.objects.create(category=cls.boards, name="Wave Rider", base_price=700)
+        PreConfiguredProduct.objects.create(category=cls.boards, name="Trail Board", base_price=120)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_facets_are_disjunctive(self):
+        """Category counts ignore the category filter; price counts ignore the price filter."""
+        facets = compute_facets(category_id=self.bikes.id, price_max=500)
+
+        assert {c['name']: c['count'] for c in facets['categories']} == {"Bikes": 3, "Surfboards": 1}
+        assert [b['count'] for b in facets['price_ranges']] == [1, 1, 1, 1, 1, 1]
+
+    def test_in_stock_and_text_filters(self):
+        response = self.client.get('/api/preconfigured-products/search/', {'q': 'trail', 'in_stock': 'true'})
+
+        names = [r['name'] for r in response.data['results']]
+        assert "Trail Bike 0" not in names
+        assert "Trail Board" in names
+        assert "Wave Rider" not in names
+        assert sum(c['count'] for c in response.data['facets']['categories']) == len(names)
+
+    def test_cursor_pages_cover_results_once(self):
+        seen = []
+        url, params = '/api/preconfigured-products/search/', {'category_id': self.bikes.id, 'page_size': 4}
+        while url:
+            response = self.client.get(url, params)
+            seen += [r['id'] for r in response.data['results']]
+            url, params = response.data['next'], None
+
+        assert seen == sorted(
+            PreConfiguredProduct.objects.filter(category=self.bikes).values_list('id', flat=True)
+        )
+
+    def test_facets_are_cached_per_catalog_version(self):
+        params = {'q': 'trail'}
+        self.client.get('/api/preconfigured-products/search/', params)
+
+        # Cached facets: only the page query runs
+        with self.assertNumQueries(1):
+            self.client.get('/api/preconfigured-products/search/', params)
+
+        # A catalog change moves the version and the counts are recomputed
+        with self.captureOnCommitCallbacks(execute=True):
+            PreConfiguredProduct.objects.create(category=self.boards, name="Trail Skimmer", base_price=80)
+        response = self.client.get('/api/preconfigured-products/search/', params)
+        assert {c['name']: c['count'] for c in response.data['facets']['categories']}["Surfboards"] == 2
@@ -0,0 +1,154 @@
+"""
+Tests for the top-products-per-category and best-selling endpoints
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.customers.models import Customer
+from apps.orders.models import Orders, OrderProduct
+from apps.preconfigured_products.models import (
+    PreConfiguredProduct, PreConfiguredProductParts, ProductSalesCounter, SalesAnalyticsRefresh
+)
+from apps.preconfigured_products.services import (
+    rebuild_sales_counters, refresh_sales_analytics, request_sales_analytics_refresh
+)
+from apps.preconfigured_products.tasks import refresh_sales_analytics_task
+from apps.products.models import Category, Part, PartOption
+
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class TestTopProducts(TestCase):
+    """
+    Two categories of five products; product i of a category sold i + 1 times.
+    Sales counters are maintained by triggers on orderproduct.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = Customer.objects.create(name="Buyer")
+        order = Orders.objects.create(customer=customer, total_price=0)
+        for name in ("Bikes", "Surfboards"):
+            category = Category.objects.create(name=name)
+            part = Part.objects.create(name="Frame", category=category)
+            option = PartOption.objects.create(part=part, name="Steel", default_price=10)
+            for i in range(5):
+                product = PreConfiguredProduct.objects.create(
+                    category=category, name=f"{name} {i}", base_price=100
+                )
+                PreConfiguredProductParts.objects.create(preconfigured_product=product, part_option=option)
+                for _ in range(i + 1):
+                    OrderProduct.objects.create(
+                        order=order, preconfigured_product=product, base_product_name=product.name
+                    )
+
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_top_n_per_category_in_constant_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/preconfigured-products/top-products/', {'limit': 2})
+
+        assert [p['name'] for p in response.data] == ["Bikes 4", "Bikes 3", "Surfboards 4", "Surfboards 3"]
+        assert response.data[0]['times_ordered'] == 5
+        assert response.data[0]['parts'][0]['part_option_details']['part_name'] == "Frame"
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/preconfigured-products/top-products/', {'limit': 5})
+        assert len(response.data) == 10
+
+    def test_category_filter(self):
+        bikes = Category.objects.get(name="Bikes")
+        response = self.client.get('/api/preconfigured-products/top-products/', {'category_id': bikes.id})
+
+        assert [p['name'] for p in response.data] == ["Bikes 4", "Bikes 3", "Bikes 2"]
+        assert {p['category_details']['name'] for p in response.data} == {"Bikes"}
+
+    def test_best_selling(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/preconfigured-products/best-selling/')
+
+        assert response.data['name'] in ("Bikes 4", "Surfboards 4")
+        assert response.data['times_ordered'] == 5
+
+    def test_counters_follow_order_lines(self):
+        product = PreConfiguredProduct.objects.get(name="Bikes 0")
+        line = OrderProduct.objects.filter(preconfigured_product__name="Bikes 4").first()
+        line.preconfigured_product = product
+        line.save()
+        OrderProduct.objects.filter(preconfigured_product__name="Surfboards 4").delete()
+
+        counters = dict(ProductSalesCounter.objects.values_list('preconfigured_product__name', 'times_ordered'))
+        assert counters["Bikes 0"] == 2
+        assert counters["Bikes 4"] == 4
+        assert counters["Surfboards 4"] == 0
+
+        ProductSalesCounter.objects.update(times_ordered=0)
+        assert rebuild_sales_counters() == (9, 9)
+        assert ProductSalesCounter.objects.get(preconfigured_product=product).times_ordered == 2
+
+    def test_counters_count_units(self):
+        line = OrderProduct.objects.filter(preconfigured_product__name="Bikes 0").get()
+        line.quantity = 12
+        line.save()
+
+        counter = ProductSalesCounter.objects.get(preconfigured_product__name="Bikes 0")
+        assert counter.times_ordered == 12
+        assert round(counter.trending_score / ProductSalesCounter.objects.get(
+            preconfigured_product__name="Bikes 1").trending_score, 3) == 6.0
+
+        ProductSalesCounter.objects.update(times_ordered=0)
+        rebuild_sales_counters()
+        assert ProductSalesCounter.objects.get(preconfigured_product__name="Bikes 0").times_ordered == 12
+
+    def test_refresh_is_recorded_and_skipped_when_unchanged(self):
+        ProductSalesCounter.objects.filter(preconfigured_product__name="Bikes 1").update(times_ordered=7)
+
+        result = refresh_sales_analytics(force=True, trigger='manual')
+        assert result['status'] == 'success'
+        assert (result['products_counted'], result['counters_corrected']) == (10, 1)
+
+        run = SalesAnalyticsRefresh.objects.get()
+        assert (run.status, run.trigger, run.counters_corrected) == ('completed', 'manual', 1)
+        assert refresh_sales_analytics()['status'] == 'skipped'
+
+    def test_scheduled_refresh_locks_order_lines_only_to_repair(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = refresh_sales_analytics()
+        assert (result['status'], result['counters_corrected']) == ('success', 0)
+        assert not any('LOCK TABLE' in query['sql'] for query in queries)
+
+        ProductSalesCounter.objects.filter(preconfigured_product__name="Bikes 1").update(times_ordered=7)
+        SalesAnalyticsRefresh.objects.all().delete()  # No watermark to skip on
+        with CaptureQueriesContext(connection) as queries:
+            result = refresh_sales_analytics()
+        assert (result['status'], result['counters_corrected']) == ('success', 1)
+        assert any('LOCK TABLE' in query['sql'] for query in queries)
+
+    def test_on_demand_refresh_runs_after_commit(self):
+        ProductSalesCounter.objects.filter(preconfigured_product__name="Bikes 1").update(times_ordered=7)
+
+        refresh_sales_analytics_task.app.conf.task_always_eager = True
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                request_sales_analytics_refresh()
+                assert not SalesAnalyticsRefresh.objects.exists()
+        finally:
+            refresh_sales_analytics_task.app.conf.task_always_eager = False
+
+        run = SalesAnalyticsRefresh.objects.get()
+        assert (run.status, run.trigger, run.counters_corrected) == ('completed', 'on_demand', 1)
+
+    def test_trending_ranking(self):
+        response = self.client.get('/api/preconfigured-products/best-selling/', {'ranking': 'trending'})
+
+        # All orders were just placed, so each still counts about 1
+        assert response.data['trending_score'] == 5.0
+        assert self.client.get('/api/preconfigured-products/best-selling/', {'ranking': 'x'}).status_code == 400
@@ -5,7 +5,8 @@ from .views import (
     PreConfiguredProductPartsViewSet,
     BestSellingProductView,
     TopProductsPerCategoryViewSet,
-    ProductsByCategoryView
+    ProductsByCategoryView,
+    ProductSearchView
 )
 
 # Create a router and register our viewsets
@@ -19,4 +20,5 @@ urlpatterns = [
     path('best-selling/', BestSellingProductView.as_view(), name='best-selling-product'),
     path('top-products/', TopProductsPerCategoryViewSet.as_view({'get': 'list'}), name='top-products'),
     path('products-by-category/<int:category_id>/', ProductsByCategoryView.as_view(), name='products-by-category'),
+    path('search/', ProductSearchView.as_view(), name='product-search'),
 ]
@@ -2,27 +2,37 @@ from rest_framework.viewsets import ModelViewSet, ViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.db.models import F
-from itertools import groupby
-from operator import attrgetter
+from decimal import Decimal, InvalidOperation
 from .models import (
     PreConfiguredProduct,
     PreConfiguredProductParts,
-    BestSellingPreconfiguredProduct,
-    TopPreconfiguredProductsPerCategory
+    ProductSalesCounter
 )
 from .serializers import (
     PreConfiguredProductSerializer,
     PreConfiguredProductPartsSerializer,
     BestSellingPreconfiguredProductSerializer,
-    TopPreconfiguredProductsPerCategorySerializer
+    TopPreconfiguredProductsPerCategorySerializer,
+    PreConfiguredProductSearchSerializer
 )
 from .permissions import AllowGetAnonymously
-from apps.products.models import Category
+from .services import (
+    SALES_RANKINGS,
+    current_trending_score,
+    filter_products,
+    get_facets,
+    sold_products,
+    top_products_per_category
+)
+from apps.products.models import Category, PartOption
+from utils.http_caching import CatalogHTTPCacheMixin
+from utils.response_cache import cache_response
 
-class PreConfiguredProductViewSet(ModelViewSet):
+class PreConfiguredProductViewSet(CatalogHTTPCacheMixin, ModelViewSet):
     """
     API endpoint for viewing and editing pre-configured products
 
@@ -45,7 +55,7 @@ class PreConfiguredProductViewSet(ModelViewSet):
         serializer = PreConfiguredProductPartsSerializer(parts, many=True)
         return Response(serializer.data)
 
-class PreConfiguredProductPartsViewSet(ModelViewSet):
+class PreConfiguredProductPartsViewSet(CatalogHTTPCacheMixin, ModelViewSet):
     """
     API endpoint for viewing and editing pre-configured product parts
     
@@ -65,35 +75,43 @@ class PreConfiguredProductPartsViewSet(ModelViewSet):
             queryset = queryset.filter(preconfigured_product_id=product_id)
         return queryset
 
+def sales_data(product, ranking):
+    """Sales figures added to a serialized best-seller"""
+    data = {'times_ordered': product.sales_counter.times_ordered}
+    if ranking == 'trending':
+        data['trending_score'] = round(current_trending_score(product.sales_counter.trending_score), 3)
+    return data
+
+
 class BestSellingProductView(APIView):
     """
     API endpoint that returns the best-selling preconfigured product.
     This API endpoint is open to GET requests without authentication.
+
+    Use the 'ranking' query parameter to rank by lifetime orders ('orders', default)
+    or by recent orders with a 30-day half-life ('trending').
     """
     permission_classes = [AllowAny]  # Allow all requests, no authentication needed
-    
+
+    # Sales counters change in database triggers; the orders app purges the
+    # ProductSalesCounter tag when order lines are saved
+    @cache_response(
+        'best_selling_product',
+        tags=[ProductSalesCounter, PreConfiguredProduct, PreConfiguredProductParts, PartOption],
+        timeout=5 * 60,
+    )
     def get(self, request, format=None):
+        ranking = request.query_params.get('ranking', 'orders')
+        if ranking not in SALES_RANKINGS:
+            return Response({"error": f"ranking must be one of: {', '.join(SALES_RANKINGS)}"}, status=400)
         try:
-            best_selling = BestSellingPreconfiguredProduct.objects.first()
-            if best_selling:
-                # Get the full preconfigured product details
-                product = PreConfiguredProduct.objects.get(id=best_selling.preconfigured_product_id)
+            product = sold_products(ranking).first()
+            if product:
                 serializer = PreConfiguredProductSerializer(product, context={'request': request})
                 
                 # Include the analytics data
                 data = serializer.data
-                data['times_ordered'] = best_selling.times_ordered
-                
-                # Include part options with descriptions
-                parts = PreConfiguredProductParts.objects.filter(preconfigured_product=product)
-                parts_data = []
-                for part in parts:
-                    part_data = PreConfiguredProductPartsSerializer(part).data
-                    part_option = part.part_option
-                    if part_option:
-                        part_data['part_option_details']['description'] = part_option.description  # Include part option description
-                    parts_data.append(part_data)
-                data['parts'] = parts_data
+                data.update(sales_data(product, ranking))
                 
                 return Response(data)
             return Response({"message": "No best-selling product found"}, status=404)
@@ -108,86 +126,46 @@ class TopProductsPerCategoryViewSet(ViewSet):
     Returns the top preconfigured products for each category with full product details.
     Use the 'limit' query parameter to change how many products per category are returned (default: 3).
     Use the 'category_id' query parameter to filter for a specific category.
+    Use the 'ranking' query parameter to rank by 'orders' (default) or 'trending'.
     """
     permission_classes = [AllowAny]
-    
+
+    @cache_response(
+        'top_products_per_category',
+        tags=[ProductSalesCounter, PreConfiguredProduct, PreConfiguredProductParts, PartOption, Category],
+        timeout=5 * 60,
+    )
     def list(self, request):
         """
         Return top products with full preconfigured product details
         """
         # Get limit from query params, default to 3
         limit = int(request.query_params.get('limit', 3))
-        
-        # Get the base queryset
-        queryset = TopPreconfiguredProductsPerCategory.objects.all().order_by('category_id', '-times_ordered')
-        
-        # Filter by category if needed
         category_id = request.query_params.get('category_id')
-        if category_id:
-            queryset = queryset.filter(category_id=category_id)
-            
-        # Check if there are any results
-        if not queryset.exists():
-            return Response([])
-        
-        # Group by category and limit results
-        result = []
-        preconfigured_ids = []
-        category_data = {}
-        category_ids = set()
-        
-        for category_id, group in groupby(queryset, key=attrgetter('category_id')):
-            # Convert group to list and limit the number of products per category
-            products = list(group)[:limit]
-            category_ids.add(category_id)
-            
-            # Store analytics data for each product
-            for product in products:
-                preconfigured_ids.append(product.preconfigured_product_id)
-                category_data[product.preconfigured_product_id] = {
-                    'times_ordered': product.times_ordered,
-                    'category_id': product.category_id
-                }
-        
-        # Get the full product details
-        products = PreConfiguredProduct.objects.filter(id__in=preconfigured_ids)
-        
-        # Get category details
-        categories = {category.id: category for category in Category.objects.filter(id__in=category_ids)}
-        
-        # Serialize and enrich with analytics data and category details
+        ranking = request.query_params.get('ranking', 'orders')
+        if ranking not in SALES_RANKINGS:
+            return Response({"error": f"ranking must be one of: {', '.join(SALES_RANKINGS)}"}, status=400)
+
+        # Top products per category ranked in SQL, with their details in one prefetch plan
         results = []
-        for product in products:
-            if product.id in category_data:
-                product_data = PreConfiguredProductSerializer(product, context={'request': request}).data
-                product_data['times_ordered'] = category_data[product.id]['times_ordered']
-                
-                # Add category details
-                cat_id = category_data[product.id]['category_id']
-                product_data['category_id'] = cat_id
-                product_data['category_details'] = {
-                    'id': cat_id,
-                    'name': categories[cat_id].name,
-                    'description': categories[cat_id].description if hasattr(categories[cat_id], 'description') else None,
-                    'slug': categories[cat_id].slug if hasattr(categories[cat_id], 'slug') else None
-                }
-                
-                # Include part options with descriptions
-                parts = PreConfiguredProductParts.objects.filter(preconfigured_product=product)
-                parts_data = []
-                for part in parts:
-                    part_data = PreConfiguredProductPartsSerializer(part).data
-                    part_option = part.part_option
-                    if part_option:
-                        part_data['part_option_details']['description'] = part_option.description  # Include part option description
-                    parts_data.append(part_data)
-                product_data['parts'] = parts_data
-                
-                results.append(product_data)
+        for product in top_products_per_category(limit, category_id, ranking):
+            product_data = PreConfiguredProductSerializer(product, context={'request': request}).data
+            product_data.update(sales_data(product, ranking))
+
+            # Add category details
+            category = product.category
+            product_data['category_id'] = category.id
+            product_data['category_details'] = {
+                'id': category.id,
+                'name': category.name,
+                'description': category.description,
+                'slug': getattr(category, 'slug', None)
+            }
+            results.append(product_data)
         
         return Response(results)
 
-class ProductsByCategoryView(APIView):
+class ProductsByCategoryView(CatalogHTTPCacheMixin, APIView):
     """
     API endpoint to fetch preconfigured products by category ID.
     """
@@ -200,3 +178,61 @@ class ProductsByCategoryView(APIView):
             return Response(serializer.data)
         except Exception as e:
             return Response({"error": str(e)}, status=500)
+
+class ProductSearchPagination(CursorPagination):
+    """
+    Keyset pagination for product search: by rank for text queries, by id
+    otherwise, so deep pages cost the same as the first one.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        return ('-rank', 'id') if 'rank' in queryset.query.annotations else ('id',)
+
+
+class ProductSearchView(CatalogHTTPCacheMixin, APIView):
+    """
+    API endpoint for faceted product search.
+
+    Text queries match product names and descriptions (stemmed, websearch
+    syntax such as "carbon -steel") and tolerate typos in names via trigram
+    similarity; results are ranked. Without `q` the catalog is browsed in id order.
+
+    Query parameters:
+    - q: search text
+    - category_id: limit results to a category
+    - price_min, price_max: base price range
+    - in_stock: "true" to only return products whose parts are all in stock
+    - page_size: results per page (default 20, max 100); follow `next` for more
+
+    The response carries cursor links, the results, and facet counts per
+    category and price range (cached per catalog version).
+    """
+    permission_classes = [AllowAny]
+    pagination_class = ProductSearchPagination
+
+    def get(self, request, format=None):
+        params = request.query_params
+        try:
+            filters = {
+                'query': params.get('q', '').strip() or None,
+                'category_id': int(params['category_id']) if params.get('category_id') else None,
+                'price_min': Decimal(params['price_min']) if params.get('price_min') else None,
+                'price_max': Decimal(params['price_max']) if params.get('price_max') else None,
+                'in_stock': params.get('in_stock', '').lower() in ('1', 'true', 'yes'),
+            }
+        except (ValueError, InvalidOperation):
+            return Response(
+                {"error": "'category_id' must be an integer and 'price_min'/'price_max' numbers"},
+                status=400
+            )
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(filter_products(**filters), request, view=self)
+        serializer = PreConfiguredProductSearchSerializer(page, many=True, context={'request': request})
+
+        response = paginator.get_paginated_response(serializer.data)
+        response.data['facets'] = get_facets(**filters)
+        return response
@@ -1,18 +1,40 @@
+"""
+Django management command to recount the best-seller sales counters from the
+full order history. The counters are maintained by triggers on orderproduct
+and Celery beat recounts them periodically; run this after loading orders
+with triggers disabled.
+
+Usage:
+    python manage.py refresh_views
+    python manage.py refresh_views --if-changed
+"""
+
 from django.core.management.base import BaseCommand
-from django.db import connection
+from apps.preconfigured_products.services import refresh_sales_analytics
 
 
 class Command(BaseCommand):
-    help = 'Refresh materialized views after data changes'
+    help = 'Recount the best-seller sales counters from the full order history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--if-changed',
+            action='store_true',
+            help='Skip when no order lines changed since the last refresh'
+        )
 
     def handle(self, *args, **options):
-        self.stdout.write('Refreshing materialized views...')
-
-        with connection.cursor() as cursor:
-            try:
-                cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY bestsellingpreconfiguredproduct;")
-                cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY toppreconfiguredproductspercategory;")
-                self.stdout.write(self.style.SUCCESS('✅ Successfully refreshed materialized views!'))
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f'❌ Error refreshing views: {str(e)}'))
-                raise
+        self.stdout.write('Rebuilding sales counters...')
+
+        result = refresh_sales_analytics(force=not options['if_changed'], trigger='manual')
+        if result['status'] == 'error':
+            self.stdout.write(self.style.ERROR(f"❌ Error rebuilding sales counters: {result['message']}"))
+            raise SystemExit(1)
+        if result['status'] == 'skipped':
+            self.stdout.write(f"⏭️ Skipped: {result['reason']}")
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Counted {result['products_counted']} products in {result['duration_ms']} ms "
+            f"({result['counters_corrected']} counters corrected)"
+        ))
@@ -0,0 +1,44 @@
+"""
+Django management command to report response cache hit ratios.
+Counts are kept per cached view in the shared cache since the last reset.
+
+Usage:
+    python manage.py response_cache_stats
+    python manage.py response_cache_stats --json
+    python manage.py response_cache_stats --reset
+"""
+
+import json
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from utils.response_cache import response_cache_stats, reset_response_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit ratios of the server-side response cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Print the stats as JSON')
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing')
+
+    def handle(self, *args, **options):
+        # Cached views register themselves when their modules are imported
+        import_module(settings.ROOT_URLCONF)
+
+        stats = response_cache_stats()
+        if options['json']:
+            self.stdout.write(json.dumps(stats, indent=2))
+        else:
+            self.stdout.write(f"{'view':<28}{'hits':>8}{'coalesced':>11}{'misses':>8}{'hit ratio':>11}")
+            for name, row in stats.items():
+                ratio = f"{row['hit_ratio']:.1%}" if row['hit_ratio'] is not None else '-'
+                self.stdout.write(
+                    f"{name:<28}{row['hits']:>8}{row['coalesced']:>11}{row['misses']:>8}{ratio:>11}"
+                )
+
+        if options['reset']:
+            reset_response_cache_stats()
+            self.stdout.write(self.style.SUCCESS('✓ Response cache counters reset'))
@@ -197,6 +197,13 @@ class Command(BaseCommand):
                 with connection.cursor() as cursor:
                     cursor.execute("SET session_replication_role = 'origin';")
 
+                # Order lines loaded above bypassed the sales counter triggers:
+                # recount once the load commits
+                if any(obj['model'].startswith('orders.') for obj in other_data):
+                    from apps.preconfigured_products.services import request_sales_analytics_refresh
+                    request_sales_analytics_refresh()
+                    self.stdout.write('⏭️ Queued a sales analytics refresh for the loaded orders')
+
                 # Reset sequences for all tables to prevent duplicate key errors
                 with connection.cursor() as cursor:
                     # Get list of all sequences in the database
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_category_max_boda_quantity_and_more'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='partoption',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION partoption_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector :=
+                setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER partoption_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF name, description ON partoption
+            FOR EACH ROW EXECUTE FUNCTION partoption_search_vector_update();
+
+            -- Backfill existing rows
+            UPDATE partoption SET search_vector =
+                setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(description, '')), 'B');
+            """,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS partoption_search_vector_trigger ON partoption;
+            DROP FUNCTION IF EXISTS partoption_search_vector_update();
+            """
+        ),
+        migrations.AddIndex(
+            model_name='partoption',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='partoption_search'),
+        ),
+        migrations.AddIndex(
+            model_name='partoption',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='partoption_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
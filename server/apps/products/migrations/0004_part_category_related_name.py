@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_search_vector'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='part',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='parts', to='products.category'),
+        ),
+    ]
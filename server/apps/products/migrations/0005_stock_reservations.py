@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_collapse_order_product_units'),
+        ('products', '0004_part_category_related_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('hold_token', models.UUIDField(db_index=True)),
+                ('quantity', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('held', 'Held'), ('converted', 'Converted')], default='held', max_length=20)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'stock_reservation',
+            },
+        ),
+        migrations.AddField(
+            model_name='stock',
+            name='reserved',
+            field=models.IntegerField(default=0, help_text='Units held by checkouts in progress'),
+        ),
+        migrations.AddConstraint(
+            model_name='stock',
+            constraint=models.CheckConstraint(condition=models.Q(('reserved__gte', 0)), name='stock_reserved_not_negative'),
+        ),
+        migrations.AddField(
+            model_name='stockreservation',
+            name='order',
+            field=models.ForeignKey(blank=True, db_column='order_id', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_reservations', to='orders.orders'),
+        ),
+        migrations.AddField(
+            model_name='stockreservation',
+            name='part_option',
+            field=models.ForeignKey(db_column='part_option_id', on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='products.partoption'),
+        ),
+        migrations.AddField(
+            model_name='stockreservation',
+            name='stock',
+            field=models.ForeignKey(db_column='stock_id', on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='products.stock'),
+        ),
+        migrations.AddIndex(
+            model_name='stockreservation',
+            index=models.Index(condition=models.Q(('status', 'held')), fields=['expires_at'], name='stock_reservation_held_expiry'),
+        ),
+    ]
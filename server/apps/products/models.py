@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
 
 class Category(models.Model):
     name = models.CharField(max_length=255)
@@ -60,7 +63,7 @@ class Category(models.Model):
 
 class Part(models.Model):
     name = models.CharField(max_length=255)
-    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='parts')
     step = models.IntegerField(default=0)
 
     class Meta:
@@ -81,20 +84,76 @@ class PartOption(models.Model):
         default=0.00,
         help_text="Minimum upfront payment required (0.00 to 1.00). Example: 0.70 means 70% required upfront"
     )
+    # Weighted name (A) + description (B) tsvector, maintained by a database
+    # trigger (migration 0003_search_vector)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         db_table = 'partoption'
+        indexes = [
+            GinIndex(fields=['search_vector'], name='partoption_search'),
+            GinIndex(fields=['name'], name='partoption_name_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return f"{self.part.name} - {self.name}"
 
 class Stock(models.Model):
+    """
+    Units of a part option on hand. `reserved` counts units held by checkouts
+    in progress (see StockReservation); only quantity - reserved can be held.
+    An option may have several stock rows (e.g. per batch or location).
+    """
     id = models.AutoField(primary_key=True)
     part_option = models.ForeignKey(PartOption, related_name='stock', on_delete=models.CASCADE, db_column='part_option_id')
     quantity = models.IntegerField(default=0)
+    reserved = models.IntegerField(default=0, help_text="Units held by checkouts in progress")
 
     def __str__(self):
         return f"{self.part_option.name}: {self.quantity}"
 
+    @property
+    def available(self):
+        return self.quantity - self.reserved
+
     class Meta:
         db_table = 'stock'
+        constraints = [
+            models.CheckConstraint(condition=Q(reserved__gte=0), name='stock_reserved_not_negative'),
+        ]
+
+
+class StockReservation(models.Model):
+    """
+    A time-limited hold on units of one stock row, taken when checkout starts
+    (see apps.products.reservations). Holds of one checkout share a hold_token.
+    At order creation they are converted (stock quantity decremented, row
+    kept for the order); expired holds are released (deleted) in batches.
+    """
+    STATUS_CHOICES = [
+        ('held', 'Held'),
+        ('converted', 'Converted'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    hold_token = models.UUIDField(db_index=True)
+    stock = models.ForeignKey(Stock, related_name='reservations', on_delete=models.CASCADE, db_column='stock_id')
+    part_option = models.ForeignKey(PartOption, related_name='reservations', on_delete=models.CASCADE, db_column='part_option_id')
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='held')
+    order = models.ForeignKey(
+        'orders.Orders', related_name='stock_reservations', on_delete=models.SET_NULL,
+        null=True, blank=True, db_column='order_id'
+    )
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.quantity} x {self.part_option_id} ({self.status})"
+
+    class Meta:
+        db_table = 'stock_reservation'
+        indexes = [
+            # The release task scans held reservations by expiry
+            models.Index(fields=['expires_at'], condition=Q(status='held'), name='stock_reservation_held_expiry'),
+        ]
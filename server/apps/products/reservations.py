@@ -0,0 +1,350 @@
+"""
+Stock reservations
+Checkouts hold stock when they start and convert the holds when the order is
+created, so two customers can never buy the last unit twice.
+
+- hold_stock: time-limited holds (Stock.reserved += n) taken with one
+  conditional UPDATE per option in a short transaction of their own. An option
+  with several stock rows spreads concurrent holds over them: a row locked by
+  another checkout is skipped (FOR UPDATE SKIP LOCKED) instead of waited on.
+- convert_stock_holds: inside the order transaction, one conditional UPDATE
+  (quantity = quantity - n WHERE quantity >= n) consumes the holds; demand not
+  covered by a hold (expired, or no hold taken) is held on the spot first.
+- release_expired_holds: periodic task releasing expired holds in batches.
+
+Whenever one of these waits for stock rows, it locks them in one statement in
+stock id order. A transaction Postgres still aborts for a deadlock or
+serialization failure is run again (retry_on_lock_conflict), and StockBusy is
+raised if it keeps failing.
+
+Options without any stock rows are not tracked (made to order) and are never held.
+"""
+import uuid
+from datetime import timedelta
+from functools import wraps
+from django.conf import settings as django_settings
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+from .models import PartOption, Stock, StockReservation
+from .signals import catalog_changed
+
+DEFAULT_HOLD_MINUTES = 15
+DEFAULT_RELEASE_BATCH = 500
+
+# deadlock_detected, serialization_failure
+LOCK_CONFLICT_CODES = ('40P01', '40001')
+LOCK_CONFLICT_ATTEMPTS = 3
+
+# Hold n units on the stock row of an option with the most available, skipping
+# rows other checkouts are updating right now
+HOLD_ON_ONE_ROW_SQL = """
+UPDATE stock SET reserved = reserved + %(units)s
+WHERE id = (
+    SELECT id FROM stock
+    WHERE part_option_id = %(option)s AND quantity - reserved >= %(units)s
+    ORDER BY quantity - reserved DESC, id
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+)
+AND quantity - reserved >= %(units)s
+RETURNING id
+"""
+
+# Release the holds selected by {holds} (a SELECT of reservation ids that locks
+# them). Stock rows are locked in id order, like conversions, so the two never
+# deadlock. Returns the number of holds released.
+RELEASE_HOLDS_SQL = """
+WITH released AS (
+    DELETE FROM stock_reservation r USING ({holds}) batch
+    WHERE r.id = batch.id
+    RETURNING r.stock_id, r.quantity
+),
+totals AS (
+    SELECT stock_id, SUM(quantity) AS quantity FROM released GROUP BY stock_id
+),
+locked AS (
+    SELECT id FROM stock WHERE id IN (SELECT stock_id FROM totals) ORDER BY id FOR UPDATE
+),
+updated AS (
+    UPDATE stock s SET reserved = GREATEST(s.reserved - totals.quantity, 0)
+    FROM totals JOIN locked ON locked.id = totals.stock_id
+    WHERE s.id = totals.stock_id
+    RETURNING 1
+)
+SELECT COUNT(*) FROM released
+"""
+
+# Oldest expired holds first; holds being converted right now are skipped
+EXPIRED_HOLDS = """
+    SELECT id FROM stock_reservation
+    WHERE status = 'held' AND expires_at < now()
+    ORDER BY expires_at
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+"""
+
+CHECKOUT_HOLDS = "SELECT id FROM stock_reservation WHERE hold_token = %s AND status = 'held' FOR UPDATE"
+
+
+class InsufficientStock(ValueError):
+    """Raised when stock cannot cover a hold or an order; `shortages` lists what is missing"""
+
+    def __init__(self, shortages):
+        self.shortages = shortages
+        names = dict(PartOption.objects.filter(
+            id__in=[s['part_option_id'] for s in shortages]
+        ).values_list('id', 'name'))
+        for shortage in shortages:
+            shortage['name'] = names.get(shortage['part_option_id'], '')
+        super().__init__('Not enough stock for: ' + ', '.join(
+            f"{s['name'] or s['part_option_id']} ({s['available']} of {s['requested']} available)"
+            for s in shortages
+        ))
+
+
+class StockBusy(ValueError):
+    """Raised when stock rows stayed contended after LOCK_CONFLICT_ATTEMPTS tries"""
+
+    def __init__(self):
+        super().__init__('Stock is being updated by other checkouts, please try again')
+
+
+def is_lock_conflict(error):
+    return getattr(error.__cause__, 'pgcode', None) in LOCK_CONFLICT_CODES
+
+
+def retry_on_lock_conflict(func):
+    """
+    Run `func` again when Postgres aborts its transaction for a deadlock or a
+    serialization failure; StockBusy after LOCK_CONFLICT_ATTEMPTS tries.
+    `func` must open its own transaction: inside a caller's transaction it runs
+    once and the conflict propagates to the caller's retry.
+    """
+    @wraps(func)
+    def wrapped(*args, **kwargs):
+        if connection.in_atomic_block:
+            return func(*args, **kwargs)
+        for attempt in range(1, LOCK_CONFLICT_ATTEMPTS + 1):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as e:
+                if not is_lock_conflict(e):
+                    raise
+                if attempt == LOCK_CONFLICT_ATTEMPTS:
+                    raise StockBusy() from e
+                print(f"⚠️ Stock lock conflict in {func.__name__}, retrying ({attempt}/{LOCK_CONFLICT_ATTEMPTS})")
+
+    return wrapped
+
+
+def hold_minutes():
+    return getattr(django_settings, 'STOCK_HOLD_MINUTES', DEFAULT_HOLD_MINUTES)
+
+
+def _values_sql(rows):
+    """VALUES list and flat params for a list of tuples"""
+    row_sql = '(' + ', '.join(['%s'] * len(rows[0])) + ')'
+    return ', '.join([row_sql] * len(rows)), [value for row in rows for value in row]
+
+
+def _split_holds(cursor, demand):
+    """
+    Hold `demand` ({part_option_id: units}) split across each option's stock
+    rows, locking all of them in one statement in id order (the order every
+    waiting lock is taken in). Returns ({option_id: [(stock_id, units)]}, shortages);
+    untracked options get no allocations.
+    """
+    cursor.execute(
+        "SELECT id, part_option_id, quantity - reserved FROM stock"
+        " WHERE part_option_id = ANY(%s::bigint[]) ORDER BY id FOR UPDATE",
+        [list(demand)]
+    )
+    rows_by_option = {}
+    for stock_id, option_id, free in cursor.fetchall():
+        rows_by_option.setdefault(option_id, []).append((stock_id, free))
+
+    allocations, shortages = {}, []
+    for option_id, units in demand.items():
+        rows = rows_by_option.get(option_id, [])
+        available = sum(max(free, 0) for _, free in rows)
+        if rows and available < units:
+            shortages.append({'part_option_id': option_id, 'requested': units, 'available': available})
+            continue
+        allocations[option_id], remaining = [], units
+        for stock_id, free in rows:
+            if remaining and free > 0:
+                take = min(free, remaining)
+                allocations[option_id].append((stock_id, take))
+                remaining -= take
+
+    updates = [allocation for option_allocations in allocations.values() for allocation in option_allocations]
+    if updates and not shortages:
+        values, params = _values_sql(updates)
+        cursor.execute(
+            f"UPDATE stock s SET reserved = s.reserved + v.units FROM (VALUES {values}) AS v(id, units) WHERE s.id = v.id",
+            params
+        )
+    return allocations, shortages
+
+
+@retry_on_lock_conflict
+def hold_stock(demand, hold_token=None):
+    """
+    Hold stock for `demand` ({part_option_id: units}) for STOCK_HOLD_MINUTES,
+    all or nothing. Returns (hold_token, expires_at, reservations).
+
+    Raises InsufficientStock listing every option that cannot be covered.
+    """
+    hold_token = hold_token or uuid.uuid4()
+    expires_at = timezone.now() + timedelta(minutes=hold_minutes())
+
+    allocations, pending = {}, {}
+    with transaction.atomic(), connection.cursor() as cursor:
+        # One unlocked row per option if possible: never waits on another checkout
+        for option_id, units in sorted(demand.items()):
+            if units <= 0:
+                continue
+            cursor.execute(HOLD_ON_ONE_ROW_SQL, {'option': option_id, 'units': units})
+            row = cursor.fetchone()
+            if row:
+                allocations[option_id] = [(row[0], units)]
+            else:
+                pending[option_id] = units
+
+        # The rest is split across rows, waiting for them in id order
+        shortages = []
+        if pending:
+            split, shortages = _split_holds(cursor, pending)
+            allocations.update(split)
+        if shortages:
+            raise InsufficientStock(shortages)
+
+        reservations = [
+            StockReservation(
+                hold_token=hold_token,
+                stock_id=stock_id,
+                part_option_id=option_id,
+                quantity=allocated,
+                expires_at=expires_at
+            )
+            for option_id, option_allocations in allocations.items()
+            for stock_id, allocated in option_allocations
+        ]
+        StockReservation.objects.bulk_create(reservations)
+
+    return hold_token, expires_at, reservations
+
+
+@retry_on_lock_conflict
+def _release_holds(holds_sql, params):
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(RELEASE_HOLDS_SQL.format(holds=holds_sql), params)
+        return cursor.fetchone()[0]
+
+
+def release_stock_hold(hold_token):
+    """Release every unconverted hold of a checkout (e.g. before holding a changed cart)"""
+    return _release_holds(CHECKOUT_HOLDS, [str(hold_token)])
+
+
+def convert_stock_holds(order, demand, hold_token=None):
+    """
+    Take `demand` ({part_option_id: units}) out of stock for `order`, inside
+    the caller's order transaction: the checkout's holds are consumed first,
+    the rest is held now, and a single conditional UPDATE decrements quantity
+    and reserved together. Unused holds of the checkout are released.
+
+    Call it last in the order transaction: the stock rows stay locked until
+    the order commits. Raises InsufficientStock (rolling the order back); run
+    the order transaction with retry_on_lock_conflict.
+    """
+    held = list(
+        StockReservation.objects.select_for_update().filter(hold_token=hold_token, status='held').order_by('id')
+    ) if hold_token else []
+
+    # Consume held units option by option
+    remaining = {option_id: units for option_id, units in demand.items() if units > 0}
+    converted, released = [], []
+    for reservation in held:
+        take = min(reservation.quantity, remaining.get(reservation.part_option_id, 0))
+        if take:
+            remaining[reservation.part_option_id] -= take
+            converted.append((reservation, take))
+        else:
+            released.append(reservation)
+
+    shortfall = {option_id: units for option_id, units in remaining.items() if units}
+    if not held and not shortfall:
+        return
+
+    # Lock every stock row the order touches, in id order and in one statement:
+    # the rows behind its holds and all rows of the options still to hold. Orders
+    # then queue on each other instead of deadlocking, and the hold below waits
+    # on nothing (a transaction never blocks on its own locks)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT id FROM stock WHERE id = ANY(%s::bigint[]) OR part_option_id = ANY(%s::bigint[])"
+            " ORDER BY id FOR UPDATE",
+            [sorted({reservation.stock_id for reservation in held}), sorted(shortfall)]
+        )
+
+    # Demand the holds do not cover is held now, in this transaction
+    if shortfall:
+        _, _, fresh = hold_stock(shortfall, hold_token=hold_token or uuid.uuid4())
+        converted.extend((reservation, reservation.quantity) for reservation in fresh)
+
+    # Per stock row: units leaving stock, and units no longer reserved
+    changes = {}
+    for reservation, take in converted:
+        consumed, unreserved = changes.get(reservation.stock_id, (0, 0))
+        changes[reservation.stock_id] = (consumed + take, unreserved + reservation.quantity)
+    for reservation in released:
+        consumed, unreserved = changes.get(reservation.stock_id, (0, 0))
+        changes[reservation.stock_id] = (consumed, unreserved + reservation.quantity)
+    if not changes:
+        return
+
+    for reservation, take in converted:
+        reservation.status, reservation.order, reservation.quantity = 'converted', order, take
+    StockReservation.objects.bulk_update([r for r, _ in converted], ['status', 'order', 'quantity'])
+    if released:
+        StockReservation.objects.filter(id__in=[r.id for r in released]).delete()
+
+    rows = sorted((stock_id, consumed, unreserved) for stock_id, (consumed, unreserved) in changes.items())
+    values, params = _values_sql(rows)
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE stock s
+            SET quantity = s.quantity - v.consumed, reserved = s.reserved - v.unreserved
+            FROM (VALUES {values}) AS v(id, consumed, unreserved)
+            WHERE s.id = v.id AND s.quantity >= v.consumed AND s.reserved >= v.unreserved
+            RETURNING s.id, s.quantity
+        """, params)
+        updated = dict(cursor.fetchall())
+
+    if len(updated) < len(rows):
+        # Stock was edited below its holds since they were taken
+        short = Stock.objects.filter(id__in=[r[0] for r in rows if r[0] not in updated])
+        raise InsufficientStock([
+            {'part_option_id': stock.part_option_id, 'requested': demand.get(stock.part_option_id, 0),
+             'available': max(stock.quantity, 0)}
+            for stock in short
+        ])
+
+    # Sold out rows change in_stock flags: move the catalog version
+    if any(quantity <= 0 for quantity in updated.values()):
+        catalog_changed(Stock)
+
+
+def release_expired_holds(batch_size=None):
+    """
+    Release expired holds, one batch per transaction so no lock is held for
+    long, until none are left. Returns the number of holds released.
+    """
+    batch_size = batch_size or getattr(django_settings, 'STOCK_HOLD_RELEASE_BATCH', DEFAULT_RELEASE_BATCH)
+    total = 0
+    while True:
+        released = _release_holds(EXPIRED_HOLDS, [batch_size])
+        total += released
+        if released < batch_size:
+            return total
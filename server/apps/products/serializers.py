@@ -8,7 +8,7 @@ class PartOptionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = PartOption
-        fields = '__all__'
+        exclude = ['search_vector']
 
     def get_image_url(self, obj):
         """Return full URL for image if it exists."""
@@ -48,6 +48,9 @@ class CategorySerializer(serializers.ModelSerializer):
 
 
 class StockSerializer(serializers.ModelSerializer):
+    available = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = Stock
         fields = '__all__'
+        read_only_fields = ['reserved']
@@ -0,0 +1,57 @@
+import operator
+import re
+from functools import reduce
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+from .models import PartOption
+
+
+# Text search configuration used by the search_vector triggers
+SEARCH_CONFIG = 'english'
+
+
+def _search_query(query, match_any=False):
+    """
+    Full-text query for `query`: websearch syntax (every term must match),
+    or with `match_any` an OR of its terms, for conversational text where
+    most words are not in the catalog
+    """
+    terms = re.findall(r'\w+', query) if match_any else []
+    if not terms:
+        return SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+    return reduce(operator.or_, (SearchQuery(term, config=SEARCH_CONFIG) for term in terms))
+
+
+def text_match(query, match_any=False):
+    """
+    Condition matching rows of a model with `search_vector` and `name`
+    columns against `query`: full text (websearch syntax, stemmed; any term
+    with `match_any`) or trigram word similarity of the name, so typos like
+    "mountian" still match. Both predicates are served by GIN indexes.
+    """
+    return Q(search_vector=_search_query(query, match_any)) | Q(name__trigram_word_similar=query)
+
+
+def ranked_search(queryset, query, match_any=False):
+    """
+    Filter a queryset to rows matching `query`, best first. The rank
+    (annotated as `rank`) is the full-text rank plus the name similarity,
+    so with `match_any` rows matching more of the terms come first.
+    """
+    query = (query or '').strip()
+    if not query:
+        return queryset.none()
+
+    return queryset.defer('search_vector').filter(text_match(query, match_any)).annotate(
+        rank=Coalesce(SearchRank(F('search_vector'), _search_query(query, match_any)), Value(0.0))
+        + TrigramWordSimilarity(query, 'name')
+    ).order_by('-rank', 'id')
+
+
+def search_part_options(query, category_id=None, match_any=False):
+    """Part options matching `query` (any of its terms with `match_any`), ranked, optionally limited to a category"""
+    options = PartOption.objects.select_related('part', 'part__category')
+    if category_id:
+        options = options.filter(part__category_id=category_id)
+    return ranked_search(options, query, match_any)
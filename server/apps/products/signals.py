@@ -1,9 +1,11 @@
 """
-Signal handlers for automatic image cleanup in products app.
+Signal handlers for automatic image cleanup and catalog versioning in products app.
 """
-from django.db.models.signals import pre_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import Category, PartOption
+from .models import Category, Part, PartOption, Stock
+from utils.catalog_version import bump_catalog_version_on_commit
+from utils.response_cache import invalidate_tags_on_commit
 from utils.image_cleanup import delete_image_file, get_old_image
 
 
@@ -51,3 +53,15 @@ def part_option_post_delete(sender, instance, **kwargs):
     """
     if instance.image:
         delete_image_file(instance.image)
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Part)
+@receiver([post_save, post_delete], sender=PartOption)
+@receiver([post_save, post_delete], sender=Stock)
+def catalog_changed(sender, **kwargs):
+    """
+    Move the catalog to a new version and purge tagged cached responses when catalog data changes.
+    """
+    bump_catalog_version_on_commit(sender, **kwargs)
+    invalidate_tags_on_commit(sender, **kwargs)
@@ -0,0 +1,20 @@
+"""
+Celery tasks for products
+Returns stock held by abandoned checkouts
+"""
+
+from celery import shared_task
+
+
+@shared_task(name='products.release_expired_stock_holds')
+def release_expired_stock_holds_task():
+    """Release stock holds whose checkout expired (scheduled by Celery beat)"""
+    from .reservations import release_expired_holds
+
+    try:
+        released = release_expired_holds()
+        if released:
+            print(f"✓ Released {released} expired stock holds")
+        return {"status": "ok", "released": released}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
@@ -0,0 +1,44 @@
+"""
+Query budget for the nested catalog endpoints
+"""
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.products.models import Category, Part, PartOption
+
+
+class TestCatalogQueryBudget(TestCase):
+    """Nested category/part/option serialization must not issue per-row queries."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def add_catalog(self, categories, parts, options):
+        for c in range(categories):
+            category = Category.objects.create(name=f"Category {Category.objects.count()}")
+            for p in range(parts):
+                part = Part.objects.create(name=f"Part {p}", category=category, step=parts - p)
+                for o in range(options):
+                    PartOption.objects.create(part=part, name=f"Option {o}", default_price=10 + o)
+
+    def test_category_tree_is_three_queries_at_any_size(self):
+        self.add_catalog(categories=1, parts=1, options=1)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/categories/')
+        assert len(response.data) == 1
+
+        self.add_catalog(categories=4, parts=3, options=5)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/categories/')
+
+        assert len(response.data) == 5
+        parts = response.data[1]['parts']
+        assert [p['step'] for p in parts] == [1, 2, 3]
+        assert parts[0]['category_name'] == "Category 1"
+        assert [o['part_name'] for o in parts[0]['options']] == ["Part 2"] * 5
+
+    def test_part_list_is_two_queries(self):
+        self.add_catalog(categories=3, parts=4, options=2)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/parts/')
+        assert len(response.data) == 12
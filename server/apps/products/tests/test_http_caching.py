@@ -0,0 +1,56 @@
+"""
+Tests for catalog-versioned ETags on catalog GET endpoints
+"""
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.products.models import Category, Part, PartOption, Stock
+
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class TestCatalogHTTPCaching(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Category.objects.create(name="Bikes")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_unchanged_catalog_revalidates_without_queries(self):
+        response = self.client.get('/api/categories/')
+        etag = response['ETag']
+        assert 'must-revalidate' in response['Cache-Control']
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+
+    def test_catalog_change_moves_the_etag(self):
+        etag = self.client.get('/api/categories/')['ETag']
+        assert self.client.get('/api/parts/')['ETag'] != etag
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Surfboards")
+        response = self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        assert len(response.data) == 2
+
+    def test_stock_levels_are_not_served_from_the_catalog_etag(self):
+        option = PartOption.objects.create(
+            part=Part.objects.create(name="Frame", category=Category.objects.get()), name="Carbon", default_price=300
+        )
+        Stock.objects.create(part_option=option, quantity=5)
+
+        response = self.client.get(f'/api/part-options/{option.id}/stock/')
+        assert 'ETag' not in response
+        assert response.data[0]['available'] == 5
+        assert 'ETag' in self.client.get(f'/api/part-options/{option.id}/')
@@ -0,0 +1,44 @@
+"""
+Tests for the tagged server-side response cache on the category tree
+"""
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.products.models import Category, Part, PartOption
+from utils.response_cache import response_cache_stats
+
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class TestResponseCache(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        bikes = Category.objects.create(name="Bikes")
+        frame = Part.objects.create(name="Frame", category=bikes)
+        cls.option = PartOption.objects.create(part=frame, name="Steel", default_price=10)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_hits_skip_the_database(self):
+        self.client.get('/api/categories/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/categories/')
+
+        assert response.data[0]['parts'][0]['options'][0]['name'] == "Steel"
+        assert response_cache_stats()['category_tree']['hit_ratio'] == 0.5
+
+    def test_saving_a_tagged_model_purges_the_entry(self):
+        self.client.get('/api/categories/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.option.name = "Chromoly"
+            self.option.save()
+        response = self.client.get('/api/categories/')
+
+        assert response.data[0]['parts'][0]['options'][0]['name'] == "Chromoly"
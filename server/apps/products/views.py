@@ -3,12 +3,24 @@ from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.permissions import AllowAny
+from django.db.models import Prefetch
 from .models import Category, Part, PartOption, Stock
 from .serializers import CategorySerializer, PartSerializer, PartOptionSerializer, StockSerializer
 from .permissions import AllowGetAnonymously
 from .currency_config import CurrencyConfig
+from utils.http_caching import CatalogHTTPCacheMixin
+from utils.response_cache import cache_response
 
-class CategoryViewSet(ModelViewSet):
+
+def part_options_prefetch(lookup='options'):
+    """
+    Options for PartSerializer. The reverse prefetch fills each option's
+    `part` cache, so `part_name` costs no extra query.
+    """
+    return Prefetch(lookup, queryset=PartOption.objects.defer('search_vector').order_by('id'))
+
+
+class CategoryViewSet(CatalogHTTPCacheMixin, ModelViewSet):
     """
     API endpoint for viewing and editing categories
 
@@ -16,16 +28,28 @@ class CategoryViewSet(ModelViewSet):
     - GET: No (anyone can view categories)
     - POST, PUT, PATCH, DELETE: Yes (only authenticated users)
     """
-    queryset = Category.objects.all()
+    # Category tree (categories -> parts -> options) in 3 queries at any catalog size
+    queryset = Category.objects.prefetch_related(
+        Prefetch('parts', queryset=Part.objects.order_by('step', 'id')),
+        part_options_prefetch('parts__options'),
+    )
     serializer_class = CategorySerializer
     permission_classes = [AllowGetAnonymously]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    # Stock moves with every checkout without moving the catalog version
+    http_cache_exempt_actions = ('stock',)
+
+    @cache_response('category_tree', tags=[Category, Part, PartOption])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
     
     @action(detail=True, methods=['get'])
     def parts(self, request, pk=None):
         """Get all parts for a specific category"""
         category = self.get_object()
-        parts = Part.objects.filter(category=category)
+        parts = Part.objects.filter(category=category).select_related('category').prefetch_related(
+            part_options_prefetch()
+        )
         serializer = PartSerializer(parts, many=True, context={'request': request})
         return Response(serializer.data)
     
@@ -46,7 +70,7 @@ class CategoryViewSet(ModelViewSet):
         
         return Response(serializer.data)
 
-class PartViewSet(ModelViewSet):
+class PartViewSet(CatalogHTTPCacheMixin, ModelViewSet):
     """
     API endpoint for viewing and editing parts
     
@@ -54,7 +78,7 @@ class PartViewSet(ModelViewSet):
     - GET: No (anyone can view parts)
     - POST, PUT, PATCH, DELETE: Yes (only authenticated users)
     """
-    queryset = Part.objects.all()
+    queryset = Part.objects.select_related('category').prefetch_related(part_options_prefetch())
     serializer_class = PartSerializer
     permission_classes = [AllowGetAnonymously]
     
@@ -69,11 +93,11 @@ class PartViewSet(ModelViewSet):
     def options(self, request, pk=None):
         """Get all options for a specific part"""
         part = self.get_object()
-        options = PartOption.objects.filter(part=part)
+        options = PartOption.objects.filter(part=part).select_related('part').defer('search_vector')
         serializer = PartOptionSerializer(options, many=True)
         return Response(serializer.data)
 
-class PartOptionViewSet(ModelViewSet):
+class PartOptionViewSet(CatalogHTTPCacheMixin, ModelViewSet):
     """
     API endpoint for viewing and editing part options
 
@@ -81,10 +105,12 @@ class PartOptionViewSet(ModelViewSet):
     - GET: No (anyone can view part options)
     - POST, PUT, PATCH, DELETE: Yes (only authenticated users)
     """
-    queryset = PartOption.objects.all()
+    queryset = PartOption.objects.select_related('part').defer('search_vector')
     serializer_class = PartOptionSerializer
     permission_classes = [AllowGetAnonymously]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    # Stock moves with every checkout without moving the catalog version
+    http_cache_exempt_actions = ('stock',)
 
     def get_queryset(self):
         queryset = super().get_queryset()
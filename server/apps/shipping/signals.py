@@ -0,0 +1,20 @@
+"""
+Signal handlers for catalog versioning in shipping app.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import ShippingConstants, ShippingZone, ZoneArea, ShippingRate
+from utils.catalog_version import bump_catalog_version_on_commit
+from utils.response_cache import invalidate_tags_on_commit
+
+
+@receiver([post_save, post_delete], sender=ShippingConstants)
+@receiver([post_save, post_delete], sender=ShippingZone)
+@receiver([post_save, post_delete], sender=ZoneArea)
+@receiver([post_save, post_delete], sender=ShippingRate)
+def catalog_changed(sender, **kwargs):
+    """
+    Move the catalog to a new version and purge tagged cached responses when shipping zones, areas or rates change.
+    """
+    bump_catalog_version_on_commit(sender, **kwargs)
+    invalidate_tags_on_commit(sender, **kwargs)
@@ -10,9 +10,10 @@ from .serializers import (
     ZoneSuggestionSerializer, ShippingZoneListSerializer
 )
 from .services import get_shipping_options, match_address_to_zone, get_zone_suggestions
+from utils.http_caching import CatalogHTTPCacheMixin
 
 
-class ShippingConstantsViewSet(viewsets.ReadOnlyModelViewSet):
+class ShippingConstantsViewSet(CatalogHTTPCacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for shipping constants (read-only for customers, admin can edit via Django admin)
     """
@@ -27,7 +28,7 @@ class ShippingConstantsViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-class ShippingZoneViewSet(viewsets.ReadOnlyModelViewSet):
+class ShippingZoneViewSet(CatalogHTTPCacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for shipping zones (read-only for customers)
 
@@ -101,7 +102,7 @@ class ShippingZoneViewSet(viewsets.ReadOnlyModelViewSet):
         })
 
 
-class ShippingRateViewSet(viewsets.ReadOnlyModelViewSet):
+class ShippingRateViewSet(CatalogHTTPCacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for shipping rates (read-only for customers)
     """
@@ -0,0 +1,45 @@
+-- Recount product_sales_counter from the full order history.
+-- The counters are normally kept current by triggers on orderproduct
+-- (migration preconfigured_products/0005_product_sales_counter); run this after
+-- loading orders with triggers disabled. Same as `python manage.py refresh_views`,
+-- which also records the run. Prints (products with sales, counters corrected).
+
+BEGIN;
+
+-- New order lines wait for the recount so none is counted twice or missed
+LOCK TABLE orderproduct IN SHARE MODE;
+
+WITH totals AS (
+    SELECT op.preconfigured_product_id,
+           SUM(op.quantity) AS times_ordered,
+           SUM(op.quantity * product_sales_score(o.created_at)) AS trending_score,
+           MAX(o.created_at) AS last_ordered_at
+    FROM orderproduct op
+    JOIN orders o ON o.id = op.order_id
+    WHERE op.preconfigured_product_id IS NOT NULL
+    GROUP BY op.preconfigured_product_id
+),
+zeroed AS (
+    UPDATE product_sales_counter c
+    SET times_ordered = 0, trending_score = 0
+    WHERE NOT EXISTS (SELECT 1 FROM totals t WHERE t.preconfigured_product_id = c.preconfigured_product_id)
+      AND c.times_ordered <> 0
+    RETURNING 1
+),
+upserted AS (
+    INSERT INTO product_sales_counter AS c (preconfigured_product_id, times_ordered, trending_score, last_ordered_at)
+    SELECT preconfigured_product_id, times_ordered, trending_score, last_ordered_at
+    FROM totals
+    ORDER BY preconfigured_product_id
+    ON CONFLICT (preconfigured_product_id) DO UPDATE
+    SET times_ordered = EXCLUDED.times_ordered,
+        trending_score = EXCLUDED.trending_score,
+        last_ordered_at = EXCLUDED.last_ordered_at
+    WHERE c.times_ordered <> EXCLUDED.times_ordered
+       OR c.last_ordered_at IS DISTINCT FROM EXCLUDED.last_ordered_at
+       OR abs(c.trending_score - EXCLUDED.trending_score) > 1e-9 * GREATEST(abs(EXCLUDED.trending_score), 1)
+    RETURNING 1
+)
+SELECT (SELECT COUNT(*) FROM totals), (SELECT COUNT(*) FROM upserted) + (SELECT COUNT(*) FROM zeroed);
+
+COMMIT;
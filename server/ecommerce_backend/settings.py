@@ -23,6 +23,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
@@ -48,12 +49,17 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'utils.idempotency.IdempotencyKeyMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 # CORS settings
+from corsheaders.defaults import default_headers
+
 CORS_ALLOW_ALL_ORIGINS = True  # For development - don't use in production!
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
 # Or specify allowed origins:
 # CORS_ALLOWED_ORIGINS = [
 #     "http://localhost:3000",
@@ -92,6 +98,10 @@ DATABASES = {
         'PASSWORD': 'ecommerce_password',
         'HOST': 'db',
         'PORT': '5432',
+        'OPTIONS': {
+            # Name typo matching in catalog search (default 0.6 rejects a single transposition)
+            'options': '-c pg_trgm.word_similarity_threshold=0.5',
+        },
     }
 }
 
@@ -113,6 +123,21 @@ CACHES = {
     }
 }
 
+# Catalog GET endpoints send an ETag tied to the catalog version; clients may reuse
+# a response for this many seconds before revalidating (0 = revalidate every time,
+# so admin edits show up immediately while unchanged catalogs cost a 304)
+CATALOG_HTTP_MAX_AGE = int(os.getenv('CATALOG_HTTP_MAX_AGE', '0'))
+
+# Retried order and payment POSTs carrying an Idempotency-Key header get the first
+# response back instead of running again (see utils/idempotency.py). Responses are
+# kept this many seconds; IDEMPOTENT_PATHS lists the endpoints it applies to.
+IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', str(24 * 60 * 60)))
+IDEMPOTENT_PATHS = [
+    r'^/api/orders/$',
+    r'^/api/orders/\d+/record_payment/$',
+    r'^/api/payments/initiate/$',
+]
+
 # Celery configuration
 CELERY_BROKER_URL = os.getenv('REDIS_URL', 'redis://redis:6379/0')
 CELERY_RESULT_BACKEND = os.getenv('REDIS_URL', 'redis://redis:6379/0')
@@ -123,6 +148,27 @@ CELERY_TIMEZONE = 'UTC'
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes max for tasks
 
+# Sales analytics: the best-seller counters are kept current by database
+# triggers; this periodic check repairs drift (skipped when no order lines
+# changed, run by one node at a time, and blocking order writes only to repair)
+SALES_ANALYTICS_REFRESH_MINUTES = int(os.getenv('SALES_ANALYTICS_REFRESH_MINUTES', '60'))
+
+# Stock holds: checkouts reserve their stock for this long; holds of abandoned
+# checkouts are released by a periodic task, this many per transaction
+STOCK_HOLD_MINUTES = int(os.getenv('STOCK_HOLD_MINUTES', '15'))
+STOCK_HOLD_RELEASE_BATCH = int(os.getenv('STOCK_HOLD_RELEASE_BATCH', '500'))
+
+CELERY_BEAT_SCHEDULE = {
+    'refresh-sales-analytics': {
+        'task': 'preconfigured_products.refresh_sales_analytics',
+        'schedule': SALES_ANALYTICS_REFRESH_MINUTES * 60,
+    },
+    'release-expired-stock-holds': {
+        'task': 'products.release_expired_stock_holds',
+        'schedule': 60,
+    },
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -222,4 +268,26 @@ STRIPE_WEBHOOK_SECRET = os.environ.get('STRIPE_WEBHOOK_SECRET', None)
 # Mobile Money (Uganda)
 # TODO: Add Flutterwave or Paystack credentials when ready
 MOBILE_MONEY_PROVIDER = os.environ.get('MOBILE_MONEY_PROVIDER', None)  # 'flutterwave' or 'paystack'
-MOBILE_MONEY_SECRET_KEY = os.environ.get('MOBILE_MONEY_SECRET_KEY', None)
\ No newline at end of file
+MOBILE_MONEY_SECRET_KEY = os.environ.get('MOBILE_MONEY_SECRET_KEY', None)
+
+# AI Assistant retrieval
+# 'hybrid' fuses BM25 and vector search, 'vector' uses embeddings only,
+# 'lexical' uses BM25 only (keeps working when the embedding server is down)
+AI_RETRIEVAL_MODE = os.environ.get('AI_RETRIEVAL_MODE', 'hybrid')
+
+# Vector store behind the AI knowledge index: 'chroma', 'numpy' or 'pgvector'
+# ('numpy' keeps embeddings in one memory-mapped matrix shared by all workers)
+# ('pgvector' stores them in ai_embedded_document and filters on live price/stock)
+AI_VECTOR_BACKEND = os.environ.get('AI_VECTOR_BACKEND', 'chroma')
+# Store NumPy embeddings as int8 (4x smaller, slightly lower precision)
+AI_VECTOR_QUANTIZE = os.environ.get('AI_VECTOR_QUANTIZE', 'False') == 'True'
+# Index versions kept after a blue/green rebuild (active one + fallbacks)
+AI_INDEX_KEEP_VERSIONS = int(os.environ.get('AI_INDEX_KEEP_VERSIONS', '2'))
+# Shared retrieval daemon (manage.py run_retrieval_server), e.g. 'http://127.0.0.1:8765'
+# or 'unix:///tmp/ai_retrieval.sock'; empty loads the index in every worker process
+AI_RETRIEVAL_SERVICE_URL = os.environ.get('AI_RETRIEVAL_SERVICE_URL', '')
+# Embedding backend: 'ollama' (nomic-embed-text via Ollama) or 'hashing'
+# (in-process TF-IDF hashing embedder fitted on the catalog; no network needed)
+AI_EMBEDDING_BACKEND = os.environ.get('AI_EMBEDDING_BACKEND', 'ollama')
+# Project hashing embeddings onto the catalog's top singular vectors (denser, slower to fit)
+AI_HASHING_EMBEDDING_SVD = os.environ.get('AI_HASHING_EMBEDDING_SVD', 'False') == 'True'
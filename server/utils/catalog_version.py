@@ -0,0 +1,46 @@
+"""
+Catalog version counter.
+A single number in the shared cache that changes whenever catalog data
+changes, so anything derived from the catalog can be cached per version
+instead of being invalidated key by key.
+"""
+import time
+from django.core.cache import cache
+from django.db import transaction
+
+CATALOG_VERSION_CACHE_KEY = 'catalog_version'
+
+
+def get_catalog_version():
+    """
+    Current catalog version, or None if the cache is unavailable.
+    A missing counter starts from the current time in milliseconds, so a
+    counter lost from the cache never repeats an earlier version.
+    """
+    try:
+        version = cache.get(CATALOG_VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(CATALOG_VERSION_CACHE_KEY, int(time.time() * 1000), timeout=None)
+            version = cache.get(CATALOG_VERSION_CACHE_KEY)
+        return version
+    except Exception:
+        return None
+
+
+def bump_catalog_version():
+    """Move the catalog to a new version"""
+    try:
+        cache.incr(CATALOG_VERSION_CACHE_KEY)
+    except ValueError:
+        # Counter missing: start a new one
+        cache.add(CATALOG_VERSION_CACHE_KEY, int(time.time() * 1000), timeout=None)
+    except Exception as e:
+        print(f"⚠️ Could not bump catalog version: {e}")
+
+
+def bump_catalog_version_on_commit(sender, **kwargs):
+    """
+    Signal handler for catalog models. The bump waits for the transaction to
+    commit, so readers never cache pre-commit data under the new version.
+    """
+    transaction.on_commit(bump_catalog_version)
@@ -0,0 +1,86 @@
+"""
+HTTP caching for catalog endpoints.
+GET responses carry a strong ETag derived from the catalog version, so a
+client revalidating an unchanged catalog gets 304 Not Modified after a
+single cache read: no authentication, database access or serialization.
+"""
+import hashlib
+from functools import wraps
+from django.conf import settings as django_settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from utils.catalog_version import get_catalog_version
+
+
+def catalog_etag(request):
+    """
+    Strong ETag for a catalog GET, or None if the catalog version is unavailable.
+    The representation also depends on the URL (filters, pagination), the host
+    (absolute image URLs) and the negotiated renderer, so those are hashed in.
+    """
+    version = get_catalog_version()
+    if version is None:
+        return None
+
+    variant = '|'.join([
+        request.get_host(),
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+    ])
+    digest = hashlib.sha1(variant.encode('utf-8')).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def set_catalog_cache_headers(response, etag):
+    response.headers['ETag'] = etag
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=getattr(django_settings, 'CATALOG_HTTP_MAX_AGE', 0),
+        must_revalidate=True,
+    )
+    return response
+
+
+def catalog_http_cache(view_func):
+    """
+    Decorator for views that only read catalog data. Answers If-None-Match
+    with 304 while the catalog version is unchanged; successful GET responses
+    get the ETag and Cache-Control headers. Other methods pass straight through.
+    """
+    @wraps(view_func)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+
+        etag = catalog_etag(request)
+        if etag is None:
+            return view_func(request, *args, **kwargs)
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return set_catalog_cache_headers(not_modified, etag)
+
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_catalog_cache_headers(response, etag)
+        return response
+
+    return wrapped
+
+
+class CatalogHTTPCacheMixin:
+    """
+    Viewset/APIView mixin applying catalog_http_cache to every action except
+    those in `http_cache_exempt_actions` (live data the catalog version does
+    not track, such as stock levels).
+    The check runs before DRF's dispatch, so a 304 skips authentication too.
+    """
+
+    http_cache_exempt_actions = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        # DRF sets self.action during dispatch; the route's action map is known before
+        action = (getattr(self, 'action_map', None) or {}).get(request.method.lower())
+        if action in self.http_cache_exempt_actions:
+            return super().dispatch(request, *args, **kwargs)
+        return catalog_http_cache(super().dispatch)(request, *args, **kwargs)
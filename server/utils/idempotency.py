@@ -0,0 +1,184 @@
+"""
+Idempotency-Key support for retried POSTs.
+
+Clients on flaky networks send an `Idempotency-Key` header (any unique string,
+e.g. a UUID per checkout attempt) and reuse it when retrying. The first request
+runs and its response is stored in the shared cache for IDEMPOTENCY_KEY_TTL
+seconds; retries get the stored response back (with `Idempotent-Replayed: true`)
+without running the view again. A duplicate arriving while the first request
+is still running waits for its result instead of racing it.
+
+Keys are scoped to the caller (JWT user id or session user), so two users can
+never see each other's responses. A key reused for a different request (other
+path or body) is answered 422. Only outcomes a retry would get anyway are
+stored: successes and the client errors in REPLAYED_CLIENT_ERRORS. Anything
+else (server errors, a 409 for busy or sold-out stock, a 429) releases the
+key, so a retry runs again. Requests without the header, without an
+identifiable user, or outside IDEMPOTENT_PATHS pass straight through, as do
+all requests when the cache is unavailable.
+"""
+import hashlib
+import re
+import time
+from django.conf import settings as django_settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+LOCK_TIMEOUT = 60  # Upper bound on the first request; a crashed holder frees the key after this
+WAIT_POLL = 0.1
+
+# Client errors a retry of the same request would always get again
+REPLAYED_CLIENT_ERRORS = (400, 404, 422)
+
+# Response headers stored with the body and sent again on replay
+REPLAYED_RESPONSE_HEADERS = ('Content-Type', 'Location')
+
+DEFAULT_IDEMPOTENT_PATHS = [
+    r'^/api/orders/$',
+    r'^/api/orders/\d+/record_payment/$',
+    r'^/api/payments/initiate/$',
+]
+
+
+def request_owner(request):
+    """User id the request is made as, or None if it cannot be identified"""
+    if request.headers.get('Authorization'):
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+        from rest_framework_simplejwt.settings import api_settings
+
+        authentication = JWTAuthentication()
+        raw_token = authentication.get_raw_token(authentication.get_header(request))
+        if raw_token is None:
+            return None
+        try:
+            return authentication.get_validated_token(raw_token)[api_settings.USER_ID_CLAIM]
+        except (InvalidToken, TokenError, KeyError):
+            return None
+
+    user = getattr(request, 'user', None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def request_fingerprint(request):
+    """Hash of what makes a request the same request: method, path, query and body"""
+    digest = hashlib.sha256()
+    for part in (request.method, request.get_full_path(), request.content_type or ''):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    digest.update(request.body)
+    return digest.hexdigest()
+
+
+def _record_key(owner, idempotency_key):
+    digest = hashlib.sha256(idempotency_key.encode('utf-8')).hexdigest()
+    return f'idempotency:{owner}:{digest}'
+
+
+def _is_final(response):
+    """Whether a retry of the request should get this response again"""
+    status_code = response.status_code
+    return 200 <= status_code < 300 or status_code in REPLAYED_CLIENT_ERRORS
+
+
+def _replay(record):
+    response = HttpResponse(record['content'], status=record['status'])
+    for header, value in record['headers'].items():
+        response.headers[header] = value
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def _mismatch():
+    return JsonResponse(
+        {'error': f'{IDEMPOTENCY_HEADER} was already used for a different request'},
+        status=422
+    )
+
+
+class IdempotencyKeyMiddleware:
+    """Replays stored responses for retried POST/PUT/PATCH requests carrying an Idempotency-Key"""
+
+    methods = ('POST', 'PUT', 'PATCH')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = [
+            re.compile(pattern)
+            for pattern in getattr(django_settings, 'IDEMPOTENT_PATHS', DEFAULT_IDEMPOTENT_PATHS)
+        ]
+        self.ttl = getattr(django_settings, 'IDEMPOTENCY_KEY_TTL', 24 * 60 * 60)
+
+    def __call__(self, request):
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if (
+            not idempotency_key
+            or request.method not in self.methods
+            or not any(path.match(request.path) for path in self.paths)
+        ):
+            return self.get_response(request)
+
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            return JsonResponse(
+                {'error': f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters'},
+                status=400
+            )
+
+        owner = request_owner(request)
+        if owner is None:
+            return self.get_response(request)
+
+        key = _record_key(owner, idempotency_key)
+        lock_key = f'{key}:lock'
+        fingerprint = request_fingerprint(request)
+
+        # Replay a stored response, or take the key; a duplicate in flight
+        # waits for the first request (and takes over if it dies without a result)
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                record = cache.get(key)
+                if record is not None:
+                    return _replay(record) if record['fingerprint'] == fingerprint else _mismatch()
+                if cache.add(lock_key, fingerprint, timeout=LOCK_TIMEOUT):
+                    break
+                running = cache.get(lock_key)
+            except Exception as e:
+                print(f"⚠️ Idempotency cache unavailable, running request without it: {e}")
+                return self.get_response(request)
+
+            if running is not None and running != fingerprint:
+                return _mismatch()
+            if time.monotonic() >= deadline:
+                return JsonResponse(
+                    {'error': f'A request with this {IDEMPOTENCY_HEADER} is still in progress'},
+                    status=409
+                )
+            time.sleep(WAIT_POLL)
+
+        try:
+            response = self.get_response(request)
+            if _is_final(response) and not response.streaming:
+                record = {
+                    'fingerprint': fingerprint,
+                    'status': response.status_code,
+                    'content': response.content,
+                    'headers': {
+                        header: response.headers[header]
+                        for header in REPLAYED_RESPONSE_HEADERS
+                        if header in response.headers
+                    },
+                }
+                try:
+                    cache.set(key, record, timeout=self.ttl)
+                except Exception as e:
+                    print(f"⚠️ Could not store idempotent response for {request.path}: {e}")
+            return response
+        finally:
+            try:
+                cache.delete(lock_key)
+            except Exception:
+                pass
@@ -0,0 +1,177 @@
+"""
+Server-side response cache for hot read-only DRF views.
+
+Responses are stored in the shared cache, keyed by path, query, host and
+currency, and tagged by the models they are built from. Each tag (a model
+label such as "products.PartOption") has a version counter that is part of
+every key, so saving a PartOption moves its tag and orphans exactly the
+entries tagged with it; untagged entries stay warm.
+
+A miss takes a short lock so one request recomputes while identical
+concurrent requests wait for its result (single-flight), which keeps a purge
+from turning into a thundering herd. Hits, misses and coalesced waits are
+counted per view (see `manage.py response_cache_stats`).
+"""
+import hashlib
+import time
+from functools import wraps
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+LOCK_TIMEOUT = 30  # Upper bound on a recomputation; a crashed holder frees the lock after this
+SINGLE_FLIGHT_WAIT = 5.0
+SINGLE_FLIGHT_POLL = 0.05
+
+# Names of the views using cache_response, for the stats command
+CACHED_VIEWS = {}
+
+
+def tag_for(model):
+    return model if isinstance(model, str) else model._meta.label
+
+
+def _tag_key(tag):
+    return f'response_cache_tag:{tag}'
+
+
+def _stats_key(name, outcome):
+    return f'response_cache_stats:{name}:{outcome}'
+
+
+def tag_versions(tags):
+    """Current version of each tag; missing tags start from the time in ms"""
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate_tags(*models):
+    """Purge every cached response tagged with any of `models` (classes or labels)"""
+    for model in models:
+        key = _tag_key(tag_for(model))
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+        except Exception as e:
+            print(f"⚠️ Could not invalidate response cache tag {key}: {e}")
+
+
+def invalidate_tags_on_commit(sender, **kwargs):
+    """Signal handler: purge the sender's tag once the transaction commits"""
+    transaction.on_commit(lambda: invalidate_tags(sender))
+
+
+def _record(name, outcome):
+    key = _stats_key(name, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+    except Exception:
+        pass
+
+
+def response_cache_stats():
+    """Hit/miss counts and hit ratio per cached view"""
+    stats = {}
+    for name in sorted(CACHED_VIEWS):
+        counts = cache.get_many([_stats_key(name, o) for o in ('hit', 'miss', 'coalesced')])
+        hits = counts.get(_stats_key(name, 'hit'), 0)
+        misses = counts.get(_stats_key(name, 'miss'), 0)
+        coalesced = counts.get(_stats_key(name, 'coalesced'), 0)
+        total = hits + misses + coalesced
+        stats[name] = {
+            'tags': CACHED_VIEWS[name],
+            'hits': hits,
+            'misses': misses,
+            'coalesced': coalesced,
+            'hit_ratio': (hits + coalesced) / total if total else None,
+        }
+    return stats
+
+
+def reset_response_cache_stats():
+    cache.delete_many([_stats_key(name, o) for name in CACHED_VIEWS for o in ('hit', 'miss', 'coalesced')])
+
+
+def response_cache_key(name, tags, request):
+    """Cache key for `request`: view name, tag versions, then the request variant"""
+    versions = ':'.join(str(v) for v in tag_versions(tags))
+    variant = '|'.join([
+        request.get_host(),
+        request.path,
+        '&'.join(sorted(request.GET.urlencode().split('&'))),
+        request.headers.get('X-Currency', ''),
+    ])
+    digest = hashlib.sha1(f'{versions}|{variant}'.encode('utf-8')).hexdigest()
+    return f'response_cache:{name}:{digest}'
+
+
+def cache_response(name, tags, timeout=RESPONSE_CACHE_TIMEOUT):
+    """
+    Decorator for GET handlers on DRF views (methods taking `self, request`).
+    Only 200 responses are cached; the cached data is re-rendered per request,
+    so content negotiation and conditional-GET headers still apply.
+    `tags` are the models the response is built from.
+    """
+    tags = [tag_for(model) for model in tags]
+    CACHED_VIEWS[name] = tags
+
+    def decorator(handler):
+        @wraps(handler)
+        def wrapped(view, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return handler(view, request, *args, **kwargs)
+            try:
+                key = response_cache_key(name, tags, request)
+                cached = cache.get(key)
+            except Exception:
+                return handler(view, request, *args, **kwargs)
+
+            if cached is not None:
+                _record(name, 'hit')
+                return Response(cached)
+
+            lock_key = f'{key}:lock'
+            try:
+                acquired = cache.add(lock_key, 1, timeout=LOCK_TIMEOUT)
+            except Exception:
+                acquired, lock_key = True, None
+            if not acquired:
+                # Another request is computing this entry: wait for its result
+                deadline = time.monotonic() + SINGLE_FLIGHT_WAIT
+                while time.monotonic() < deadline:
+                    time.sleep(SINGLE_FLIGHT_POLL)
+                    cached = cache.get(key)
+                    if cached is not None:
+                        _record(name, 'coalesced')
+                        return Response(cached)
+                lock_key = None
+
+            try:
+                _record(name, 'miss')
+                response = handler(view, request, *args, **kwargs)
+                if response.status_code == 200:
+                    try:
+                        cache.set(key, response.data, timeout=timeout)
+                    except Exception:
+                        pass
+                return response
+            finally:
+                if lock_key:
+                    try:
+                        cache.delete(lock_key)
+                    except Exception:
+                        pass
+
+        return wrapped
+
+    return decorator
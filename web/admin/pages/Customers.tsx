@@ -21,7 +21,7 @@ import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@shared/components/ui/tabs"
 import { ConvertedPrice } from "@shared/components/converted-price"
 import { customerService, type Customer, type CustomerOrder } from "@admin/services/customer-service"
-import { orderService, type Order } from "@admin/services/order-service"
+import { orderService, type OrderSummary } from "@admin/services/order-service"
 
 interface CustomerWithStats extends Customer {
   ordersCount: number;
@@ -31,7 +31,7 @@ interface CustomerWithStats extends Customer {
 export default function CustomersPage() {
   const [isViewDialogOpen, setIsViewDialogOpen] = useState(false)
   const [selectedCustomer, setSelectedCustomer] = useState<CustomerWithStats | null>(null)
-  const [selectedCustomerOrders, setSelectedCustomerOrders] = useState<Order[]>([])
+  const [selectedCustomerOrders, setSelectedCustomerOrders] = useState<OrderSummary[]>([])
   const [searchQuery, setSearchQuery] = useState("")
   const [currentPage, setCurrentPage] = useState(1)
   const [customers, setCustomers] = useState<CustomerWithStats[]>([])
@@ -21,8 +21,9 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@shared/components/ui/table"
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@shared/components/ui/tabs"
 import { useToast } from "@shared/components/ui/use-toast"
+import { useIdempotencyKey } from "@shared/hooks/use-idempotency-key"
 import { ConvertedPrice } from "@shared/components/converted-price"
-import { orderService, type Order } from "../services/order-service"
+import { orderService, type Order, type OrderSummary } from "../services/order-service"
 
 // Sample data for reference (will be removed)
 const sampleOrders = [
@@ -142,8 +143,10 @@ const sampleOrders = [
 ]
 
 export default function OrdersPage() {
-  const [orders, setOrders] = useState<Order[]>([])
+  const [orders, setOrders] = useState<OrderSummary[]>([])
+  const [nextPage, setNextPage] = useState<string | null>(null)
   const [isLoading, setIsLoading] = useState(true)
+  const [isLoadingMore, setIsLoadingMore] = useState(false)
   const [isViewDialogOpen, setIsViewDialogOpen] = useState(false)
   const [isRecordPaymentDialogOpen, setIsRecordPaymentDialogOpen] = useState(false)
   const [selectedOrder, setSelectedOrder] = useState<Order | null>(null)
@@ -154,6 +157,7 @@ export default function OrdersPage() {
   const [paidBy, setPaidBy] = useState<"customer" | "delivery_person">("customer")
   const [fulfillmentStatus, setFulfillmentStatus] = useState<string>("")
   const { toast } = useToast()
+  const paymentIdempotency = useIdempotencyKey()
 
   useEffect(() => {
     loadOrders()
@@ -162,8 +166,9 @@ export default function OrdersPage() {
   const loadOrders = async () => {
     try {
       setIsLoading(true)
-      const data = await orderService.getAll()
-      setOrders(data)
+      const page = await orderService.getPage()
+      setOrders(page.results)
+      setNextPage(page.next)
     } catch (error) {
       toast({
         title: "Error",
@@ -175,6 +180,24 @@ export default function OrdersPage() {
     }
   }
 
+  const loadMoreOrders = async () => {
+    if (!nextPage) return
+    try {
+      setIsLoadingMore(true)
+      const page = await orderService.getPage(nextPage)
+      setOrders((current) => [...current, ...page.results])
+      setNextPage(page.next)
+    } catch (error) {
+      toast({
+        title: "Error",
+        description: "Failed to load more orders",
+        variant: "destructive",
+      })
+    } finally {
+      setIsLoadingMore(false)
+    }
+  }
+
   const filteredOrders = orders.filter((order) => {
     // Apply payment status filter
     if (statusFilter !== "all" && order.payment_status.toLowerCase() !== statusFilter.toLowerCase()) {
@@ -190,10 +213,20 @@ export default function OrdersPage() {
     )
   })
 
-  const handleView = (order: Order) => {
-    setSelectedOrder(order)
-    setFulfillmentStatus(order.fulfillment_status)
-    setIsViewDialogOpen(true)
+  const handleView = async (order: OrderSummary) => {
+    try {
+      // The list only carries summaries: load products, payments and address
+      const details: Order = await orderService.getById(order.id)
+      setSelectedOrder(details)
+      setFulfillmentStatus(details.fulfillment_status)
+      setIsViewDialogOpen(true)
+    } catch (error) {
+      toast({
+        title: "Error",
+        description: "Failed to load order details",
+        variant: "destructive",
+      })
+    }
   }
 
   const handleUpdateFulfillmentStatus = async () => {
@@ -229,7 +262,8 @@ export default function OrdersPage() {
         amount: parseFloat(paymentAmount),
         payment_method: paymentMethod,
         paid_by: paidBy,
-      })
+      }, paymentIdempotency.headers("payment"))
+      paymentIdempotency.reset()
 
       toast({
         title: "Success",
@@ -249,6 +283,9 @@ export default function OrdersPage() {
       setPaymentMethod("Credit Card")
       setPaidBy("customer")
     } catch (error: any) {
+      if (error.response) {
+        paymentIdempotency.reset()
+      }
       toast({
         title: "Error",
         description: error.response?.data?.error || "Failed to record payment",
@@ -448,6 +485,13 @@ export default function OrdersPage() {
             </TableBody>
           </Table>
           )}
+          {nextPage && (
+            <div className="flex justify-center pt-4">
+              <Button variant="outline" onClick={loadMoreOrders} disabled={isLoadingMore}>
+                {isLoadingMore ? "Loading..." : "Load more orders"}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
 
@@ -682,6 +726,7 @@ export default function OrdersPage() {
                       <div key={productIndex}>
                         <Label className="mb-2 block">
                           {product.custom_name || product.base_product_name}
+                          {product.quantity > 1 && ` × ${product.quantity}`}
                         </Label>
                         <Table>
                           <TableHeader>
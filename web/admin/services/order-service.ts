@@ -38,6 +38,7 @@ export interface OrderProduct {
   preconfigured_product?: number;
   custom_name?: string;
   base_product_name: string;
+  quantity: number;
   items: OrderItem[];
 }
 
@@ -59,6 +60,15 @@ export interface Order {
   balance_due: number;
 }
 
+/** Order as returned by the list endpoint: no products, payments or address */
+export type OrderSummary = Omit<Order, 'products' | 'payments' | 'shipping_address'>;
+
+export interface OrderPage {
+  next: string | null;
+  previous: string | null;
+  results: OrderSummary[];
+}
+
 export interface RecordPaymentInput {
   amount: number;
   payment_method: string;
@@ -71,13 +81,27 @@ export interface RecordPaymentInput {
  */
 export const orderService = {
   /**
-   * Get all orders
+   * Get a page of order summaries, newest first; pass `next` to continue
    */
-  getAll: async (): Promise<Order[]> => {
-    const response = await adminApiClient.get<Order[]>('/api/orders/');
+  getPage: async (cursorUrl?: string): Promise<OrderPage> => {
+    const response = await adminApiClient.get<OrderPage>(cursorUrl ?? '/api/orders/');
     return response.data;
   },
 
+  /**
+   * Get every order summary, following the pages
+   */
+  getAll: async (): Promise<OrderSummary[]> => {
+    const orders: OrderSummary[] = [];
+    let page = await orderService.getPage('/api/orders/?page_size=200');
+    orders.push(...page.results);
+    while (page.next) {
+      page = await orderService.getPage(page.next);
+      orders.push(...page.results);
+    }
+    return orders;
+  },
+
   /**
    * Get single order by ID
    */
@@ -89,8 +113,12 @@ export const orderService = {
   /**
    * Record a payment for an order
    */
-  recordPayment: async (orderId: number, data: RecordPaymentInput): Promise<{ message: string; payment: Payment; order: Order }> => {
-    const response = await adminApiClient.post(`/api/orders/${orderId}/record_payment/`, data);
+  recordPayment: async (
+    orderId: number,
+    data: RecordPaymentInput,
+    headers?: Record<string, string>
+  ): Promise<{ message: string; payment: Payment; order: Order }> => {
+    const response = await adminApiClient.post(`/api/orders/${orderId}/record_payment/`, data, { headers });
     return response.data;
   },
 
@@ -51,6 +51,7 @@ export default function AIProductCard({ product }: AIProductCardProps) {
         if (part?.part_option_details?.part_name && part?.part_option_details?.name) {
           const partKey = part.part_option_details.part_name.toLowerCase().replace(/\s+/g, '')
           acc[partKey] = {
+            id: part.part_option_details.id,
             name: part.part_option_details.name,
             price: parseFloat(part.part_option_details.default_price || '0')
           }
@@ -50,12 +50,13 @@ export default function ProductCard({ product, onViewDetails }: ProductCardProps
       if (part?.part_option_details?.part_name && part?.part_option_details?.name) {
         const partKey = part.part_option_details.part_name.toLowerCase().replace(/\s+/g, '')
         acc[partKey] = {
+          id: part.part_option_details.id,
           name: part.part_option_details.name,
           price: parseFloat(part.part_option_details.default_price || '0')
         }
       }
       return acc
-    }, {} as Record<string, { name: string; price: number }>)
+    }, {} as Record<string, { id: number; name: string; price: number }>)
 
     addItem({
       id: product.id,
@@ -20,6 +20,7 @@ export type CartItem = {
   }
   configDetails?: {
     [key: string]: {
+      id?: number  // Part option id, so the server takes stock from the right part
       name: string
       price: number
     }
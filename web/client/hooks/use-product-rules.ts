@@ -231,7 +231,7 @@ export function useProductRules(configuration: { [key: string]: string }, parts:
 
   // Get price details for the configuration summary
   const getConfigDetails = () => {
-    const details: { [key: string]: { name: string; price: number } } = {}
+    const details: { [key: string]: { id: number; name: string; price: number } } = {}
 
     Object.entries(configuration).forEach(([partName, optionId]) => {
       const part = parts.find((p) => p.name === partName)
@@ -241,6 +241,7 @@ export function useProductRules(configuration: { [key: string]: string }, parts:
       if (option) {
         const priceInfo = getOptionPrice(option)
         details[partName] = {
+          id: option.id,
           name: option.name,
           price: priceInfo.price,
         }
@@ -1,6 +1,6 @@
 "use client"
 
-import { useState, useMemo } from "react"
+import { useState, useMemo, useEffect, useRef } from "react"
 import { useNavigate } from "react-router-dom"
 import { ArrowLeft, CreditCard, Smartphone } from "lucide-react"
 import { loadStripe } from "@stripe/stripe-js"
@@ -11,6 +11,7 @@ import { Label } from "@shared/components/ui/label"
 import { RadioGroup, RadioGroupItem } from "@shared/components/ui/radio-group"
 import { Separator } from "@shared/components/ui/separator"
 import { useCart } from "@client/context/cart-context"
+import { useIdempotencyKey } from "@shared/hooks/use-idempotency-key"
 import { axiosInstance } from "@client/context/auth-context"
 import SiteHeader from "@client/components/site-header"
 import Footer from "@client/components/footer"
@@ -77,6 +78,34 @@ function CheckoutContent() {
     zoneId: selectedZoneId,
   })
 
+  // Cart as the orders API expects it
+  const orderProducts = useMemo(() => {
+    return items.map((item) => ({
+      name: item.name,
+      category_id: item.categoryId || 1,
+      price: item.price,
+      quantity: item.quantity,
+      configuration: item.configDetails || {},
+    }))
+  }, [items])
+
+  // Hold the cart's stock while the customer checks out; a changed cart
+  // replaces the previous hold. The order consumes the hold.
+  const stockHold = useRef<string | null>(null)
+  useEffect(() => {
+    if (orderProducts.length === 0) return
+    axiosInstance
+      .post("/orders/stock-hold/", { products: orderProducts, stock_hold: stockHold.current })
+      .then((response) => {
+        stockHold.current = response.data.hold_token
+      })
+      .catch((err) => {
+        if (err.response?.status === 409) {
+          setError(err.response.data.error)
+        }
+      })
+  }, [orderProducts])
+
   // Calculate total with shipping
   const shippingCost = selectedShippingOption?.total_cost_ugx || 0
   const totalWithShipping = totalPrice + shippingCost
@@ -100,6 +129,9 @@ function CheckoutContent() {
     setStep("payment")
   }
 
+  // Resubmitting after a lost response replays the order instead of creating another
+  const checkoutIdempotency = useIdempotencyKey()
+
   const handlePaymentSubmit = async (e: React.FormEvent) => {
     e.preventDefault()
     setLoading(true)
@@ -112,16 +144,13 @@ function CheckoutContent() {
         shipping_address: shippingAddress,
         shipping_zone_id: selectedZoneId,
         shipping_rate_id: selectedShippingOption?.rate_id,
-        products: items.map((item) => ({
-          name: item.name,
-          category_id: item.categoryId || 1,
-          price: item.price,
-          quantity: item.quantity,
-          configuration: item.configDetails || {},
-        })),
+        stock_hold: stockHold.current,
+        products: orderProducts,
       }
 
-      const orderResponse = await axiosInstance.post("/orders/", orderData)
+      const orderResponse = await axiosInstance.post("/orders/", orderData, {
+        headers: checkoutIdempotency.headers("order"),
+      })
       const order = orderResponse.data
       setOrderId(order.id)
 
@@ -131,7 +160,10 @@ function CheckoutContent() {
         gateway: paymentGateway,
         amount: totalWithShipping,
         currency: "UGX",
+      }, {
+        headers: checkoutIdempotency.headers("payment"),
       })
+      checkoutIdempotency.reset()
 
       // Handle payment gateway response
       if (paymentResponse.data.action_required) {
@@ -159,6 +191,9 @@ function CheckoutContent() {
         navigate(`/orders/${order.id}`)
       }
     } catch (err: any) {
+      if (err.response) {
+        checkoutIdempotency.reset()
+      }
       setError(err.response?.data?.error || "Checkout failed. Please try again.")
       setStep("payment")
       setLoading(false)
@@ -12,6 +12,7 @@ import { RadioGroup, RadioGroupItem } from "@shared/components/ui/radio-group"
 import { Input } from "@shared/components/ui/input"
 import { Separator } from "@shared/components/ui/separator"
 import { axiosInstance } from "@client/context/auth-context"
+import { useIdempotencyKey } from "@shared/hooks/use-idempotency-key"
 import SiteHeader from "@client/components/site-header"
 import Footer from "@client/components/footer"
 import ProtectedRoute from "@client/components/protected-route"
@@ -34,6 +35,7 @@ interface Order {
 interface OrderProduct {
   id: number
   base_product_name: string
+  quantity: number
   custom_name: string | null
   items: OrderItem[]
 }
@@ -185,6 +187,9 @@ function OrderDetailContent() {
     await initiatePayment()
   }
 
+  // Resubmitting after a lost response replays the payment instead of starting another
+  const paymentIdempotency = useIdempotencyKey()
+
   const initiatePayment = async (phoneNumber?: string) => {
     if (!order) return
 
@@ -199,7 +204,10 @@ function OrderDetailContent() {
         amount: paymentAmount,
         currency: currency,
         customer_phone: phoneNumber, // Include phone for MTN MoMo
+      }, {
+        headers: paymentIdempotency.headers("payment"),
       })
+      paymentIdempotency.reset()
 
       console.log("Payment initiation response:", response.data)
       console.log("action_required:", response.data.action_required)
@@ -248,6 +256,9 @@ function OrderDetailContent() {
 
       setPaymentDialogOpen(false)
     } catch (err: any) {
+      if (err.response) {
+        paymentIdempotency.reset()
+      }
       const errorMessage = err.response?.data?.error || err.response?.data?.message || "Payment initiation failed"
       console.error("Payment initiation error:", err)
       alert(errorMessage)
@@ -406,6 +417,7 @@ function OrderDetailContent() {
             <div key={product.id} className="bg-white rounded-lg border shadow-sm p-6">
               <h3 className="text-lg font-semibold mb-4">
                 {product.custom_name || product.base_product_name}
+                {product.quantity > 1 && ` × ${product.quantity}`}
               </h3>
               <div className="space-y-2">
                 {product.items.map((item) => (
@@ -0,0 +1,33 @@
+import { useCallback, useRef } from 'react'
+
+function newKey(): string {
+  // randomUUID needs a secure context (https or localhost)
+  return typeof crypto !== 'undefined' && 'randomUUID' in crypto
+    ? crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`
+}
+
+/**
+ * Idempotency-Key headers for a user action that creates something (an order,
+ * a payment). The key stays the same until `reset`, so resubmitting after a
+ * lost response replays the first result on the server instead of creating a
+ * second order or payment.
+ *
+ * Call `reset` once the server has answered (success or error), so the next
+ * attempt runs anew; keep the key after network errors.
+ *
+ * @example
+ * const idempotency = useIdempotencyKey()
+ * await axiosInstance.post("/orders/", data, { headers: idempotency.headers("order") })
+ */
+export function useIdempotencyKey() {
+  const key = useRef(newKey())
+
+  // One key per request of the action: the server ties a key to one request
+  const headers = useCallback((scope: string) => ({ 'Idempotency-Key': `${key.current}:${scope}` }), [])
+  const reset = useCallback(() => {
+    key.current = newKey()
+  }, [])
+
+  return { headers, reset }
+}